@@ -1,6 +1,6 @@
 import tkinter as tk
-import random
 from tkinter import messagebox
+from modelos.logica_juego import Buscaminas as MotorBuscaminas
 
 # Clase base genérica
 class Juego:
@@ -47,32 +47,20 @@ class Buscaminas(JuegoConTablero):
             5: "maroon", 6: "turquoise", 7: "black", 8: "gray"
         }
 
-        self._colocar_minas()
-        self._contar_minas()
+        # Motor común: las minas se colocan en el primer click y el tablero es una vista de sus buffers
+        self._motor = MotorBuscaminas(filas, columnas, minas)
+        self._tablero = self._motor.obtener_estado()['tablero']
         self._crear_interfaz()
 
-    # ----------------- Métodos privados -----------------
-    def _colocar_minas(self):
-        minas_colocadas = 0
-        while minas_colocadas < self._minas:
-            f = random.randint(0, self._filas - 1)
-            c = random.randint(0, self._columnas - 1)
-            if self._tablero[f][c] != "M":
-                self._tablero[f][c] = "M"
-                minas_colocadas += 1
-
-    def _contar_minas(self):
-        for f in range(self._filas):
-            for c in range(self._columnas):
-                if self._tablero[f][c] == "M":
-                    continue
-                minas_cerca = 0
-                for i in range(max(0, f-1), min(self._filas, f+2)):
-                    for j in range(max(0, c-1), min(self._columnas, c+2)):
-                        if self._tablero[i][j] == "M":
-                            minas_cerca += 1
-                self._tablero[f][c] = minas_cerca
+    def crear_tablero(self):
+        self._motor = MotorBuscaminas(self._filas, self._columnas, self._minas)
+        self._tablero = self._motor.obtener_estado()['tablero']
+
+    def mostrar_tablero(self):
+        for fila in self._tablero:
+            print(["M" if valor == -1 else valor for valor in fila])
 
+    # ----------------- Métodos privados -----------------
     def _crear_interfaz(self):
         frame = tk.Frame(self.master, bg="#d9d9d9")
         frame.pack(padx=10, pady=10)
@@ -88,41 +76,27 @@ class Buscaminas(JuegoConTablero):
     # ----------------- Lógica del juego -----------------
     def _revelar(self, f, c):
         boton = self._botones[(f, c)]
-        if self._tablero[f][c] == "M":
+        if not self._motor.revelar(f, c):
             boton.config(text="💣", bg="red", disabledforeground="black")
             self.fin_del_juego(False)  # polimorfismo
         else:
-            self._mostrar_celda(f, c)
-            if self._verificar_victoria():
+            # Sólo se repintan las celdas que abrió la jugada
+            for celda in self._motor.ultimas_reveladas:
+                self._mostrar_celda(*celda)
+            if self._motor.partida_ganada:
                 self.fin_del_juego(True)
 
     def _mostrar_celda(self, f, c):
         boton = self._botones[(f, c)]
-        if boton["state"] != "normal":
-            return
         valor = self._tablero[f][c]
         boton.config(relief="sunken", state="disabled", bg="#cccccc")
         if valor > 0:
             boton.config(text=str(valor), disabledforeground=self._colores.get(valor, "black"))
-        else:
-            for i in range(max(0, f-1), min(self._filas, f+2)):
-                for j in range(max(0, c-1), min(self._columnas, c+2)):
-                    if (i, j) != (f, c):
-                        self._mostrar_celda(i, j)
-
-    def _verificar_victoria(self):
-        for f in range(self._filas):
-            for c in range(self._columnas):
-                if self._tablero[f][c] != "M" and self._botones[(f, c)]["state"] == "normal":
-                    return False
-        return True
 
     # ----------------- Polimorfismo -----------------
     def fin_del_juego(self, victoria):
-        for f in range(self._filas):
-            for c in range(self._columnas):
-                if self._tablero[f][c] == "M":
-                    self._botones[(f, c)].config(text="💣", bg="#ff6666")
+        for f, c in self._motor.posiciones_minas:
+            self._botones[(f, c)].config(text="💣", bg="#ff6666")
         if victoria:
             messagebox.showinfo("Buscaminas", "¡Felicidades, ganaste! 🎉")
         else:
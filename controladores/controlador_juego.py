@@ -1,11 +1,18 @@
 # controladores/controlador_juego.py
 import time
-from interfaz import MinesweeperGame
+from datetime import datetime
+from modelos.logica_juego import Buscaminas
+from modelos.entidades import Partida
+from modelos.instantanea import empaquetar_capas
 
 class ControladorJuego:
-    def __init__(self, dao_partida):
+    def __init__(self, dao_partida, fabrica_tableros=None):
         self.dao_partida = dao_partida
+        # Reserva de tableros pregenerados por dificultad (opcional)
+        self._fabrica_tableros = fabrica_tableros
         self._juego_actual = None
+        self._dificultad = None
+        self._id_partida = None
         self.tiempo_inicio_juego = None
 
     @property
@@ -16,57 +23,124 @@ class ControladorJuego:
     def reiniciar_juego(self):
         """Reinicia el juego actual"""
         self._juego_actual = None
+        self._dificultad = None
+        self._id_partida = None
         self.tiempo_inicio_juego = None
 
-    def iniciar_nueva_partida(self, filas, columnas, minas, dificultad, usuario_id=None):
-        """Inicia una nueva partida de buscaminas"""
+    def _nueva_entidad_partida(self, usuario_id, dificultad, con_tablero=True):
+        """Partida lista para el DAO; sin tablero es el registro de inicio, de coste constante"""
+        juego = self._juego_actual
+        estado = juego.obtener_estado()
+        instantanea = None
+        if con_tablero:
+            # Directamente desde los buffers planos del motor, sin pasar por listas
+            instantanea = empaquetar_capas(
+                juego.filas, juego.columnas,
+                estado['tablero'].plana, estado['revelado'].plana, estado['banderas'].plana
+            )
+        return Partida(
+            id=None,
+            id_usuario=usuario_id,
+            dificultad=dificultad,
+            filas=juego.filas,
+            columnas=juego.columnas,
+            minas=juego.minas,
+            estado_tablero=None if con_tablero else [],
+            estado_revelado=None if con_tablero else [],
+            estado_banderas=None if con_tablero else [],
+            tiempo_inicio=datetime.fromtimestamp(self.tiempo_inicio_juego).isoformat(),
+            partida_ganada=juego.partida_ganada,
+            partida_terminada=juego.partida_terminada,
+            # Semilla (None si el tablero salió de la reserva) y primer click: con la
+            # topología reproducen el tablero aunque no se lea la instantánea
+            semilla=juego.semilla,
+            primer_click=list(juego.posicion_primer_click) if juego.posicion_primer_click else None,
+            instantanea=instantanea,
+            topologia=estado['topologia']
+        )
+
+    def iniciar_nueva_partida(self, filas, columnas, minas, dificultad, usuario_id=None, semilla=None):
+        """Inicia una nueva partida de buscaminas.
+
+        Con `semilla` el tablero es reproducible; sin ella se sortea por la ruta
+        rápida (reserva o NumPy) y la partida se reconstruye desde la instantánea
+        que se guarda al terminar.
+        """
         try:
-            self._juego_actual = MinesweeperGame(filas, columnas, minas)
+            # Motor común: el mismo camino rápido que las demás interfaces
+            self._juego_actual = Buscaminas(filas, columnas, minas, semilla=semilla, fabrica=self._fabrica_tableros)
+            self._dificultad = dificultad
+            self._id_partida = None
             self.tiempo_inicio_juego = time.time()
             
-            # Guardar información de la partida si hay usuario
+            # Sólo los metadatos: aún no hay minas, el tablero se guarda al terminar
             if usuario_id:
-                self.dao_partida.guardar_partida({
-                    'usuario_id': usuario_id,
-                    'dificultad': dificultad,
-                    'filas': filas,
-                    'columnas': columnas,
-                    'minas': minas,
-                    'fecha_inicio': self.tiempo_inicio_juego,
-                    'estado': 'en_curso'
-                })
+                self._id_partida = self.dao_partida.guardar(
+                    self._nueva_entidad_partida(usuario_id, dificultad, con_tablero=False)
+                )
             
             return True, "Juego iniciado correctamente"
         except Exception as e:
             return False, f"Error al iniciar juego: {str(e)}"
 
     def revelar_celda(self, fila, columna):
-        """Revela una celda del tablero"""
-        if not self._juego_actual:
+        """Revela una celda del tablero.
+
+        Devuelve (exito, juego_terminado); juego_terminado sólo es True en la jugada
+        que termina la partida: sobre una partida ya terminada no se hace nada.
+        """
+        if not self._juego_actual or self._juego_actual.partida_terminada:
             return False, False
         
         try:
-            exito = self._juego_actual.revelar_celda(fila, columna)
-            juego_terminado = self._juego_actual.juego_terminado
+            exito = self._juego_actual.revelar(fila, columna)
+            if not exito:
+                self._juego_actual.revelar_minas()
+            juego_terminado = self._juego_actual.partida_terminada
             
             return exito, juego_terminado
         except Exception as e:
             print(f"Error revelando celda: {e}")
             return False, False
 
+    def chord(self, fila, columna):
+        """Revela de una vez las vecinas de un número con todas sus banderas (mismo resultado que revelar_celda)"""
+        if not self._juego_actual or self._juego_actual.partida_terminada:
+            return False, False
+
+        try:
+            exito = self._juego_actual.chord(fila, columna)
+            if not exito:
+                self._juego_actual.revelar_minas()
+            juego_terminado = self._juego_actual.partida_terminada
+
+            return exito, juego_terminado
+        except Exception as e:
+            print(f"Error en chord: {e}")
+            return False, False
+
+    def celda_revelada(self, fila, columna):
+        """Indica si la celda ya está abierta (un click sobre ella es un chord)"""
+        return bool(self._juego_actual and self._juego_actual.obtener_estado()['revelado'][fila][columna])
+
     def alternar_bandera(self, fila, columna):
         """Coloca o quita una bandera en una celda"""
         if not self._juego_actual:
             return False
         
         try:
-            return self._juego_actual.alternar_bandera(fila, columna)
+            self._juego_actual.alternar_bandera(fila, columna)
+            return True
         except Exception as e:
             print(f"Error alternando bandera: {e}")
             return False
 
     def obtener_estado(self):
-        """Obtiene el estado actual del juego"""
+        """Obtiene el estado actual del juego.
+
+        Tablero, reveladas y banderas son vistas de sólo lectura del motor: no se
+        copian y siguen vivas; 'version' permite saber si han cambiado desde entonces.
+        """
         if not self._juego_actual:
             return {
                 'filas': 0,
@@ -77,18 +151,22 @@ class ControladorJuego:
                 'minas_restantes': 0,
                 'dificultad': 'No seleccionada',
                 'juego_terminado': False,
-                'partida_ganada': False
+                'partida_ganada': False,
+                'version': 0
             }
         
+        estado = self._juego_actual.obtener_estado()
         return {
-            'filas': self._juego_actual.filas,
-            'columnas': self._juego_actual.columnas,
-            'tablero': self._juego_actual.tablero,
-            'reveladas': self._juego_actual.reveladas,
-            'banderas': self._juego_actual.banderas,
-            'minas_restantes': self._juego_actual.minas_restantes,
-            'juego_terminado': self._juego_actual.juego_terminado,
-            'partida_ganada': self._juego_actual.partida_ganada
+            'filas': estado['filas'],
+            'columnas': estado['columnas'],
+            'tablero': estado['tablero'],
+            'reveladas': estado['revelado'],
+            'banderas': estado['banderas'],
+            'minas_restantes': estado['minas_restantes'],
+            'dificultad': self.obtener_dificultad(),
+            'juego_terminado': estado['partida_terminada'],
+            'partida_ganada': estado['partida_ganada'],
+            'version': estado['version']
         }
 
     def obtener_minas_restantes(self):
@@ -101,27 +179,20 @@ class ControladorJuego:
         """Obtiene la dificultad del juego actual"""
         if not self._juego_actual:
             return "No seleccionada"
-        return "Personalizada"  # O puedes pasar la dificultad como parámetro
+        return self._dificultad or "Personalizada"
 
     def guardar_partida_actual(self, usuario_id, resultado, duracion):
-        """Guarda la partida actual en la base de datos"""
+        """Guarda el tablero final y el resultado de la partida actual"""
         if not self._juego_actual or not self.tiempo_inicio_juego:
             return False
         
         try:
-            partida_data = {
-                'usuario_id': usuario_id,
-                'dificultad': self.obtener_dificultad(),
-                'filas': self._juego_actual.filas,
-                'columnas': self._juego_actual.columnas,
-                'minas': self._juego_actual.minas_totales,
-                'fecha_inicio': self.tiempo_inicio_juego,
-                'duracion': duracion,
-                'resultado': resultado,
-                'estado': 'completada'
-            }
-            
-            self.dao_partida.guardar_partida(partida_data)
+            partida = self._nueva_entidad_partida(usuario_id, self.obtener_dificultad())
+            if self._id_partida is None:
+                self._id_partida = self.dao_partida.guardar(partida)
+            self.dao_partida.actualizar_resultado_partida(
+                self._id_partida, resultado, duracion, partida.campos_tablero()
+            )
             return True
         except Exception as e:
             print(f"Error guardando partida: {e}")
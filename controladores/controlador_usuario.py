@@ -1,11 +1,10 @@
 # controladores/controlador_usuario.py
 from typing import Optional
-from modelos.basedatos_json import UsuarioDAO
 from modelos.entidades import Usuario
-from modelos.clases_abstractas import ControladorAbstracto
+from modelos.clases_abstractas import ControladorAbstracto, DAOAbstracto
 
 class ControladorUsuario(ControladorAbstracto):
-    def __init__(self, dao_usuario: UsuarioDAO):
+    def __init__(self, dao_usuario: DAOAbstracto):
         self._dao_usuario = dao_usuario
         self._usuario_actual: Optional[Usuario] = None
 
@@ -1,97 +1,115 @@
 import flet as ft
-import random
+
+from modelos.logica_juego import Buscaminas
+from modelos.fabrica_tableros import FabricaTableros
 
 
 class MinesweeperGame:
-    def __init__(self, rows: int, cols: int, mines: int):
+    """Adaptador delgado sobre el motor común (modelos.logica_juego.Buscaminas).
+
+    Conserva los nombres que usa esta UI; cada jugada corre sobre los buffers
+    planos del motor, y board/revealed/flagged son vistas vivas por filas.
+    """
+    def __init__(self, rows: int, cols: int, mines: int, debug_counters: bool = False, seed: int | None = None,
+                 board_pool: FabricaTableros | None = None):
         self.rows = rows
         self.cols = cols
         self.mines = mines
+        self.seed = seed
+        self.board_pool = board_pool
+        self.debug_counters = debug_counters
 
+        self.engine = Buscaminas(rows, cols, mines, verificar_contadores=debug_counters, semilla=seed,
+                                 fabrica=board_pool)
+        state = self.engine.obtener_estado()
         # -1 = mina, 0..8 = número de minas alrededor
-        self.board = [[0 for _ in range(cols)] for _ in range(rows)]
-        self.revealed = [[False for _ in range(cols)] for _ in range(rows)]
-        self.flagged = [[False for _ in range(cols)] for _ in range(rows)]
+        self.board = state['tablero']
+        self.revealed = state['revelado']
+        self.flagged = state['banderas']
+        # La UI marca la derrota por su cuenta después de un reveal que devuelve False
+        self._game_over = False
 
-        self.game_over = False
-        self.game_won = False
-        self.first_click = True
+    @property
+    def game_over(self) -> bool:
+        return self._game_over or (self.engine.partida_terminada and not self.engine.partida_ganada)
 
-        # Sin colocar minas aún: primera jugada segura
-        self.mine_positions: list[tuple[int, int]] = []
+    @game_over.setter
+    def game_over(self, value: bool):
+        self._game_over = value
 
-    # Mantener por compatibilidad (no coloca minas hasta el primer click)
-    def place_mines(self):
-        self.mine_positions = []
+    @property
+    def game_won(self) -> bool:
+        return self.engine.partida_ganada
 
-    def place_mines_after_first_click(self, first_row: int, first_col: int):
-        positions = [(r, c) for r in range(self.rows) for c in range(self.cols)]
-        # Evitar que la primera celda sea mina
-        if (first_row, first_col) in positions:
-            positions.remove((first_row, first_col))
+    @property
+    def first_click(self) -> bool:
+        return not self.engine.minas_colocadas
+
+    @property
+    def first_click_pos(self) -> tuple[int, int] | None:
+        return self.engine.posicion_primer_click
 
-        self.mine_positions = random.sample(positions, self.mines)
+    @property
+    def mine_positions(self) -> list[tuple[int, int]]:
+        return self.engine.posiciones_minas
 
-        # Reiniciar tablero de números
-        self.board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
+    @property
+    def last_revealed(self) -> list[tuple[int, int]]:
+        return self.engine.ultimas_reveladas
 
-        # Colocar minas
-        for r, c in self.mine_positions:
-            self.board[r][c] = -1
+    @property
+    def revealed_safe(self) -> int:
+        return self.engine.seguras_reveladas
 
-        # Calcular conteos
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.board[r][c] != -1:
-                    self.board[r][c] = self.count_adjacent_mines(r, c)
+    @property
+    def flag_count(self) -> int:
+        return self.engine.banderas_colocadas
+
+    # Mantener por compatibilidad (no coloca minas hasta el primer click)
+    def place_mines(self):
+        pass
+
+    def place_mines_after_first_click(self, first_row: int, first_col: int):
+        self.engine.colocar_minas(first_row, first_col)
+
+    def is_mine(self, row: int, col: int) -> bool:
+        """Pertenencia O(1): el tablero plano del motor hace de mapa de bits de minas"""
+        return self.engine.es_mina(row, col)
 
     def count_adjacent_mines(self, row: int, col: int) -> int:
-        count = 0
-        for dr in (-1, 0, 1):
-            for dc in (-1, 0, 1):
-                if dr == 0 and dc == 0:
-                    continue
-                nr, nc = row + dr, col + dc
-                if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                    if self.board[nr][nc] == -1:
-                        count += 1
-        return count
+        return sum(
+            1
+            for nr in range(max(0, row - 1), min(self.rows, row + 2))
+            for nc in range(max(0, col - 1), min(self.cols, col + 2))
+            if (nr, nc) != (row, col) and self.is_mine(nr, nc)
+        )
 
     def reveal(self, row: int, col: int) -> bool:
-        if self.first_click:
-            self.place_mines_after_first_click(row, col)
-            self.first_click = False
-
-        # Click en mina
-        if (row, col) in self.mine_positions:
-            return False
+        return self.engine.revelar(row, col)
 
-        if not self.revealed[row][col] and not self.flagged[row][col]:
-            self.revealed[row][col] = True
+    def flood_reveal(self, row: int, col: int) -> list[tuple[int, int]]:
+        """Abre la celda (y su región si es un 0); devuelve las celdas abiertas"""
+        self.engine.revelar(row, col)
+        return self.last_revealed
 
-            # Si es un 0, expandir región (flood fill DFS)
-            if self.board[row][col] == 0:
-                for dr in (-1, 0, 1):
-                    for dc in (-1, 0, 1):
-                        nr, nc = row + dr, col + dc
-                        if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                            if not self.revealed[nr][nc] and not self.flagged[nr][nc]:
-                                self.reveal(nr, nc)
+    def chord(self, row: int, col: int) -> bool:
+        return self.engine.chord(row, col)
 
-        self.check_win()
-        return True
+    def reveal_mines(self) -> list[tuple[int, int]]:
+        return self.engine.revelar_minas()
 
     def toggle_flag(self, row: int, col: int) -> None:
-        if not self.revealed[row][col]:
-            self.flagged[row][col] = not self.flagged[row][col]
-            self.check_win()
+        self.engine.alternar_bandera(row, col)
 
     def check_win(self) -> None:
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.board[r][c] != -1 and not self.revealed[r][c]:
-                    return
-        self.game_won = True
+        self.engine.verificar_victoria()
+
+    def validate_counters(self) -> None:
+        self.engine.comprobar_contadores()
+
+    @property
+    def mines_left(self) -> int:
+        return self.engine.minas_restantes
 
 
 def main(page: ft.Page):
@@ -116,23 +134,27 @@ def main(page: ft.Page):
         run_spacing=2,
     )
 
+    def play_cell(row: int, col: int):
+        if current_game and not current_game.game_over and not current_game.game_won:
+            # Click sobre un número ya abierto: chord (abre las vecinas de golpe)
+            play = current_game.chord if current_game.revealed[row][col] else current_game.reveal
+            if not play(row, col):
+                current_game.game_over = True
+                status_message.value = "\U0001F4A5 ¡Perdiste! Haz click en 'Continuar' para jugar de nuevo"
+                status_message.color = "red"
+                reveal_all_mines()
+            else:
+                status_message.value = "¡Sigue así!"
+                status_message.color = "green"
+            update_display()
+            if current_game.game_won:
+                status_message.value = "\U0001F389 ¡Ganaste! ¡Felicidades!"
+                status_message.color = "green"
+                page.update()
+
     def create_cell_button(row: int, col: int) -> ft.Container:
         def on_click(_):
-            nonlocal status_message
-            if current_game and not current_game.game_over and not current_game.game_won:
-                if not current_game.reveal(row, col):
-                    current_game.game_over = True
-                    status_message.value = "\U0001F4A5 ¡Perdiste! Haz click en 'Continuar' para jugar de nuevo"
-                    status_message.color = "red"
-                    reveal_all_mines()
-                else:
-                    status_message.value = "¡Sigue así!"
-                    status_message.color = "green"
-                update_display()
-                if current_game.game_won:
-                    status_message.value = "\U0001F389 ¡Ganaste! ¡Felicidades!"
-                    status_message.color = "green"
-                    page.update()
+            play_cell(row, col)
 
         def on_long_press(_):
             if current_game and not current_game.game_over and not current_game.game_won:
@@ -189,6 +211,8 @@ def main(page: ft.Page):
                         bgcolor=bgcolor,
                         border=ft.border.all(1, "grey400"),
                         border_radius=2,
+                        # Los números abiertos aceptan click para hacer chord
+                        on_click=(lambda _, r=r, c=c: play_cell(r, c)) if value > 0 else None,
                     )
                 else:
                     # Celda oculta
@@ -209,16 +233,14 @@ def main(page: ft.Page):
 
     def update_mines_counter():
         if current_game:
-            flagged_count = sum(sum(1 for v in row if v) for row in current_game.flagged)
-            mines_counter.value = f"Minas: {current_game.mines - flagged_count}"
+            mines_counter.value = f"Minas: {current_game.mines_left}"
         else:
             mines_counter.value = "Minas: 0"
         page.update()
 
     def reveal_all_mines():
         if current_game:
-            for r, c in current_game.mine_positions:
-                current_game.revealed[r][c] = True
+            current_game.reveal_mines()
             update_display()
 
     def start_new_game(rows: int, cols: int, mines: int, difficulty: str):
@@ -1,7 +1,10 @@
 # main.py
 import flet as ft
+import os
 import time
 from modelos.basedatos_json import BaseDatosJSON, UsuarioDAO, PartidaDAO
+from modelos.basedatos_sqlite import BaseDatosSQLite, SQLiteUsuarioDAO, SQLitePartidaDAO, migrar_desde_json
+from modelos.fabrica_tableros import FabricaTableros
 from controladores.controlador_usuario import ControladorUsuario
 from controladores.controlador_juego import ControladorJuego
 from vistas.vista_juego import VistaJuego
@@ -9,15 +12,26 @@ from vistas.vista_estadisticas import VistaEstadisticas
 from vistas.vista_inicio_sesion import VistaInicioSesion
 
 class AplicacionBuscaminas:
-    def __init__(self):
-        # Inicializar base de datos JSON
-        self.base_datos_json = BaseDatosJSON()
-        self.dao_usuario = UsuarioDAO(self.base_datos_json)
-        self.dao_partida = PartidaDAO(self.base_datos_json)
+    def __init__(self, almacenamiento: str = "json"):
+        # Inicializar base de datos: "json" (archivos en datos/) o "sqlite" (datos/buscaminas.db)
+        if almacenamiento == "sqlite":
+            self.base_datos = BaseDatosSQLite(os.path.join("datos", "buscaminas.db"))
+            if self.base_datos.esta_vacia():
+                # Primer arranque con SQLite: se traen los datos de los JSON existentes
+                migrar_desde_json(self.base_datos, "datos")
+            self.dao_usuario = SQLiteUsuarioDAO(self.base_datos)
+            self.dao_partida = SQLitePartidaDAO(self.base_datos)
+        else:
+            self.base_datos = BaseDatosJSON(diario_partidas=True)
+            self.dao_usuario = UsuarioDAO(self.base_datos)
+            self.dao_partida = PartidaDAO(self.base_datos)
+        
+        # Tableros pregenerados en segundo plano para cada dificultad
+        self.fabrica_tableros = FabricaTableros([(8, 8, 10), (12, 12, 30), (16, 16, 60)])
         
         # Inicializar controladores
         self.controlador_usuario = ControladorUsuario(self.dao_usuario)
-        self.controlador_juego = ControladorJuego(self.dao_partida)
+        self.controlador_juego = ControladorJuego(self.dao_partida, self.fabrica_tableros)
         
         # Inicializar vistas
         self.vista_juego = VistaJuego()
@@ -224,27 +238,29 @@ class AplicacionBuscaminas:
     def manejar_click_celda(self, fila: int, columna: int):
         """Maneja el click en una celda"""
         try:
-            exito, juego_terminado = self.controlador_juego.revelar_celda(fila, columna)
+            # Un click sobre una celda ya abierta es un chord: una sola llamada y un solo repintado
+            if self.controlador_juego.celda_revelada(fila, columna):
+                exito, juego_terminado = self.controlador_juego.chord(fila, columna)
+            else:
+                exito, juego_terminado = self.controlador_juego.revelar_celda(fila, columna)
             
+            # juego_terminado sólo llega en la jugada que termina la partida: las
+            # estadísticas y el guardado se hacen una vez, no en cada click posterior
             if juego_terminado:
-                if self.controlador_juego.juego_actual.partida_ganada:
+                ganada = self.controlador_juego.juego_actual.partida_ganada
+                if ganada:
                     self.vista_juego.actualizar_mensaje_estado("¡Felicidades! Has ganado el juego.", "green")
-                    
-                    # Actualizar estadísticas del usuario
-                    if self.controlador_usuario.usuario_actual and self.controlador_juego.tiempo_inicio_juego:
-                        duracion = int(time.time() - self.controlador_juego.tiempo_inicio_juego)
-                        self.controlador_usuario.actualizar_estadisticas_usuario(
-                            True, duracion, self.controlador_juego.obtener_dificultad()
-                        )
                 else:
                     self.vista_juego.actualizar_mensaje_estado("¡Game Over! Has pisado una mina.", "red")
-                    
-                    # Actualizar estadísticas del usuario
-                    if self.controlador_usuario.usuario_actual and self.controlador_juego.tiempo_inicio_juego:
-                        duracion = int(time.time() - self.controlador_juego.tiempo_inicio_juego)
-                        self.controlador_usuario.actualizar_estadisticas_usuario(
-                            False, duracion, self.controlador_juego.obtener_dificultad()
-                        )
+                
+                # Actualizar estadísticas del usuario y guardar el tablero final
+                usuario = self.controlador_usuario.usuario_actual
+                if usuario and self.controlador_juego.tiempo_inicio_juego:
+                    duracion = int(time.time() - self.controlador_juego.tiempo_inicio_juego)
+                    self.controlador_usuario.actualizar_estadisticas_usuario(
+                        ganada, duracion, self.controlador_juego.obtener_dificultad()
+                    )
+                    self.controlador_juego.guardar_partida_actual(usuario.id, ganada, duracion)
             
             # Actualizar contador de minas y grid
             if self.controlador_juego.juego_actual:
@@ -271,6 +287,8 @@ class AplicacionBuscaminas:
 
     def salir_aplicacion(self, e):
         """Cierra la aplicación"""
+        # Los cambios en caché se vuelcan ya, sin esperar al temporizador ni a atexit
+        self.base_datos.vaciar()
         self.vista_juego.actualizar_mensaje_estado("Para salir, cierre la ventana del navegador", "orange")
         self.pagina.update()
 
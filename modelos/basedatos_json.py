@@ -1,10 +1,15 @@
 # modelos/basedatos_json.py
+import atexit
 import json
 import os
+import shutil
+import tempfile
+import threading
 from typing import List, Optional, Dict, Any, Iterator
 from datetime import datetime
 from modelos.entidades import Usuario, Partida
 from modelos.clases_abstractas import DAOAbstracto
+from modelos.clasificacion import Clasificacion, campo_mejor_tiempo, mejor_tiempo_guardado
 
 class ExcepcionBaseDatos(Exception):
     """Excepción personalizada para errores de base de datos"""
@@ -26,12 +31,231 @@ class IteradorUsuarios:
         self.indice += 1
         return usuario
 
+def _volcar(archivo: str, datos: Dict[str, Any]):
+    """Escritura atómica: temporal en el mismo directorio, fsync y os.replace"""
+    descriptor, temporal = tempfile.mkstemp(
+        dir=os.path.dirname(archivo) or '.', prefix=os.path.basename(archivo) + '.', suffix='.tmp'
+    )
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, archivo)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
+
+class DiarioJSONL:
+    """Tabla persistida como instantánea JSON más un diario append-only (una línea JSON por cambio).
+
+    Cada alta o cambio es una sola escritura pequeña al final del diario. Al
+    arrancar se carga la instantánea y se reproducen encima las líneas del
+    diario. Cuando el diario pasa de `umbral_compactacion` bytes se rota y
+    un hilo en segundo plano escribe una instantánea nueva; si el proceso
+    muere a medias, el diario rotado sigue en disco y se reproduce en el
+    siguiente arranque (reproducirlo dos veces da el mismo estado).
+    """
+    def __init__(self, archivo_instantanea: str, umbral_compactacion: int = 4 * 1024 * 1024,
+                 sincronizar: bool = False):
+        self._archivo_instantanea = archivo_instantanea
+        self._archivo_diario = os.path.splitext(archivo_instantanea)[0] + ".jsonl"
+        self._archivo_rotado = self._archivo_diario + ".compactando"
+        self._umbral_compactacion = umbral_compactacion
+        # Con sincronizar cada línea se confirma con fsync (más lento, sobrevive a un corte de luz)
+        self._sincronizar = sincronizar
+        self._cerrojo = threading.RLock()
+        self._compactacion: Optional[threading.Thread] = None
+        # Tamaño del diario que dispara la compactación; tras un fallo se aplaza otro umbral
+        self._limite_compactacion = umbral_compactacion
+        self.datos = self._recuperar()
+        self._archivo = open(self._archivo_diario, 'a', encoding='utf-8')
+
+    @staticmethod
+    def _aplicar(datos: Dict[str, Any], registro: Dict[str, Any]):
+        # Los cambios crean un diccionario nuevo en vez de mutar el anterior, así una
+        # copia superficial de `datos` es una instantánea coherente
+        clave = registro['clave']
+        if registro['op'] == 'alta':
+            datos[clave] = registro['datos']
+        else:
+            datos[clave] = {**datos.get(clave, {}), **registro['datos']}
+
+    def _reproducir(self, datos: Dict[str, Any], archivo: str):
+        if not os.path.exists(archivo):
+            return
+        with open(archivo, 'rb') as f:
+            contenido = f.read()
+        lineas = contenido.splitlines(keepends=True)
+        for numero, linea in enumerate(lineas, 1):
+            try:
+                registro = json.loads(linea)
+            except ValueError as e:  # JSON incompleto o un carácter UTF-8 partido
+                # Una última línea cortada es una escritura que no llegó a completarse: se
+                # recorta para que las líneas que se añadan después no queden pegadas a ella
+                if numero == len(lineas):
+                    with open(archivo, 'r+b') as f:
+                        f.truncate(len(contenido) - len(linea))
+                    break
+                raise ExcepcionBaseDatos(f"Diario corrupto en {archivo}:{numero}: {e}")
+            self._aplicar(datos, registro)
+        else:
+            if contenido and not contenido.endswith(b'\n'):
+                with open(archivo, 'ab') as f:
+                    f.write(b'\n')
+
+    def _recuperar(self) -> Dict[str, Any]:
+        """Instantánea + diario rotado (si una compactación quedó a medias) + diario actual"""
+        try:
+            with open(self._archivo_instantanea, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except FileNotFoundError:
+            datos = {}
+        except json.JSONDecodeError as e:
+            raise ExcepcionBaseDatos(f"Error al leer {self._archivo_instantanea}: {e}")
+
+        self._reproducir(datos, self._archivo_rotado)
+        self._reproducir(datos, self._archivo_diario)
+        if os.path.exists(self._archivo_rotado):
+            # Aún no hay otros hilos: se termina aquí la compactación interrumpida
+            # Primero se borra el rotado: si quedara sin el actual, reproduciría valores antiguos
+            try:
+                _volcar(self._archivo_instantanea, datos)
+                os.remove(self._archivo_rotado)
+                open(self._archivo_diario, 'w').close()
+            except OSError:
+                # Sin poder escribir ahora, el rotado vuelve al diario y se compactará más adelante
+                self._unir_rotado()
+        return datos
+
+    def _anotar(self, registro: Dict[str, Any]):
+        linea = json.dumps(registro, ensure_ascii=False, separators=(',', ':')) + "\n"
+        with self._cerrojo:
+            try:
+                self._archivo.write(linea)
+                self._archivo.flush()
+                if self._sincronizar:
+                    os.fsync(self._archivo.fileno())
+            except Exception as e:
+                raise ExcepcionBaseDatos(f"Error al escribir en el diario: {e}")
+            self._aplicar(self.datos, registro)
+            if self._archivo.tell() >= self._limite_compactacion and self._compactacion is None:
+                self._compactacion = threading.Thread(target=self._compactar_en_segundo_plano, daemon=True)
+                self._compactacion.start()
+
+    def alta(self, clave: str, datos: Dict[str, Any]):
+        """Inserta o sustituye un registro completo"""
+        self._anotar({'op': 'alta', 'clave': clave, 'datos': datos})
+
+    def cambio(self, clave: str, campos: Dict[str, Any]):
+        """Actualiza sólo algunos campos de un registro"""
+        self._anotar({'op': 'cambio', 'clave': clave, 'datos': campos})
+
+    def compactar(self):
+        """Rota el diario y escribe una instantánea con todo lo anotado hasta ese momento.
+
+        Si algo falla, el diario rotado se vuelve a unir al actual (no queda un
+        `.compactando` que bloquee las compactaciones siguientes) y el siguiente
+        intento se aplaza hasta que el diario crezca otro umbral.
+        """
+        try:
+            with self._cerrojo:
+                if os.path.exists(self._archivo_rotado):
+                    return  # Ya hay otra compactación en curso
+                # Sólo esto bloquea a las escrituras: la serialización va fuera del cerrojo
+                self._archivo.close()
+                os.replace(self._archivo_diario, self._archivo_rotado)
+                self._archivo = open(self._archivo_diario, 'a', encoding='utf-8')
+                instantanea = dict(self.datos)
+            _volcar(self._archivo_instantanea, instantanea)
+            os.remove(self._archivo_rotado)
+            with self._cerrojo:
+                self._limite_compactacion = self._umbral_compactacion
+        except BaseException:
+            with self._cerrojo:
+                if not self._archivo.closed:
+                    self._archivo.close()
+                self._unir_rotado()
+                self._archivo = open(self._archivo_diario, 'a', encoding='utf-8')
+                self._limite_compactacion = self._tamano_diario() + self._umbral_compactacion
+            raise
+        finally:
+            with self._cerrojo:
+                if self._compactacion is threading.current_thread():
+                    self._compactacion = None
+
+    def _compactar_en_segundo_plano(self):
+        try:
+            self.compactar()
+        except Exception:
+            # Nadie espera a este hilo: el diario sigue completo y el reintento ya está aplazado
+            pass
+
+    def _unir_rotado(self):
+        """Deshace una rotación: diario rotado + líneas nuevas vuelven a ser el diario.
+
+        Se llama sin el diario abierto. El orden de las líneas se conserva, y si
+        la instantánea llegó a escribirse reproducirlas otra vez da el mismo estado.
+        """
+        if not os.path.exists(self._archivo_rotado):
+            return
+        if os.path.exists(self._archivo_diario):
+            with open(self._archivo_rotado, 'ab') as rotado, open(self._archivo_diario, 'rb') as nuevas:
+                shutil.copyfileobj(nuevas, rotado)
+        os.replace(self._archivo_rotado, self._archivo_diario)
+
+    def _tamano_diario(self) -> int:
+        self._archivo.seek(0, os.SEEK_END)
+        return self._archivo.tell()
+
+    def cerrar(self):
+        """Espera a una compactación en curso y cierra el diario"""
+        compactacion = self._compactacion
+        if compactacion is not None:
+            compactacion.join()
+        with self._cerrojo:
+            self._archivo.close()
+
 class BaseDatosJSON:
-    def __init__(self, ruta_base_datos: str = "datos"):
+    """Archivos JSON con caché en memoria y escritura diferida (write-back).
+
+    Cada archivo se lee una sola vez; las lecturas se sirven desde la caché.
+    Las escrituras marcan el archivo como sucio y se vuelcan al disco pasados
+    `intervalo_vaciado` segundos, al llamar a `vaciar()` o al cerrar el
+    proceso. Cada volcado escribe un temporal y lo sustituye con os.replace,
+    así que el archivo nunca queda a medio escribir. Con intervalo 0 cada
+    escritura se vuelca en el acto.
+
+    Los IDs salen de una secuencia por tabla guardada en secuencias.json
+    (ver `siguiente_id`).
+
+    Con `diario_partidas` las partidas no se reescriben enteras: cada alta o
+    cambio se anota en partidas.jsonl (ver DiarioJSONL) y partidas.json pasa
+    a ser la instantánea que mantiene la compactación.
+    """
+    def __init__(self, ruta_base_datos: str = "datos", intervalo_vaciado: float = 1.0,
+                 diario_partidas: bool = False, umbral_compactacion: int = 4 * 1024 * 1024):
         self._ruta_base_datos = ruta_base_datos
         self._archivo_usuarios = os.path.join(ruta_base_datos, "usuarios.json")
         self._archivo_partidas = os.path.join(ruta_base_datos, "partidas.json")
+        self._archivo_secuencias = os.path.join(ruta_base_datos, "secuencias.json")
+        self._tablas = {'usuarios': self._archivo_usuarios, 'partidas': self._archivo_partidas}
+        self._secuencias_recuperadas = set()
+        self._intervalo_vaciado = intervalo_vaciado
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._sucios = set()
+        # Los DAO hacen leer-modificar-escribir bajo este cerrojo; el volcado en segundo plano también lo toma
+        self._cerrojo = threading.RLock()
+        self._temporizador: Optional[threading.Timer] = None
         self._inicializar_base_datos()
+        self._diario: Optional[DiarioJSONL] = None
+        if diario_partidas:
+            self._diario = DiarioJSONL(self._archivo_partidas, umbral_compactacion)
+            self._cache[self._archivo_partidas] = self._diario.datos
+        atexit.register(self.cerrar)
 
     def _inicializar_base_datos(self):
         """Inicializa la base de datos JSON"""
@@ -40,72 +264,191 @@ class BaseDatosJSON:
             if not os.path.exists(self._ruta_base_datos):
                 os.makedirs(self._ruta_base_datos)
             
-            # Crear archivo de usuarios si no existe
-            if not os.path.exists(self._archivo_usuarios):
-                with open(self._archivo_usuarios, 'w', encoding='utf-8') as f:
-                    json.dump({}, f, ensure_ascii=False, indent=2)
-            
-            # Crear archivo de partidas si no existe
-            if not os.path.exists(self._archivo_partidas):
-                with open(self._archivo_partidas, 'w', encoding='utf-8') as f:
-                    json.dump({}, f, ensure_ascii=False, indent=2)
+            # Crear los archivos que falten
+            for archivo in (self._archivo_usuarios, self._archivo_partidas):
+                if not os.path.exists(archivo):
+                    _volcar(archivo, {})
         except Exception as e:
             raise ExcepcionBaseDatos(f"Error al inicializar base de datos: {e}")
 
+    def _leer(self, archivo: str, que: str) -> Dict[str, Any]:
+        """Diccionario en caché del archivo (compartido, no una copia); se carga la primera vez"""
+        with self._cerrojo:
+            datos = self._cache.get(archivo)
+            if datos is None:
+                try:
+                    with open(archivo, 'r', encoding='utf-8') as f:
+                        datos = json.load(f)
+                except (json.JSONDecodeError, FileNotFoundError) as e:
+                    raise ExcepcionBaseDatos(f"Error al leer {que}: {e}")
+                self._cache[archivo] = datos
+            return datos
+
+    def _escribir(self, archivo: str, datos: Dict[str, Any]):
+        """Actualiza la caché y deja el volcado al disco para más tarde"""
+        with self._cerrojo:
+            self._cache[archivo] = datos
+            self._sucios.add(archivo)
+            if self._intervalo_vaciado <= 0:
+                self.vaciar()
+            elif self._temporizador is None:
+                self._temporizador = threading.Timer(self._intervalo_vaciado, self.vaciar)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def vaciar(self):
+        """Vuelca al disco los archivos con cambios pendientes"""
+        with self._cerrojo:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+            for archivo in sorted(self._sucios):
+                try:
+                    _volcar(archivo, self._cache[archivo])
+                except Exception as e:
+                    # Sigue sucio: se reintenta en el próximo volcado
+                    raise ExcepcionBaseDatos(f"Error al escribir {os.path.basename(archivo)}: {e}")
+                self._sucios.discard(archivo)
+
+    def cerrar(self):
+        """Vuelca lo pendiente; se registra con atexit para no perder cambios al salir"""
+        self.vaciar()
+        if self._diario is not None:
+            self._diario.cerrar()
+        atexit.unregister(self.cerrar)
+
+    @property
+    def cambios_pendientes(self) -> bool:
+        return bool(self._sucios)
+
     def _leer_usuarios(self) -> Dict[str, Any]:
-        """Lee todos los usuarios del archivo JSON"""
-        try:
-            with open(self._archivo_usuarios, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            raise ExcepcionBaseDatos(f"Error al leer usuarios: {e}")
+        """Lee todos los usuarios (desde la caché)"""
+        return self._leer(self._archivo_usuarios, "usuarios")
 
     def _escribir_usuarios(self, usuarios: Dict[str, Any]):
-        """Escribe usuarios en el archivo JSON"""
-        try:
-            with open(self._archivo_usuarios, 'w', encoding='utf-8') as f:
-                json.dump(usuarios, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            raise ExcepcionBaseDatos(f"Error al escribir usuarios: {e}")
+        """Escribe usuarios en la caché; el archivo se actualiza con el próximo volcado"""
+        self._escribir(self._archivo_usuarios, usuarios)
 
     def _leer_partidas(self) -> Dict[str, Any]:
-        """Lee todas las partidas del archivo JSON"""
-        try:
-            with open(self._archivo_partidas, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            raise ExcepcionBaseDatos(f"Error al leer partidas: {e}")
+        """Lee todas las partidas (desde la caché)"""
+        return self._leer(self._archivo_partidas, "partidas")
 
     def _escribir_partidas(self, partidas: Dict[str, Any]):
-        """Escribe partidas en el archivo JSON"""
-        try:
-            with open(self._archivo_partidas, 'w', encoding='utf-8') as f:
-                json.dump(partidas, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            raise ExcepcionBaseDatos(f"Error al escribir partidas: {e}")
+        """Escribe partidas en la caché; el archivo se actualiza con el próximo volcado"""
+        self._escribir(self._archivo_partidas, partidas)
+
+    def siguiente_id(self, tabla: str) -> int:
+        """Reserva el siguiente ID de `tabla` ('usuarios' o 'partidas'): O(1), creciente y seguro entre hilos.
+
+        El último ID de cada tabla se guarda en secuencias.json con el resto de
+        cambios diferidos. Al usar una tabla por primera vez la secuencia se
+        recupera como el máximo entre lo guardado y el mayor ID presente, así
+        que un cierre brusco entre volcados nunca repite un ID ya escrito.
+        """
+        with self._cerrojo:
+            if self._archivo_secuencias not in self._cache:
+                try:
+                    with open(self._archivo_secuencias, 'r', encoding='utf-8') as f:
+                        self._cache[self._archivo_secuencias] = json.load(f)
+                except FileNotFoundError:
+                    self._cache[self._archivo_secuencias] = {}
+                except json.JSONDecodeError as e:
+                    raise ExcepcionBaseDatos(f"Error al leer secuencias: {e}")
+            secuencias = self._cache[self._archivo_secuencias]
+
+            if tabla not in self._secuencias_recuperadas:
+                datos = self._leer(self._tablas[tabla], tabla)
+                secuencias[tabla] = max(secuencias.get(tabla, 0), max(map(int, datos), default=0))
+                self._secuencias_recuperadas.add(tabla)
+
+            secuencias[tabla] += 1
+            self._escribir(self._archivo_secuencias, secuencias)
+            return secuencias[tabla]
+
+    def _insertar_partida(self, clave: str, datos_partida: Dict[str, Any]):
+        """Alta de una partida: una línea en el diario o una escritura diferida del archivo"""
+        with self._cerrojo:
+            if self._diario is not None:
+                self._diario.alta(clave, datos_partida)
+            else:
+                partidas = self._leer_partidas()
+                partidas[clave] = datos_partida
+                self._escribir_partidas(partidas)
+
+    def _actualizar_partida(self, clave: str, campos: Dict[str, Any]) -> bool:
+        """Cambia algunos campos de una partida existente; False si no existe"""
+        with self._cerrojo:
+            partidas = self._leer_partidas()
+            if clave not in partidas:
+                return False
+            if self._diario is not None:
+                self._diario.cambio(clave, campos)
+            else:
+                partidas[clave].update(campos)
+                self._escribir_partidas(partidas)
+            return True
+
+def clave_nombre_usuario(nombre_usuario: str) -> str:
+    """Clave de búsqueda sin distinguir mayúsculas (casefold también pliega 'ß' y similares)"""
+    return nombre_usuario.casefold()
 
 class UsuarioDAO(DAOAbstracto):
     def __init__(self, base_datos: BaseDatosJSON):
         self._base_datos = base_datos
+        # Estructuras derivadas del diccionario en caché; se rehacen si éste cambia
+        self._usuarios_indexados: Optional[Dict[str, Any]] = None
+        # Nombre (casefold) -> clave del usuario
+        self._indice_nombres: Optional[Dict[str, str]] = None
+        # Campo de mejor tiempo -> Clasificacion, creadas al consultarlas por primera vez
+        self._clasificaciones: Dict[str, Clasificacion] = {}
+
+    def _usuarios(self) -> Dict[str, Any]:
+        """Usuarios en caché; llamar con el cerrojo de la base de datos tomado"""
+        usuarios = self._base_datos._leer_usuarios()
+        if usuarios is not self._usuarios_indexados:
+            self._usuarios_indexados = usuarios
+            self._indice_nombres = None
+            self._clasificaciones = {}
+        return usuarios
+
+    def _indice(self) -> Dict[str, str]:
+        usuarios = self._usuarios()
+        if self._indice_nombres is None:
+            indice = {}
+            for clave, datos_usuario in usuarios.items():
+                # Con nombres repetidos gana el primero, como hacía la búsqueda lineal
+                indice.setdefault(clave_nombre_usuario(datos_usuario['nombre_usuario']), clave)
+            self._indice_nombres = indice
+        return self._indice_nombres
+
+    def _clasificacion(self, campo_mejor_tiempo: str) -> Clasificacion:
+        usuarios = self._usuarios()
+        clasificacion = self._clasificaciones.get(campo_mejor_tiempo)
+        if clasificacion is None:
+            marcas = ((int(clave), mejor_tiempo_guardado(datos_usuario, campo_mejor_tiempo))
+                      for clave, datos_usuario in usuarios.items())
+            clasificacion = Clasificacion((id_usuario, tiempo) for id_usuario, tiempo in marcas if tiempo is not None)
+            self._clasificaciones[campo_mejor_tiempo] = clasificacion
+        return clasificacion
 
     def guardar(self, usuario: Usuario) -> int:
         """Crea un nuevo usuario"""
-        usuarios = self._base_datos._leer_usuarios()
-        
-        # Generar ID único
-        ids_usuarios = [int(uid) for uid in usuarios.keys()] if usuarios else [0]
-        nuevo_id = max(ids_usuarios) + 1 if ids_usuarios else 1
+        with self._base_datos._cerrojo:
+            usuarios = self._base_datos._leer_usuarios()
+            nuevo_id = self._base_datos.siguiente_id('usuarios')
         
-        # Convertir usuario a dict
-        dict_usuario = usuario.a_diccionario()
-        dict_usuario['id'] = nuevo_id
-        dict_usuario['fecha_creacion'] = datetime.now().isoformat()
+            # Convertir usuario a dict
+            dict_usuario = usuario.a_diccionario()
+            dict_usuario['id'] = nuevo_id
+            dict_usuario['fecha_creacion'] = datetime.now().isoformat()
         
-        # Guardar usuario
-        usuarios[str(nuevo_id)] = dict_usuario
-        self._base_datos._escribir_usuarios(usuarios)
+            # Guardar usuario
+            indice = self._indice()
+            usuarios[str(nuevo_id)] = dict_usuario
+            indice.setdefault(clave_nombre_usuario(dict_usuario['nombre_usuario']), str(nuevo_id))
+            self._base_datos._escribir_usuarios(usuarios)
         
-        return nuevo_id
+            return nuevo_id
 
     def obtener_por_id(self, id_usuario: int) -> Optional[Usuario]:
         """Obtiene un usuario por ID"""
@@ -117,58 +460,68 @@ class UsuarioDAO(DAOAbstracto):
         return None
 
     def obtener_usuario_por_nombre(self, nombre_usuario: str) -> Optional[Usuario]:
-        """Obtiene un usuario por nombre de usuario"""
-        usuarios = self._base_datos._leer_usuarios()
-        
-        for datos_usuario in usuarios.values():
-            if datos_usuario['nombre_usuario'].lower() == nombre_usuario.lower():
-                return Usuario.desde_diccionario(datos_usuario)
-        
-        return None
+        """Obtiene un usuario por nombre de usuario (sin distinguir mayúsculas, O(1) por índice)"""
+        with self._base_datos._cerrojo:
+            clave = self._indice().get(clave_nombre_usuario(nombre_usuario))
+            if clave is None:
+                return None
+            return Usuario.desde_diccionario(self._base_datos._leer_usuarios()[clave])
 
     def actualizar_estadisticas_usuario(self, id_usuario: int, partida_ganada: bool, duracion: int, dificultad: str):
         """Actualiza las estadísticas del usuario después de una partida"""
-        usuarios = self._base_datos._leer_usuarios()
-        clave_usuario = str(id_usuario)
+        with self._base_datos._cerrojo:
+            usuarios = self._base_datos._leer_usuarios()
+            clave_usuario = str(id_usuario)
         
-        if clave_usuario in usuarios:
-            datos_usuario = usuarios[clave_usuario]
-            
-            # Actualizar estadísticas
-            datos_usuario['partidas_totales'] = datos_usuario.get('partidas_totales', 0) + 1
+            if clave_usuario in usuarios:
+                datos_usuario = usuarios[clave_usuario]
             
-            if partida_ganada:
-                datos_usuario['partidas_ganadas'] = datos_usuario.get('partidas_ganadas', 0) + 1
+                # Actualizar estadísticas
+                datos_usuario['partidas_totales'] = datos_usuario.get('partidas_totales', 0) + 1
             
-            # Actualizar mejor tiempo si corresponde
-            campo_mejor_tiempo = f"mejor_tiempo_{dificultad.lower()}"
-            mejor_actual = datos_usuario.get(campo_mejor_tiempo)
+                if partida_ganada:
+                    datos_usuario['partidas_ganadas'] = datos_usuario.get('partidas_ganadas', 0) + 1
             
-            if partida_ganada and (mejor_actual is None or duracion < mejor_actual):
-                datos_usuario[campo_mejor_tiempo] = duracion
+                # Actualizar mejor tiempo si corresponde (el mismo campo sin tildes que en SQLite)
+                campo = campo_mejor_tiempo(dificultad)
+                if campo is not None and partida_ganada:
+                    mejor_actual = mejor_tiempo_guardado(datos_usuario, campo)
+                    # Las claves antiguas con tilde se unifican en el campo
+                    for clave in [clave for clave in datos_usuario
+                                  if clave.startswith('mejor_tiempo_') and clave != campo
+                                  and campo_mejor_tiempo(clave[len('mejor_tiempo_'):]) == campo]:
+                        del datos_usuario[clave]
+                    datos_usuario[campo] = duracion if mejor_actual is None else min(mejor_actual, duracion)
+                    self._clasificacion(campo).actualizar(int(clave_usuario), duracion)
             
-            usuarios[clave_usuario] = datos_usuario
-            self._base_datos._escribir_usuarios(usuarios)
+                usuarios[clave_usuario] = datos_usuario
+                self._base_datos._escribir_usuarios(usuarios)
 
     def obtener_clasificacion(self, dificultad: str, limite: int = 10) -> List[tuple]:
-        """Obtiene el ranking de mejores tiempos para una dificultad"""
-        usuarios = self._base_datos._leer_usuarios()
-        campo_mejor_tiempo = f"mejor_tiempo_{dificultad.lower()}"
-        
-        clasificacion = []
-        for datos_usuario in usuarios.values():
-            mejor_tiempo = datos_usuario.get(campo_mejor_tiempo)
-            if mejor_tiempo is not None:
-                clasificacion.append((datos_usuario['nombre_usuario'], mejor_tiempo))
-        
-        # Ordenar por mejor tiempo (ascendente)
-        clasificacion.sort(key=lambda x: x[1])
-        return clasificacion[:limite]
+        """Obtiene el ranking de mejores tiempos para una dificultad; O(limite) sin recorrer usuarios"""
+        campo = campo_mejor_tiempo(dificultad)
+        if campo is None:
+            return []
+        with self._base_datos._cerrojo:
+            usuarios = self._usuarios()
+            return [
+                (usuarios[str(id_usuario)]['nombre_usuario'], mejor_tiempo)
+                for mejor_tiempo, id_usuario in self._clasificacion(campo).primeros(limite)
+            ]
+
+    def obtener_posicion(self, id_usuario: int, dificultad: str) -> Optional[int]:
+        """Puesto del usuario en la clasificación de una dificultad (1 = mejor); O(log n)"""
+        campo = campo_mejor_tiempo(dificultad)
+        if campo is None:
+            return None
+        with self._base_datos._cerrojo:
+            return self._clasificacion(campo).posicion(id_usuario)
 
     def iterar_usuarios(self) -> IteradorUsuarios:
         """Retorna un iterador para recorrer todos los usuarios"""
-        usuarios = self._base_datos._leer_usuarios()
-        return IteradorUsuarios(usuarios)
+        with self._base_datos._cerrojo:
+            usuarios = self._base_datos._leer_usuarios()
+            return IteradorUsuarios(usuarios)
 
 class PartidaDAO(DAOAbstracto):
     def __init__(self, base_datos: BaseDatosJSON):
@@ -176,21 +529,17 @@ class PartidaDAO(DAOAbstracto):
 
     def guardar(self, partida: Partida) -> int:
         """Guarda una partida y retorna su ID"""
-        partidas = self._base_datos._leer_partidas()
-        
-        # Generar ID único
-        ids_partidas = [int(pid) for pid in partidas.keys()] if partidas else [0]
-        nuevo_id = max(ids_partidas) + 1 if ids_partidas else 1
+        with self._base_datos._cerrojo:
+            nuevo_id = self._base_datos.siguiente_id('partidas')
         
-        # Convertir partida a dict
-        dict_partida = partida.a_diccionario()
-        dict_partida['id'] = nuevo_id
+            # Convertir partida a dict
+            dict_partida = partida.a_diccionario()
+            dict_partida['id'] = nuevo_id
         
-        # Guardar partida
-        partidas[str(nuevo_id)] = dict_partida
-        self._base_datos._escribir_partidas(partidas)
+            # Guardar partida
+            self._base_datos._insertar_partida(str(nuevo_id), dict_partida)
         
-        return nuevo_id
+            return nuevo_id
 
     def obtener_por_id(self, id_partida: int) -> Optional[Partida]:
         """Carga una partida por ID"""
@@ -201,17 +550,24 @@ class PartidaDAO(DAOAbstracto):
             return Partida.desde_diccionario(datos_partida)
         return None
 
-    def actualizar_resultado_partida(self, id_partida: int, partida_ganada: bool, duracion: int):
-        """Actualiza el resultado final de una partida"""
-        partidas = self._base_datos._leer_partidas()
-        clave_partida = str(id_partida)
-        
-        if clave_partida in partidas:
-            datos_partida = partidas[clave_partida]
-            datos_partida['tiempo_fin'] = datetime.now().isoformat()
-            datos_partida['segundos_duracion'] = duracion
-            datos_partida['partida_ganada'] = partida_ganada
-            datos_partida['partida_terminada'] = True
-            
-            partidas[clave_partida] = datos_partida
-            self._base_datos._escribir_partidas(partidas)
\ No newline at end of file
+    def obtener_partidas_usuario(self, id_usuario: int, dificultad: Optional[str] = None,
+                                 limite: Optional[int] = None) -> List[Partida]:
+        """Historial de un usuario, de la más reciente a la más antigua"""
+        with self._base_datos._cerrojo:
+            partidas = [
+                datos for datos in self._base_datos._leer_partidas().values()
+                if datos.get('id_usuario') == id_usuario and (dificultad is None or datos['dificultad'] == dificultad)
+            ]
+        partidas.sort(key=lambda datos: datos['id'], reverse=True)
+        return [Partida.desde_diccionario(datos) for datos in partidas[:limite]]
+
+    def actualizar_resultado_partida(self, id_partida: int, partida_ganada: bool, duracion: int,
+                                     campos_tablero: Optional[Dict[str, Any]] = None):
+        """Actualiza el resultado final de una partida y, si se da, su tablero final"""
+        self._base_datos._actualizar_partida(str(id_partida), {
+            'tiempo_fin': datetime.now().isoformat(),
+            'segundos_duracion': duracion,
+            'partida_ganada': partida_ganada,
+            'partida_terminada': True,
+            **(campos_tablero or {})
+        })
\ No newline at end of file
@@ -0,0 +1,392 @@
+# modelos/basedatos_sqlite.py
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from modelos.entidades import Usuario, Partida
+from modelos.clases_abstractas import DAOAbstracto
+from modelos.basedatos_json import ExcepcionBaseDatos, clave_nombre_usuario
+from modelos.clasificacion import campo_mejor_tiempo, mejor_tiempo_guardado
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY,
+    nombre_usuario TEXT NOT NULL,
+    nombre_clave TEXT NOT NULL,
+    correo TEXT,
+    fecha_creacion TEXT NOT NULL,
+    partidas_totales INTEGER NOT NULL DEFAULT 0,
+    partidas_ganadas INTEGER NOT NULL DEFAULT 0,
+    mejor_tiempo_facil INTEGER,
+    mejor_tiempo_medio INTEGER,
+    mejor_tiempo_dificil INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_usuarios_nombre ON usuarios (nombre_clave);
+CREATE INDEX IF NOT EXISTS idx_usuarios_facil ON usuarios (mejor_tiempo_facil) WHERE mejor_tiempo_facil IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_usuarios_medio ON usuarios (mejor_tiempo_medio) WHERE mejor_tiempo_medio IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_usuarios_dificil ON usuarios (mejor_tiempo_dificil) WHERE mejor_tiempo_dificil IS NOT NULL;
+
+CREATE TABLE IF NOT EXISTS partidas (
+    id INTEGER PRIMARY KEY,
+    id_usuario INTEGER,
+    dificultad TEXT NOT NULL,
+    filas INTEGER NOT NULL,
+    columnas INTEGER NOT NULL,
+    minas INTEGER NOT NULL,
+    tiempo_inicio TEXT NOT NULL,
+    tiempo_fin TEXT,
+    segundos_duracion INTEGER,
+    partida_ganada INTEGER NOT NULL DEFAULT 0,
+    partida_terminada INTEGER NOT NULL DEFAULT 0,
+    semilla INTEGER,
+    primer_click TEXT,
+    instantanea TEXT,
+    topologia TEXT NOT NULL DEFAULT 'rectangular'
+);
+CREATE INDEX IF NOT EXISTS idx_partidas_usuario_dificultad ON partidas (id_usuario, dificultad);
+"""
+
+_CAMPOS_USUARIO = ('id', 'nombre_usuario', 'nombre_clave', 'correo', 'fecha_creacion', 'partidas_totales',
+                   'partidas_ganadas', 'mejor_tiempo_facil', 'mejor_tiempo_medio', 'mejor_tiempo_dificil')
+_CAMPOS_PARTIDA = ('id', 'id_usuario', 'dificultad', 'filas', 'columnas', 'minas', 'tiempo_inicio', 'tiempo_fin',
+                   'segundos_duracion', 'partida_ganada', 'partida_terminada', 'semilla', 'primer_click',
+                   'instantanea', 'topologia')
+def _fila_usuario(datos: Dict[str, Any]) -> Tuple:
+    # La clave se guarda calculada en Python: lower() de SQLite sólo pliega ASCII (no 'Ñ' ni 'Á')
+    fila = dict(datos, nombre_clave=clave_nombre_usuario(datos['nombre_usuario']))
+    # Los JSON antiguos guardaban 'mejor_tiempo_fácil' (con tilde); se unifican en la columna
+    for columna in ('mejor_tiempo_facil', 'mejor_tiempo_medio', 'mejor_tiempo_dificil'):
+        fila[columna] = mejor_tiempo_guardado(datos, columna)
+    fila.setdefault('partidas_totales', 0)
+    fila.setdefault('partidas_ganadas', 0)
+    return tuple(fila.get(campo) for campo in _CAMPOS_USUARIO)
+
+def _valor_columna(campo: str, valor: Any) -> Any:
+    """Valor de un campo de partida tal como se guarda en su columna"""
+    if campo == 'primer_click' and valor is not None:
+        return json.dumps(list(valor))
+    if campo in ('partida_ganada', 'partida_terminada'):
+        return int(bool(valor))
+    return valor
+
+def _fila_partida(datos: Dict[str, Any]) -> Tuple:
+    if 'instantanea' not in datos and 'semilla' not in datos:
+        # Registro antiguo con las matrices anidadas: se pasa al formato actual
+        datos = Partida.desde_diccionario(datos).a_diccionario()
+    fila = dict(datos)
+    fila.setdefault('topologia', 'rectangular')
+    return tuple(_valor_columna(campo, fila.get(campo)) for campo in _CAMPOS_PARTIDA)
+
+def _diccionario_partida(fila: sqlite3.Row) -> Dict[str, Any]:
+    datos = {campo: fila[campo] for campo in _CAMPOS_PARTIDA if fila[campo] is not None}
+    datos['partida_ganada'] = bool(fila['partida_ganada'])
+    datos['partida_terminada'] = bool(fila['partida_terminada'])
+    if 'primer_click' in datos:
+        datos['primer_click'] = json.loads(datos['primer_click'])
+    return datos
+
+class BaseDatosSQLite:
+    """Base de datos SQLite (modo WAL) con índices para login, clasificaciones e historial"""
+    def __init__(self, ruta_archivo: str = os.path.join("datos", "buscaminas.db")):
+        self._ruta_archivo = ruta_archivo
+        # Una conexión compartida; los controladores pueden llamar desde hilos distintos
+        self._cerrojo = threading.RLock()
+        try:
+            directorio = os.path.dirname(ruta_archivo)
+            if directorio and not os.path.exists(directorio):
+                os.makedirs(directorio)
+            self._conexion = sqlite3.connect(ruta_archivo, check_same_thread=False)
+            self._conexion.row_factory = sqlite3.Row
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            # Con WAL, NORMAL no arriesga la integridad: como mucho se pierde la última transacción
+            self._conexion.execute("PRAGMA synchronous=NORMAL")
+            self._conexion.executescript(_ESQUEMA)
+            # Bases creadas antes de guardar la topología
+            columnas = {fila['name'] for fila in self._conexion.execute("PRAGMA table_info(partidas)")}
+            if 'topologia' not in columnas:
+                self._conexion.execute(
+                    "ALTER TABLE partidas ADD COLUMN topologia TEXT NOT NULL DEFAULT 'rectangular'"
+                )
+        except sqlite3.Error as e:
+            raise ExcepcionBaseDatos(f"Error al inicializar base de datos: {e}")
+
+    @contextmanager
+    def transaccion(self) -> Iterator[sqlite3.Connection]:
+        """Conexión dentro de una transacción: commit al salir, rollback si hay error"""
+        with self._cerrojo:
+            try:
+                with self._conexion:
+                    yield self._conexion
+            except sqlite3.Error as e:
+                raise ExcepcionBaseDatos(f"Error de base de datos: {e}")
+
+    def esta_vacia(self) -> bool:
+        with self.transaccion() as conexion:
+            return (conexion.execute("SELECT EXISTS (SELECT 1 FROM usuarios)").fetchone()[0] == 0 and
+                    conexion.execute("SELECT EXISTS (SELECT 1 FROM partidas)").fetchone()[0] == 0)
+
+    def vaciar(self):
+        """Traslada el WAL al archivo principal (los commits ya son duraderos)"""
+        with self._cerrojo:
+            self._conexion.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def cerrar(self):
+        with self._cerrojo:
+            self._conexion.close()
+
+class SQLiteUsuarioDAO(DAOAbstracto):
+    def __init__(self, base_datos: BaseDatosSQLite):
+        self._base_datos = base_datos
+
+    def guardar(self, usuario: Usuario) -> int:
+        """Crea un nuevo usuario"""
+        datos = usuario.a_diccionario()
+        datos['id'] = None
+        datos['fecha_creacion'] = datetime.now().isoformat()
+        with self._base_datos.transaccion() as conexion:
+            cursor = conexion.execute(
+                f"INSERT INTO usuarios ({', '.join(_CAMPOS_USUARIO)}) VALUES ({', '.join('?' * len(_CAMPOS_USUARIO))})",
+                _fila_usuario(datos)
+            )
+            return cursor.lastrowid
+
+    def obtener_por_id(self, id_usuario: int) -> Optional[Usuario]:
+        """Obtiene un usuario por ID"""
+        with self._base_datos.transaccion() as conexion:
+            fila = conexion.execute("SELECT * FROM usuarios WHERE id = ?", (id_usuario,)).fetchone()
+        return Usuario.desde_diccionario(dict(fila)) if fila else None
+
+    def obtener_usuario_por_nombre(self, nombre_usuario: str) -> Optional[Usuario]:
+        """Obtiene un usuario por nombre de usuario (sin distinguir mayúsculas, por índice)"""
+        with self._base_datos.transaccion() as conexion:
+            fila = conexion.execute(
+                "SELECT * FROM usuarios WHERE nombre_clave = ? ORDER BY id LIMIT 1", (clave_nombre_usuario(nombre_usuario),)
+            ).fetchone()
+        return Usuario.desde_diccionario(dict(fila)) if fila else None
+
+    def actualizar_estadisticas_usuario(self, id_usuario: int, partida_ganada: bool, duracion: int, dificultad: str):
+        """Actualiza las estadísticas del usuario después de una partida"""
+        columna = campo_mejor_tiempo(dificultad)
+        mejor_tiempo = ""
+        parametros = [int(partida_ganada)]
+        if columna is not None and partida_ganada:
+            mejor_tiempo = f", {columna} = MIN(COALESCE({columna}, ?), ?)"
+            parametros += [duracion, duracion]
+        with self._base_datos.transaccion() as conexion:
+            conexion.execute(
+                f"UPDATE usuarios SET partidas_totales = partidas_totales + 1, "
+                f"partidas_ganadas = partidas_ganadas + ?{mejor_tiempo} WHERE id = ?",
+                (*parametros, id_usuario)
+            )
+
+    def obtener_clasificacion(self, dificultad: str, limite: int = 10) -> List[tuple]:
+        """Obtiene el ranking de mejores tiempos para una dificultad (recorre el índice parcial)"""
+        columna = campo_mejor_tiempo(dificultad)
+        if columna is None:
+            return []
+        with self._base_datos.transaccion() as conexion:
+            filas = conexion.execute(
+                f"SELECT nombre_usuario, {columna} FROM usuarios WHERE {columna} IS NOT NULL "
+                f"ORDER BY {columna} LIMIT ?", (limite,)
+            ).fetchall()
+        return [tuple(fila) for fila in filas]
+
+    def obtener_posicion(self, id_usuario: int, dificultad: str) -> Optional[int]:
+        """Puesto del usuario en la clasificación de una dificultad (1 = mejor), contado sobre el índice.
+
+        Cuesta O(puesto): SQLite no guarda rangos en sus B-trees, así que cuenta
+        las entradas del índice parcial por delante del usuario (unos 13 ms para el
+        puesto 200 000). No se mantiene una Clasificacion en memoria como en el DAO
+        JSON porque otro proceso puede escribir en la misma base (WAL) y la dejaría
+        desfasada.
+        """
+        columna = campo_mejor_tiempo(dificultad)
+        if columna is None:
+            return None
+        with self._base_datos.transaccion() as conexion:
+            fila = conexion.execute(
+                f"SELECT (SELECT COUNT(*) FROM usuarios AS otros WHERE otros.{columna} < usuarios.{columna}) + 1 "
+                f"FROM usuarios WHERE id = ? AND {columna} IS NOT NULL", (id_usuario,)
+            ).fetchone()
+        return fila[0] if fila else None
+
+    def iterar_usuarios(self) -> Iterator[Usuario]:
+        """Recorre todos los usuarios por orden de ID"""
+        with self._base_datos.transaccion() as conexion:
+            filas = conexion.execute("SELECT * FROM usuarios ORDER BY id").fetchall()
+        return (Usuario.desde_diccionario(dict(fila)) for fila in filas)
+
+class SQLitePartidaDAO(DAOAbstracto):
+    def __init__(self, base_datos: BaseDatosSQLite):
+        self._base_datos = base_datos
+
+    def guardar(self, partida: Partida) -> int:
+        """Guarda una partida y retorna su ID"""
+        datos = partida.a_diccionario()
+        datos['id'] = None
+        with self._base_datos.transaccion() as conexion:
+            cursor = conexion.execute(
+                f"INSERT INTO partidas ({', '.join(_CAMPOS_PARTIDA)}) VALUES ({', '.join('?' * len(_CAMPOS_PARTIDA))})",
+                _fila_partida(datos)
+            )
+            return cursor.lastrowid
+
+    def obtener_por_id(self, id_partida: int) -> Optional[Partida]:
+        """Carga una partida por ID"""
+        with self._base_datos.transaccion() as conexion:
+            fila = conexion.execute("SELECT * FROM partidas WHERE id = ?", (id_partida,)).fetchone()
+        return Partida.desde_diccionario(_diccionario_partida(fila)) if fila else None
+
+    def actualizar_resultado_partida(self, id_partida: int, partida_ganada: bool, duracion: int,
+                                     campos_tablero: Optional[Dict[str, Any]] = None):
+        """Actualiza el resultado final de una partida y, si se da, su tablero final"""
+        campos = {
+            'tiempo_fin': datetime.now().isoformat(),
+            'segundos_duracion': duracion,
+            'partida_ganada': int(partida_ganada),
+            'partida_terminada': 1,
+        }
+        for campo, valor in (campos_tablero or {}).items():
+            if campo not in _CAMPOS_PARTIDA:
+                raise ExcepcionBaseDatos(f"Campo de partida desconocido: {campo}")
+            campos[campo] = _valor_columna(campo, valor)
+        with self._base_datos.transaccion() as conexion:
+            conexion.execute(
+                f"UPDATE partidas SET {', '.join(f'{campo} = ?' for campo in campos)} WHERE id = ?",
+                (*campos.values(), id_partida)
+            )
+
+    def obtener_partidas_usuario(self, id_usuario: int, dificultad: Optional[str] = None,
+                                 limite: Optional[int] = None) -> List[Partida]:
+        """Historial de un usuario, de la más reciente a la más antigua (índice usuario/dificultad)"""
+        consulta = "SELECT * FROM partidas WHERE id_usuario = ?"
+        parametros: list = [id_usuario]
+        if dificultad is not None:
+            consulta += " AND dificultad = ?"
+            parametros.append(dificultad)
+        consulta += " ORDER BY id DESC"
+        if limite is not None:
+            consulta += " LIMIT ?"
+            parametros.append(limite)
+        with self._base_datos.transaccion() as conexion:
+            filas = conexion.execute(consulta, parametros).fetchall()
+        return [Partida.desde_diccionario(_diccionario_partida(fila)) for fila in filas]
+
+# ----------------- Migración desde JSON -----------------
+def _iterar_objeto_json(archivo: str, tamano_bloque: int = 1 << 16) -> Iterator[Tuple[str, Any]]:
+    """Pares (clave, valor) de un objeto JSON de primer nivel, leídos por bloques sin cargar el archivo"""
+    decodificador = json.JSONDecoder()
+    with open(archivo, 'r', encoding='utf-8') as f:
+        texto, posicion, fin = '', 0, False
+
+        def siguiente(esperado: str) -> str:
+            """Salta blancos y devuelve el siguiente carácter, que debe estar en `esperado`"""
+            nonlocal texto, posicion, fin
+            while True:
+                while posicion < len(texto) and texto[posicion].isspace():
+                    posicion += 1
+                if posicion < len(texto):
+                    caracter = texto[posicion]
+                    if caracter not in esperado:
+                        raise ExcepcionBaseDatos(f"JSON inesperado en {archivo}: {caracter!r}")
+                    return caracter
+                if fin:
+                    raise ExcepcionBaseDatos(f"{archivo} termina antes de tiempo")
+                bloque = f.read(tamano_bloque)
+                fin = not bloque
+                texto, posicion = texto[posicion:] + bloque, 0
+
+        def valor():
+            nonlocal texto, posicion, fin
+            while True:
+                try:
+                    resultado, final = decodificador.raw_decode(texto, posicion)
+                    # Un valor pegado al final del bloque podría seguir en el siguiente (p. ej. un número)
+                    if final < len(texto) or fin:
+                        posicion = final
+                        return resultado
+                except json.JSONDecodeError:
+                    if fin:
+                        raise ExcepcionBaseDatos(f"JSON inválido en {archivo}")
+                bloque = f.read(tamano_bloque)
+                fin = not bloque
+                texto, posicion = texto[posicion:] + bloque, 0
+
+        siguiente('{')
+        posicion += 1
+        if siguiente('"}') == '}':
+            return
+        while True:
+            clave = valor()
+            siguiente(':')
+            posicion += 1
+            siguiente('{["-0123456789tfn')
+            yield clave, valor()
+            separador = siguiente(',}')
+            posicion += 1
+            if separador == '}':
+                return
+            siguiente('"')
+
+def _por_lotes(pares: Iterator[Tuple[str, Any]], convertir, tamano_lote: int) -> Iterator[List[Tuple]]:
+    lote = []
+    for clave, datos in pares:
+        lote.append(convertir(dict(datos, id=int(clave))))
+        if len(lote) >= tamano_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def migrar_desde_json(base_datos: BaseDatosSQLite, ruta_json: str = "datos",
+                      tamano_lote: int = 1000) -> Tuple[int, int]:
+    """Copia usuarios.json y partidas.json (más el diario partidas.jsonl, si existe) a SQLite.
+
+    Los archivos se leen por bloques y se insertan por lotes, así que la
+    memoria no depende de su tamaño. Conserva los IDs. Devuelve
+    (usuarios, partidas) migrados.
+    """
+    archivo_usuarios = os.path.join(ruta_json, "usuarios.json")
+    archivo_partidas = os.path.join(ruta_json, "partidas.json")
+    archivo_diario = os.path.join(ruta_json, "partidas.jsonl")
+    insertar_usuario = (f"INSERT OR REPLACE INTO usuarios ({', '.join(_CAMPOS_USUARIO)}) "
+                        f"VALUES ({', '.join('?' * len(_CAMPOS_USUARIO))})")
+    insertar_partida = (f"INSERT OR REPLACE INTO partidas ({', '.join(_CAMPOS_PARTIDA)}) "
+                        f"VALUES ({', '.join('?' * len(_CAMPOS_PARTIDA))})")
+
+    usuarios = partidas = 0
+    with base_datos.transaccion() as conexion:
+        if os.path.exists(archivo_usuarios):
+            for lote in _por_lotes(_iterar_objeto_json(archivo_usuarios), _fila_usuario, tamano_lote):
+                conexion.executemany(insertar_usuario, lote)
+                usuarios += len(lote)
+        if os.path.exists(archivo_partidas):
+            for lote in _por_lotes(_iterar_objeto_json(archivo_partidas), _fila_partida, tamano_lote):
+                conexion.executemany(insertar_partida, lote)
+                partidas += len(lote)
+
+        # Cambios del diario (ver DiarioJSONL) aún no compactados en la instantánea
+        for archivo in (archivo_diario + ".compactando", archivo_diario):
+            if not os.path.exists(archivo):
+                continue
+            with open(archivo, 'r', encoding='utf-8') as f:
+                for linea in f:
+                    try:
+                        registro = json.loads(linea)
+                    except json.JSONDecodeError:
+                        break  # Última línea cortada
+                    if registro['op'] == 'alta':
+                        conexion.execute(insertar_partida, _fila_partida(registro['datos']))
+                        partidas += 1
+                    else:
+                        cambios = {campo: _valor_columna(campo, valor) for campo, valor in registro['datos'].items()
+                                   if campo in _CAMPOS_PARTIDA and campo != 'id'}
+                        if cambios:
+                            conexion.execute(
+                                f"UPDATE partidas SET {', '.join(f'{campo} = ?' for campo in cambios)} WHERE id = ?",
+                                (*cambios.values(), int(registro['clave']))
+                            )
+    return usuarios, partidas
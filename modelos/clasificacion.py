@@ -0,0 +1,64 @@
+# modelos/clasificacion.py
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Dificultades con mejor tiempo guardado; las personalizadas no tienen campo
+_CAMPOS_MEJOR_TIEMPO = {
+    'facil': 'mejor_tiempo_facil',
+    'medio': 'mejor_tiempo_medio',
+    'dificil': 'mejor_tiempo_dificil',
+}
+
+def campo_mejor_tiempo(dificultad: str) -> Optional[str]:
+    """'Fácil' -> 'mejor_tiempo_facil'; None para dificultades sin campo (p. ej. personalizadas)"""
+    sin_tildes = unicodedata.normalize('NFKD', dificultad).encode('ascii', 'ignore').decode('ascii')
+    return _CAMPOS_MEJOR_TIEMPO.get(sin_tildes.lower())
+
+def mejor_tiempo_guardado(datos: Dict[str, Any], campo: str) -> Optional[int]:
+    """Mejor tiempo de un registro de usuario para `campo`.
+
+    Los JSON antiguos guardaban la clave con tilde ('mejor_tiempo_fácil'):
+    se toma la mejor marca de todas las claves que corresponden al campo.
+    """
+    marcas = [
+        valor for clave, valor in datos.items()
+        if valor is not None and clave.startswith('mejor_tiempo_')
+        and campo_mejor_tiempo(clave[len('mejor_tiempo_'):]) == campo
+    ]
+    return min(marcas) if marcas else None
+
+class Clasificacion:
+    """Mejores tiempos de una dificultad, ordenados de forma incremental.
+
+    Las entradas (tiempo, id_usuario) se mantienen en una lista ordenada:
+    los k primeros salen en O(k) y la posición de un usuario en O(log n).
+    Actualizar una marca desplaza la lista (memmove), sin volver a ordenar.
+    """
+    def __init__(self, marcas: Iterable[Tuple[int, int]] = ()):
+        self._tiempos: Dict[int, int] = dict(marcas)
+        self._orden: List[Tuple[int, int]] = sorted((tiempo, id_usuario) for id_usuario, tiempo in self._tiempos.items())
+
+    def __len__(self) -> int:
+        return len(self._orden)
+
+    def actualizar(self, id_usuario: int, tiempo: int):
+        """Registra una marca nueva; sólo cuenta si mejora la anterior del usuario"""
+        anterior = self._tiempos.get(id_usuario)
+        if anterior is not None:
+            if anterior <= tiempo:
+                return
+            del self._orden[bisect_left(self._orden, (anterior, id_usuario))]
+        self._tiempos[id_usuario] = tiempo
+        insort(self._orden, (tiempo, id_usuario))
+
+    def primeros(self, limite: int) -> List[Tuple[int, int]]:
+        """Los `limite` mejores como (tiempo, id_usuario); a igual tiempo, el ID menor primero"""
+        return self._orden[:limite]
+
+    def posicion(self, id_usuario: int) -> Optional[int]:
+        """Puesto del usuario (1 = mejor; los empates comparten puesto) o None si no tiene marca"""
+        tiempo = self._tiempos.get(id_usuario)
+        if tiempo is None:
+            return None
+        return bisect_left(self._orden, (tiempo,)) + 1
@@ -1,6 +1,10 @@
 # modelos/entidades.py
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+from modelos.clasificacion import mejor_tiempo_guardado
+from modelos.instantanea import codificar_instantanea, decodificar_instantanea
+from modelos.logica_juego import VistaFilas
+from modelos.topologia import tabla_vecinos
 
 @dataclass
 class Usuario:
@@ -36,11 +40,31 @@ class Usuario:
             fecha_creacion=datos['fecha_creacion'],
             partidas_totales=datos.get('partidas_totales', 0),
             partidas_ganadas=datos.get('partidas_ganadas', 0),
-            mejor_tiempo_facil=datos.get('mejor_tiempo_facil'),
-            mejor_tiempo_medio=datos.get('mejor_tiempo_medio'),
-            mejor_tiempo_dificil=datos.get('mejor_tiempo_dificil')
+            # Acepta también las claves con tilde de los JSON antiguos
+            mejor_tiempo_facil=mejor_tiempo_guardado(datos, 'mejor_tiempo_facil'),
+            mejor_tiempo_medio=mejor_tiempo_guardado(datos, 'mejor_tiempo_medio'),
+            mejor_tiempo_dificil=mejor_tiempo_guardado(datos, 'mejor_tiempo_dificil')
         )
 
+class _MatrizDiferida:
+    """Campo de Partida que, si se deja en None, se decodifica la primera vez que se lee"""
+    def __set_name__(self, propietario, nombre: str):
+        self._clave = '_' + nombre
+
+    def __get__(self, partida, propietario=None):
+        if partida is None:
+            # Sin valor por defecto: el campo sigue siendo obligatorio en el constructor
+            raise AttributeError(self._clave)
+        if partida.__dict__.get(self._clave) is None:
+            partida._materializar()
+        return partida.__dict__[self._clave]
+
+    def __set__(self, partida, valor):
+        partida.__dict__[self._clave] = valor
+        if valor is not None:
+            # Matrices dadas a mano (registros antiguos, código externo): mandan sobre la semilla
+            partida.__dict__['_matrices_dadas'] = True
+
 @dataclass
 class Partida:
     id: Optional[int]
@@ -49,35 +73,101 @@ class Partida:
     filas: int
     columnas: int
     minas: int
-    estado_tablero: List[List[int]]
-    estado_revelado: List[List[bool]]
-    estado_banderas: List[List[bool]]
+    # Con None se reconstruyen al leerlas desde `instantanea` o desde la semilla,
+    # como VistaFilas de sólo lectura sobre capas planas (no listas anidadas)
+    estado_tablero: Optional[Sequence[Sequence[int]]] = _MatrizDiferida()
+    estado_revelado: Optional[Sequence[Sequence[bool]]] = _MatrizDiferida()
+    estado_banderas: Optional[Sequence[Sequence[bool]]] = _MatrizDiferida()
     tiempo_inicio: str
     tiempo_fin: Optional[str] = None
     segundos_duracion: Optional[int] = None
     partida_ganada: bool = False
     partida_terminada: bool = False
+    # Con semilla, primer click y topología el tablero se puede regenerar; sin
+    # instantánea (modo compacto) es lo único que se guarda
+    semilla: Optional[int] = None
+    primer_click: Optional[List[int]] = None
+    # Capas empaquetadas tal como se guardan (ver modelos.instantanea); es otra forma
+    # de las mismas matrices, así que no cuenta al comparar
+    instantanea: Optional[str] = field(default=None, compare=False, repr=False)
+    topologia: str = 'rectangular'
+
+    @property
+    def es_reproducible(self) -> bool:
+        return self.semilla is not None and self.primer_click is not None
+
+    @property
+    def es_compacta(self) -> bool:
+        """Sólo semilla y primer click: no se conservan celdas reveladas ni banderas"""
+        return self.es_reproducible and self.instantanea is None and not self.__dict__.get('_matrices_dadas')
+
+    @property
+    def tiene_tablero(self) -> bool:
+        """False en el registro de inicio, que sólo lleva los metadatos de la partida"""
+        return self.es_compacta or self.instantanea is not None or bool(self.estado_tablero)
+
+    def _materializado(self) -> bool:
+        return any(self.__dict__.get(clave) is not None
+                   for clave in ('_estado_tablero', '_estado_revelado', '_estado_banderas'))
+
+    def _materializar(self):
+        """Construye las matrices que falten a partir de la instantánea o de la semilla"""
+        if self.instantanea is not None:
+            _, _, tablero, revelado, banderas = decodificar_instantanea(self.instantanea, self.topologia)
+        elif self.es_compacta:
+            fila, columna = self.primer_click
+            _, plano = tabla_vecinos(self.topologia, self.filas, self.columnas).generar_tablero(
+                self.semilla, self.minas, fila, columna
+            )
+            vacia = bytes(self.filas * self.columnas)
+            tablero, revelado, banderas = (VistaFilas(capa, self.filas, self.columnas) for capa in (plano, vacia, vacia))
+        else:
+            tablero, revelado, banderas = [], [], []
+        for clave, matriz in (('_estado_tablero', tablero), ('_estado_revelado', revelado),
+                              ('_estado_banderas', banderas)):
+            if self.__dict__.get(clave) is None:
+                self.__dict__[clave] = matriz
+
+    def campos_tablero(self) -> dict:
+        """La parte del registro que describe el tablero: topología, semilla y primer
+        click si los hay, e instantánea salvo en modo compacto o sin tablero aún"""
+        campos = {'topologia': self.topologia}
+        if self.es_reproducible:
+            campos['semilla'] = self.semilla
+            campos['primer_click'] = list(self.primer_click)
+        if self.es_compacta:
+            return campos
+        if self.instantanea is not None and not self._materializado():
+            # Nadie ha tocado las matrices: la instantánea sigue valiendo tal cual
+            campos['instantanea'] = self.instantanea
+        elif self.estado_tablero:
+            # Minas, reveladas y banderas como bitsets en base64 en lugar de tres matrices JSON
+            campos['instantanea'] = codificar_instantanea(
+                self.filas, self.columnas, self.estado_tablero, self.estado_revelado, self.estado_banderas
+            )
+        return campos
 
     def a_diccionario(self):
-        return {
+        datos = {
             'id': self.id,
             'id_usuario': self.id_usuario,
             'dificultad': self.dificultad,
             'filas': self.filas,
             'columnas': self.columnas,
             'minas': self.minas,
-            'estado_tablero': self.estado_tablero,
-            'estado_revelado': self.estado_revelado,
-            'estado_banderas': self.estado_banderas,
             'tiempo_inicio': self.tiempo_inicio,
             'tiempo_fin': self.tiempo_fin,
             'segundos_duracion': self.segundos_duracion,
             'partida_ganada': self.partida_ganada,
             'partida_terminada': self.partida_terminada
         }
+        datos.update(self.campos_tablero())
+        return datos
 
     @classmethod
     def desde_diccionario(cls, datos: dict):
+        # La instantánea y la semilla se decodifican al leer las matrices; los
+        # registros antiguos traen las tres matrices anidadas; el de inicio, ninguna
         return cls(
             id=datos.get('id'),
             id_usuario=datos.get('id_usuario'),
@@ -85,12 +175,16 @@ class Partida:
             filas=datos['filas'],
             columnas=datos['columnas'],
             minas=datos['minas'],
-            estado_tablero=datos['estado_tablero'],
-            estado_revelado=datos['estado_revelado'],
-            estado_banderas=datos['estado_banderas'],
+            estado_tablero=datos.get('estado_tablero'),
+            estado_revelado=datos.get('estado_revelado'),
+            estado_banderas=datos.get('estado_banderas'),
             tiempo_inicio=datos['tiempo_inicio'],
             tiempo_fin=datos.get('tiempo_fin'),
             segundos_duracion=datos.get('segundos_duracion'),
             partida_ganada=datos.get('partida_ganada', False),
-            partida_terminada=datos.get('partida_terminada', False)
+            partida_terminada=datos.get('partida_terminada', False),
+            semilla=datos.get('semilla'),
+            primer_click=datos.get('primer_click'),
+            instantanea=datos.get('instantanea'),
+            topologia=datos.get('topologia', 'rectangular')
         )
\ No newline at end of file
@@ -0,0 +1,132 @@
+# modelos/fabrica_tableros.py
+import threading
+from array import array
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from modelos.generacion import muestrear_minas, calcular_adyacencias, zona_exclusion
+
+Preset = Tuple[int, int, int]
+TableroGenerado = Tuple[List[int], array]
+
+# Simetrías del rectángulo: conservan el número de minas vecinas de cada celda
+# y son involuciones, así que la misma función sirve para ida y vuelta
+SIMETRIAS = ('identidad', 'espejo_horizontal', 'espejo_vertical', 'rotacion_180')
+
+def _transformar_celda(simetria: str, filas: int, columnas: int, fila: int, columna: int) -> Tuple[int, int]:
+    if simetria == 'espejo_horizontal':
+        return fila, columnas - 1 - columna
+    if simetria == 'espejo_vertical':
+        return filas - 1 - fila, columna
+    if simetria == 'rotacion_180':
+        return filas - 1 - fila, columnas - 1 - columna
+    return fila, columna
+
+def _transformar_tablero(simetria: str, filas: int, columnas: int, generado: TableroGenerado) -> TableroGenerado:
+    indices_minas, tablero = generado
+    if simetria == 'identidad':
+        return generado
+    if simetria == 'rotacion_180':
+        nuevo = tablero[::-1]
+    else:
+        nuevo = array('b')
+        orden_filas = range(filas - 1, -1, -1) if simetria == 'espejo_vertical' else range(filas)
+        for f in orden_filas:
+            fila = tablero[f * columnas:(f + 1) * columnas]
+            nuevo.extend(fila[::-1] if simetria == 'espejo_horizontal' else fila)
+
+    nuevos_indices = []
+    for indice in indices_minas:
+        f, c = _transformar_celda(simetria, filas, columnas, *divmod(indice, columnas))
+        nuevos_indices.append(f * columnas + c)
+    return nuevos_indices, nuevo
+
+def _simetria_libre(tablero: array, filas: int, columnas: int, zona: List[Tuple[int, int]]) -> Optional[str]:
+    """Primera simetría que deja sin minas todas las celdas de la zona"""
+    for simetria in SIMETRIAS:
+        if all(
+            tablero[f * columnas + c] != -1
+            for f, c in (_transformar_celda(simetria, filas, columnas, nf, nc) for nf, nc in zona)
+        ):
+            return simetria
+    return None
+
+class FabricaTableros:
+    """Mantiene, por cada preset de dificultad, una reserva de tableros generados en segundo plano.
+
+    Los tableros se generan sin zona de exclusión; al primer click se busca
+    uno cuya zona alrededor del click no tenga minas, directamente o tras
+    aplicarle una simetría. Si ninguno encaja, `tomar` devuelve None y el
+    motor genera el tablero como siempre.
+    """
+    def __init__(self, presets: Iterable[Preset], tamano_reserva: int = 8, iniciar: bool = True):
+        self._tamano_reserva = tamano_reserva
+        self._reservas: Dict[Preset, Deque[TableroGenerado]] = {tuple(p): deque() for p in presets}
+        self._condicion = threading.Condition()
+        self._activa = False
+        self._hilo: Optional[threading.Thread] = None
+        if iniciar:
+            self.iniciar()
+
+    def iniciar(self):
+        """Arranca el hilo que rellena las reservas"""
+        with self._condicion:
+            if self._activa:
+                return
+            self._activa = True
+        self._hilo = threading.Thread(target=self._rellenar, name="FabricaTableros", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        with self._condicion:
+            self._activa = False
+            self._condicion.notify_all()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def _preset_incompleto(self) -> Optional[Preset]:
+        for preset, reserva in self._reservas.items():
+            if len(reserva) < self._tamano_reserva:
+                return preset
+        return None
+
+    def _rellenar(self):
+        while True:
+            with self._condicion:
+                preset = self._preset_incompleto()
+                while self._activa and preset is None:
+                    self._condicion.wait()
+                    preset = self._preset_incompleto()
+                if not self._activa:
+                    return
+
+            filas, columnas, minas = preset
+            indices_minas = muestrear_minas(filas, columnas, minas)
+            generado = (indices_minas, calcular_adyacencias(filas, columnas, indices_minas))
+
+            with self._condicion:
+                self._reservas[preset].append(generado)
+
+    def disponibles(self, filas: int, columnas: int, minas: int) -> int:
+        with self._condicion:
+            return len(self._reservas.get((filas, columnas, minas), ()))
+
+    def tomar(self, filas: int, columnas: int, minas: int, fila: int, columna: int) -> Optional[TableroGenerado]:
+        """Saca de la reserva un tablero sin minas alrededor de (fila, columna), o None"""
+        zona = [divmod(indice, columnas) for indice in zona_exclusion(filas, columnas, fila, columna)]
+
+        with self._condicion:
+            reserva = self._reservas.get((filas, columnas, minas))
+            if not reserva:
+                return None
+
+            for posicion, generado in enumerate(reserva):
+                simetria = _simetria_libre(generado[1], filas, columnas, zona)
+                if simetria is not None:
+                    del reserva[posicion]
+                    self._condicion.notify()
+                    break
+            else:
+                return None
+
+        return _transformar_tablero(simetria, filas, columnas, generado)
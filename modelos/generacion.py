@@ -0,0 +1,166 @@
+# modelos/generacion.py
+import random
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa la ruta en Python puro
+    np = None
+
+HAY_NUMPY = np is not None
+
+
+def zona_exclusion(filas: int, columnas: int, fila: int, columna: int) -> List[int]:
+    """Índices planos de la celda y sus vecinas, que nunca deben llevar mina"""
+    return [
+        nf * columnas + nc
+        for nf in range(max(0, fila - 1), min(filas, fila + 2))
+        for nc in range(max(0, columna - 1), min(columnas, columna + 2))
+    ]
+
+
+def _floyd(rng, n: int, k: int) -> set:
+    """Algoritmo de Floyd: k índices distintos de range(n) con memoria O(k)"""
+    elegidos = set()
+    for j in range(n - k, n):
+        t = rng.randrange(j + 1)
+        elegidos.add(j if t in elegidos else t)
+    return elegidos
+
+
+def _muestrear_indices(rng, n: int, k: int) -> List[int]:
+    """k índices de range(n); en tableros densos se muestrean las celdas libres (el complemento)"""
+    if k <= n // 2:
+        return list(_floyd(rng, n, k))
+    libres = _floyd(rng, n, n - k)
+    return [indice for indice in range(n) if indice not in libres]
+
+
+def _muestrear_indices_numpy(n: int, k: int, excluidas_ordenadas: List[int]) -> List[int]:
+    """Como _muestrear_indices + _reubicar, vectorizado y sin permutar range(n).
+
+    Se sacan enteros al azar, se quitan repetidos y, si sobran, se toma un
+    subconjunto uniforme: el conjunto resultante es simétrico, luego uniforme.
+    """
+    rng = np.random.default_rng()
+    objetivo = k if k <= n // 2 else n - k
+    elegidos = np.empty(0, dtype=np.int64)
+    while len(elegidos) < objetivo:
+        faltan = objetivo - len(elegidos)
+        nuevos = rng.integers(0, n, size=faltan + faltan // 8 + 16)
+        todos = np.sort(np.concatenate((elegidos, nuevos)))
+        elegidos = todos[np.concatenate(([True], todos[1:] != todos[:-1]))]
+    if len(elegidos) > objetivo:
+        elegidos = rng.choice(elegidos, size=objetivo, replace=False)
+
+    if objetivo != k:
+        # Tablero denso: lo muestreado son las celdas libres; O(n) = O(minas) aquí
+        mascara = np.ones(n, dtype=bool)
+        mascara[elegidos] = False
+        elegidos = np.flatnonzero(mascara)
+
+    if excluidas_ordenadas:
+        umbrales = np.asarray(excluidas_ordenadas, dtype=np.int64) - np.arange(len(excluidas_ordenadas))
+        elegidos = elegidos + np.searchsorted(umbrales, elegidos, side='right')
+    return elegidos.tolist()
+
+
+def _reubicar(indices: List[int], excluidas_ordenadas: List[int]) -> List[int]:
+    """Pasa índices de las celdas disponibles a índices del tablero saltando las excluidas.
+
+    La excluida j-ésima desplaza a todo índice disponible >= e_j - j, así que
+    el desplazamiento es una búsqueda binaria sobre esos umbrales.
+    """
+    if not excluidas_ordenadas:
+        return indices
+    umbrales = [excluida - j for j, excluida in enumerate(excluidas_ordenadas)]
+    for posicion, indice in enumerate(indices):
+        indices[posicion] = indice + bisect_right(umbrales, indice)
+    return indices
+
+
+def muestrear_minas(filas: int, columnas: int, minas: int, excluidas: Iterable[int] = (),
+                    semilla: Optional[int] = None) -> List[int]:
+    """Elige `minas` índices planos distintos fuera de `excluidas`.
+
+    Se muestrea sobre las celdas disponibles y se reubica cada índice
+    saltando las excluidas, sin enumerar nunca el tablero completo. Con
+    `semilla` el resultado es reproducible y no depende de que NumPy esté
+    instalado. Lanza ValueError si no caben las minas.
+    """
+    total = filas * columnas
+    excluidas = set(excluidas)
+    disponibles = total - len(excluidas)
+    if minas > disponibles or minas < 0:
+        raise ValueError(f"No caben {minas} minas en {disponibles} celdas disponibles")
+
+    if semilla is not None:
+        # Random.sample se conserva: las partidas guardadas sólo con semilla deben regenerarse igual
+        elegidos = random.Random(semilla).sample(range(disponibles), minas)
+    elif np is not None:
+        return _muestrear_indices_numpy(disponibles, minas, sorted(excluidas))
+    else:
+        elegidos = _muestrear_indices(random, disponibles, minas)
+    return _reubicar(elegidos, sorted(excluidas))
+
+
+def _adyacencias_numpy(minas) -> array:
+    """Tablero plano a partir de la matriz 0/1 de minas (filas x columnas, int8)"""
+    # Suma 3x3 separable: primero cada fila con sus dos vecinas, luego cada columna
+    horizontal = minas.copy()
+    horizontal[:, 1:] += minas[:, :-1]
+    horizontal[:, :-1] += minas[:, 1:]
+    cuentas = horizontal.copy()
+    cuentas[1:, :] += horizontal[:-1, :]
+    cuentas[:-1, :] += horizontal[1:, :]
+    # La propia celda no cuenta; -1 en las minas con aritmética, no con una máscara booleana
+    cuentas -= minas
+    cuentas *= 1 - minas
+    cuentas -= minas
+    return array('b', cuentas.tobytes())
+
+
+def adyacencias_desde_mascara(filas: int, columnas: int, mascara: bytes) -> array:
+    """Como calcular_adyacencias, con las minas como capa plana de un byte 0/1 por celda"""
+    if np is not None:
+        return _adyacencias_numpy(np.frombuffer(mascara, dtype=np.int8).reshape(filas, columnas))
+    return calcular_adyacencias(filas, columnas, compress(range(filas * columnas), mascara))
+
+
+def calcular_adyacencias(filas: int, columnas: int, indices_minas: Iterable[int]) -> array:
+    """Construye el tablero plano: -1 en las minas y el número de minas vecinas en el resto"""
+    if np is not None:
+        minas = np.zeros(filas * columnas, dtype=np.int8)
+        minas[list(indices_minas)] = 1
+        return _adyacencias_numpy(minas.reshape(filas, columnas))
+
+    indices_minas = list(indices_minas)
+    tablero = array('b', bytes(filas * columnas))
+    for indice in indices_minas:
+        tablero[indice] = -1
+
+    # Cada mina suma uno a sus vecinas: O(minas) en lugar de O(filas * columnas * 9)
+    for indice in indices_minas:
+        r, c = divmod(indice, columnas)
+        for nr in range(max(0, r - 1), min(filas, r + 2)):
+            base = nr * columnas
+            for nc in range(max(0, c - 1), min(columnas, c + 2)):
+                if tablero[base + nc] != -1:
+                    tablero[base + nc] += 1
+    return tablero
+
+
+def generar_tablero(semilla: int, filas: int, columnas: int, minas: int,
+                    fila: int, columna: int) -> Tuple[List[int], array]:
+    """Genera de forma determinista las minas y el tablero plano para un primer click.
+
+    La misma combinación (semilla, filas, columnas, minas, primer click)
+    produce siempre el mismo tablero, así que basta con guardar esos datos.
+    """
+    excluidas = zona_exclusion(filas, columnas, fila, columna)
+    minas = min(minas, filas * columnas - len(excluidas))
+    indices_minas = muestrear_minas(filas, columnas, minas, excluidas, semilla)
+    return indices_minas, calcular_adyacencias(filas, columnas, indices_minas)
@@ -0,0 +1,106 @@
+# modelos/historial.py
+from array import array
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Tuple
+
+REVELAR = 0
+BANDERA = 1
+# Minas mostradas al perder: se revelan sin contar como celdas seguras
+MINAS = 2
+
+class Movimiento:
+    """Una jugada del diario: índices planos que cambió y el estado de partida antes y después.
+
+    `anexos` son cambios automáticos que siguieron a la jugada (minas mostradas,
+    banderas puestas al ganar) como pares (tipo, índices); se deshacen con ella.
+    """
+    __slots__ = ('tipo', 'indices', 'terminada_antes', 'ganada_antes', 'terminada_despues', 'ganada_despues',
+                 'anexos')
+
+    def __init__(self, tipo: int, indices: array, antes: tuple, despues: tuple):
+        self.tipo = tipo
+        self.indices = indices
+        self.terminada_antes, self.ganada_antes = antes
+        self.terminada_despues, self.ganada_despues = despues
+        self.anexos: List[Tuple[int, array]] = []
+
+    @property
+    def celdas(self) -> int:
+        return len(self.indices) + sum(len(indices) for _, indices in self.anexos)
+
+class HistorialJugadas:
+    """Diario de deltas para deshacer y rehacer jugadas.
+
+    Cada jugada guarda sólo las celdas que cambió, como índices empaquetados
+    en un `array`, así que deshacer una expansión cuesta O(celdas cambiadas).
+    `max_celdas` acota la memoria: al superarlo se descartan las jugadas más
+    antiguas.
+    """
+    def __init__(self, max_celdas: int = 1_000_000):
+        self._max_celdas = max_celdas
+        self._deshacer: Deque[Movimiento] = deque()
+        self._rehacer: List[Movimiento] = []
+        self._celdas = 0
+
+    def registrar(self, tipo: int, indices: Iterable[int], antes: tuple, despues: tuple):
+        """Apunta una jugada nueva; invalida lo que se pudiera rehacer"""
+        movimiento = Movimiento(tipo, array('i', indices), antes, despues)
+        if not movimiento.indices and antes == despues:
+            return
+        for descartado in self._rehacer:
+            self._celdas -= descartado.celdas
+        self._rehacer.clear()
+
+        self._deshacer.append(movimiento)
+        self._celdas += len(movimiento.indices)
+        self._recortar()
+
+    def anexar(self, tipo: int, indices: Iterable[int], estado: tuple):
+        """Suma un cambio automático a la última jugada, para que se deshaga con ella.
+
+        Si no hay jugada a la que anexarlo se apunta como jugada propia.
+        """
+        indices = array('i', indices)
+        if not indices:
+            return
+        if not self._deshacer:
+            self.registrar(tipo, indices, estado, estado)
+            return
+        self._deshacer[-1].anexos.append((tipo, indices))
+        self._celdas += len(indices)
+        self._recortar()
+
+    def _recortar(self):
+        while self._celdas > self._max_celdas and len(self._deshacer) > 1:
+            self._celdas -= self._deshacer.popleft().celdas
+
+    def sacar_para_deshacer(self) -> Optional[Movimiento]:
+        if not self._deshacer:
+            return None
+        movimiento = self._deshacer.pop()
+        self._rehacer.append(movimiento)
+        return movimiento
+
+    def sacar_para_rehacer(self) -> Optional[Movimiento]:
+        if not self._rehacer:
+            return None
+        movimiento = self._rehacer.pop()
+        self._deshacer.append(movimiento)
+        return movimiento
+
+    @property
+    def puede_deshacer(self) -> bool:
+        return bool(self._deshacer)
+
+    @property
+    def puede_rehacer(self) -> bool:
+        return bool(self._rehacer)
+
+    @property
+    def celdas_guardadas(self) -> int:
+        return self._celdas
+
+    def limpiar(self):
+        self._deshacer.clear()
+        self._rehacer.clear()
+        self._celdas = 0
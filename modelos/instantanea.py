@@ -0,0 +1,110 @@
+# modelos/instantanea.py
+import base64
+import struct
+import sys
+from array import array
+from itertools import compress
+from typing import List, Sequence, Tuple
+from modelos.logica_juego import VistaFilas
+from modelos.topologia import tabla_vecinos
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se empaqueta con tablas de 256 entradas
+    np = None
+
+# Cabecera: firma, versión, filas, columnas (big endian)
+_CABECERA = struct.Struct('>2sBII')
+_FIRMA = b'BM'
+_VERSION = 1
+
+# Valor de celda -> ¿es mina? (byte a byte, resuelto en C)
+_ES_MINA = bytes(1 if valor == 0xFF else 0 for valor in range(256))
+# Un byte empaquetado <-> sus 8 celdas (0/1), la primera en el bit más alto; las
+# 8 celdas se leen de golpe como un entero de 64 bits en el orden de la máquina
+_BYTE_A_CELDAS = [bytes((valor >> (7 - bit)) & 1 for bit in range(8)) for valor in range(256)]
+_CELDAS_A_BYTE = {int.from_bytes(celdas, sys.byteorder): valor for valor, celdas in enumerate(_BYTE_A_CELDAS)}
+
+def _empaquetar(bits) -> bytes:
+    """Una celda por byte (0/1) -> un bit por celda, la primera celda en el bit más alto"""
+    if np is not None:
+        return np.packbits(np.frombuffer(bits, dtype=np.uint8)).tobytes()
+    relleno = -len(bits) % 8
+    palabras = memoryview(bytes(bits) + bytes(relleno)).cast('Q')
+    return bytes(map(_CELDAS_A_BYTE.__getitem__, palabras))
+
+def _desempaquetar(datos: bytes, celdas: int) -> bytes:
+    if np is not None:
+        return np.unpackbits(np.frombuffer(datos, dtype=np.uint8), count=celdas).tobytes()
+    return b''.join(map(_BYTE_A_CELDAS.__getitem__, datos))[:celdas]
+
+def empaquetar_capas(filas: int, columnas: int, tablero, revelado, banderas) -> str:
+    """Codifica capas planas (un byte por celda, como los buffers de Buscaminas).
+
+    Acepta cualquier objeto con protocolo de buffer (array, bytearray, memoryview),
+    sin copiarlo a listas. `tablero` es un array('b'): las minas (-1) se leen como 0xFF.
+    """
+    datos = (
+        _CABECERA.pack(_FIRMA, _VERSION, filas, columnas)
+        + _empaquetar(memoryview(tablero).cast('B').tobytes().translate(_ES_MINA))
+        + _empaquetar(revelado)
+        + _empaquetar(banderas)
+    )
+    return base64.b64encode(datos).decode('ascii')
+
+def _capas(texto: str) -> Tuple[int, int, bytes, bytes, bytes]:
+    """(filas, columnas, minas, revelado, banderas), cada capa con un byte 0/1 por celda"""
+    datos = base64.b64decode(texto)
+    firma, version, filas, columnas = _CABECERA.unpack_from(datos)
+    if firma != _FIRMA or version != _VERSION:
+        raise ValueError(f"Instantánea no reconocida (firma {firma!r}, versión {version})")
+
+    celdas = filas * columnas
+    tamano = (celdas + 7) // 8
+    inicio = _CABECERA.size
+    if len(datos) != inicio + 3 * tamano:
+        raise ValueError("Instantánea truncada")
+
+    minas, revelado, banderas = (
+        _desempaquetar(datos[inicio + i * tamano:inicio + (i + 1) * tamano], celdas) for i in range(3)
+    )
+    return filas, columnas, minas, revelado, banderas
+
+def desempaquetar_capas(texto: str) -> Tuple[int, int, List[int], bytes, bytes]:
+    """Inverso de empaquetar_capas: (filas, columnas, índices de minas, revelado, banderas)"""
+    filas, columnas, minas, revelado, banderas = _capas(texto)
+    if np is not None:
+        indices_minas = np.flatnonzero(np.frombuffer(minas, dtype=np.uint8)).tolist()
+    else:
+        indices_minas = list(compress(range(filas * columnas), minas))
+    return filas, columnas, indices_minas, revelado, banderas
+
+def codificar_instantanea(filas: int, columnas: int, tablero: Sequence[Sequence[int]],
+                          revelado: Sequence[Sequence[bool]], banderas: Sequence[Sequence[bool]]) -> str:
+    """Empaqueta las matrices de Partida: minas, reveladas y banderas como bitsets en base64.
+
+    Los números del tablero no se guardan: se recalculan a partir de las minas.
+    Con vistas por filas (lo que devuelve decodificar_instantanea) se empaquetan
+    directamente sus capas planas.
+    """
+    if all(isinstance(capa, VistaFilas) for capa in (tablero, revelado, banderas)):
+        return empaquetar_capas(filas, columnas, tablero.plana, revelado.plana, banderas.plana)
+    return empaquetar_capas(
+        filas, columnas,
+        b''.join(array('b', fila).tobytes() for fila in tablero),
+        b''.join(map(bytes, revelado)),
+        b''.join(map(bytes, banderas)),
+    )
+
+def decodificar_instantanea(texto: str, topologia: str = 'rectangular'
+                            ) -> Tuple[int, int, VistaFilas, VistaFilas, VistaFilas]:
+    """Inverso de codificar_instantanea: (filas, columnas, tablero, revelado, banderas).
+
+    Las tres matrices son VistaFilas sobre capas planas, indexables como
+    `[fila][columna]` sin construir listas por fila (revelado y banderas dan 0/1).
+    Los números se recalculan con las vecinas de `topologia`.
+    """
+    filas, columnas, minas, revelado, banderas = _capas(texto)
+    plano = tabla_vecinos(topologia, filas, columnas).adyacencias_desde_mascara(minas)
+    return (filas, columnas, VistaFilas(plano, filas, columnas),
+            VistaFilas(revelado, filas, columnas), VistaFilas(banderas, filas, columnas))
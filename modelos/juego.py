@@ -1,143 +1,163 @@
-import random
-from typing import List, Dict, Any
+from collections.abc import Mapping, Sequence
+from typing import Optional, Tuple
+from modelos.logica_juego import Buscaminas
+
+class VistaCelda(Mapping):
+    """Celda con la forma de diccionario de siempre, leída de las capas planas del motor"""
+    __slots__ = ('_capas', '_indice')
+    _CLAVES = ("es_mina", "revelada", "bandera", "minas_adyacentes")
+
+    def __init__(self, capas: Tuple[memoryview, memoryview, memoryview], indice: int):
+        self._capas = capas
+        self._indice = indice
+
+    def __getitem__(self, clave: str):
+        tablero, revelado, banderas = self._capas
+        if clave == "es_mina":
+            return tablero[self._indice] == -1
+        if clave == "revelada":
+            return bool(revelado[self._indice])
+        if clave == "bandera":
+            return bool(banderas[self._indice])
+        if clave == "minas_adyacentes":
+            return max(0, tablero[self._indice])
+        raise KeyError(clave)
+
+    def __iter__(self):
+        return iter(self._CLAVES)
+
+    def __len__(self) -> int:
+        return len(self._CLAVES)
+
+class FilaCeldas(Sequence):
+    """Fila del tablero que crea cada VistaCelda al pedirla"""
+    __slots__ = ('_capas', '_inicio', '_columnas')
+
+    def __init__(self, capas: Tuple[memoryview, memoryview, memoryview], inicio: int, columnas: int):
+        self._capas = capas
+        self._inicio = inicio
+        self._columnas = columnas
+
+    def __len__(self) -> int:
+        return self._columnas
+
+    def __getitem__(self, columna: int) -> VistaCelda:
+        if columna < 0:
+            columna += self._columnas
+        if not 0 <= columna < self._columnas:
+            raise IndexError("Columna fuera del tablero")
+        return VistaCelda(self._capas, self._inicio + columna)
+
+class TableroCeldas(Sequence):
+    """Tablero perezoso: tablero[fila][columna] sin materializar una vista por celda"""
+    __slots__ = ('_capas', '_filas', '_columnas')
+
+    def __init__(self, estado: dict):
+        self._capas = tuple(estado[capa].plana for capa in ('tablero', 'revelado', 'banderas'))
+        self._filas = estado['filas']
+        self._columnas = estado['columnas']
+
+    def __len__(self) -> int:
+        return self._filas
+
+    def __getitem__(self, fila: int) -> FilaCeldas:
+        if fila < 0:
+            fila += self._filas
+        if not 0 <= fila < self._filas:
+            raise IndexError("Fila fuera del tablero")
+        return FilaCeldas(self._capas, fila * self._columnas, self._columnas)
 
 class JuegoBuscaminas:
-    def __init__(self, filas: int, columnas: int, minas: int):
+    """Adaptador sobre el motor común que conserva la API de celdas como diccionario"""
+    def __init__(self, filas: int, columnas: int, minas: int, verificar_contadores: bool = False,
+                 semilla: Optional[int] = None):
         self.filas = filas
         self.columnas = columnas
         self.minas = minas
-        self.tablero = []
-        self.partida_ganada = False
-        self.partida_perdida = False
-        self.celdas_reveladas = 0
-        
+        # Con semilla, inicializar_tablero produce siempre la misma disposición
+        self.semilla = semilla
+        self.tablero: Sequence[Sequence[VistaCelda]] = []
+        # Modo de consistencia: contrasta los contadores con un recorrido completo
+        self.verificar_contadores = verificar_contadores
+        self._motor: Optional[Buscaminas] = None
+        self._mina_pisada = False
+
     def inicializar_tablero(self):
-        """Inicializa el tablero vacío"""
-        self.tablero = []
-        for fila in range(self.filas):
-            fila_tablero = []
-            for columna in range(self.columnas):
-                fila_tablero.append({
-                    "es_mina": False,
-                    "revelada": False,
-                    "bandera": False,
-                    "minas_adyacentes": 0
-                })
-            self.tablero.append(fila_tablero)
-        
-        self._colocar_minas()
-        self._calcular_minas_adyacentes()
-        self.partida_ganada = False
-        self.partida_perdida = False
-        self.celdas_reveladas = 0
-    
-    def _colocar_minas(self):
-        """Coloca las minas aleatoriamente en el tablero"""
-        minas_colocadas = 0
-        while minas_colocadas < self.minas:
-            fila = random.randint(0, self.filas - 1)
-            columna = random.randint(0, self.columnas - 1)
-            
-            if not self.tablero[fila][columna]["es_mina"]:
-                self.tablero[fila][columna]["es_mina"] = True
-                minas_colocadas += 1
-    
-    def _calcular_minas_adyacentes(self):
-        """Calcula el número de minas adyacentes para cada celda"""
-        for fila in range(self.filas):
-            for columna in range(self.columnas):
-                if not self.tablero[fila][columna]["es_mina"]:
-                    minas_adyacentes = self._contar_minas_adyacentes(fila, columna)
-                    self.tablero[fila][columna]["minas_adyacentes"] = minas_adyacentes
-    
+        """Crea el motor y coloca las minas en todo el tablero"""
+        self._motor = Buscaminas(self.filas, self.columnas, self.minas,
+                                 verificar_contadores=self.verificar_contadores, semilla=self.semilla)
+        self._motor.colocar_minas()
+        self._mina_pisada = False
+        self.tablero = TableroCeldas(self._motor.obtener_estado())
+
+    @property
+    def partida_ganada(self) -> bool:
+        return self._motor is not None and self._motor.partida_ganada
+
+    @property
+    def partida_perdida(self) -> bool:
+        return self._motor is not None and self._motor.partida_terminada and not self._motor.partida_ganada
+
+    @property
+    def celdas_reveladas(self) -> int:
+        """Celdas abiertas por el jugador: las seguras más la mina pisada, si la hay.
+
+        Las demás minas que se muestran al perder no cuentan, como antes.
+        """
+        if self._motor is None:
+            return 0
+        return self._motor.seguras_reveladas + self._mina_pisada
+
+    @property
+    def banderas_colocadas(self) -> int:
+        return self._motor.banderas_colocadas if self._motor is not None else 0
+
     def _contar_minas_adyacentes(self, fila: int, columna: int) -> int:
         """Cuenta las minas en las celdas adyacentes"""
-        count = 0
-        for i in range(-1, 2):
-            for j in range(-1, 2):
-                if i == 0 and j == 0:
-                    continue
-                    
-                nueva_fila, nueva_columna = fila + i, columna + j
-                if (0 <= nueva_fila < self.filas and 
-                    0 <= nueva_columna < self.columnas and 
-                    self.tablero[nueva_fila][nueva_columna]["es_mina"]):
-                    count += 1
-        return count
-    
+        return sum(
+            1
+            for nf in range(max(0, fila - 1), min(self.filas, fila + 2))
+            for nc in range(max(0, columna - 1), min(self.columnas, columna + 2))
+            if (nf, nc) != (fila, columna) and self._motor.es_mina(nf, nc)
+        )
+
     def revelar_celda(self, fila: int, columna: int) -> bool:
         """Revela una celda y sus adyacentes si es necesario"""
-        if (fila < 0 or fila >= self.filas or 
+        if (self._motor is None or
+            fila < 0 or fila >= self.filas or
             columna < 0 or columna >= self.columnas or
             self.tablero[fila][columna]["revelada"] or
             self.tablero[fila][columna]["bandera"] or
             self.partida_ganada or self.partida_perdida):
             return False
-        
-        celda = self.tablero[fila][columna]
-        celda["revelada"] = True
-        self.celdas_reveladas += 1
-        
-        # Si es mina, game over
-        if celda["es_mina"]:
-            self.partida_perdida = True
-            self._revelar_todas_las_minas()
-            return True
-        
-        # Si no tiene minas adyacentes, revelar celdas adyacentes
-        if celda["minas_adyacentes"] == 0:
-            self._revelar_celdas_adyacentes(fila, columna)
-        
-        # Verificar si ganó
-        if self.celdas_reveladas == (self.filas * self.columnas - self.minas):
-            self.partida_ganada = True
-            self._marcar_todas_las_minas()
-        
+
+        if not self._motor.revelar(fila, columna):
+            # Mina: game over y se muestran todas
+            self._mina_pisada = True
+            self._motor.revelar_minas()
+        elif self._motor.partida_ganada:
+            self._motor.marcar_minas()
         return True
-    
-    def _revelar_celdas_adyacentes(self, fila: int, columna: int):
-        """Revela recursivamente las celdas adyacentes"""
-        for i in range(-1, 2):
-            for j in range(-1, 2):
-                if i == 0 and j == 0:
-                    continue
-                    
-                nueva_fila, nueva_columna = fila + i, columna + j
-                if (0 <= nueva_fila < self.filas and 
-                    0 <= nueva_columna < self.columnas):
-                    self.revelar_celda(nueva_fila, nueva_columna)
-    
-    def _revelar_todas_las_minas(self):
-        """Revela todas las minas cuando se pierde"""
-        for fila in range(self.filas):
-            for columna in range(self.columnas):
-                if self.tablero[fila][columna]["es_mina"]:
-                    self.tablero[fila][columna]["revelada"] = True
-    
-    def _marcar_todas_las_minas(self):
-        """Marca todas las minas cuando se gana"""
-        for fila in range(self.filas):
-            for columna in range(self.columnas):
-                if self.tablero[fila][columna]["es_mina"]:
-                    self.tablero[fila][columna]["bandera"] = True
-    
+
     def alternar_bandera(self, fila: int, columna: int) -> bool:
         """Coloca o quita una bandera en una celda"""
-        if (fila < 0 or fila >= self.filas or 
+        if (self._motor is None or
+            fila < 0 or fila >= self.filas or
             columna < 0 or columna >= self.columnas or
             self.tablero[fila][columna]["revelada"] or
             self.partida_ganada or self.partida_perdida):
             return False
-        
-        self.tablero[fila][columna]["bandera"] = not self.tablero[fila][columna]["bandera"]
+
+        self._motor.alternar_bandera(fila, columna)
         return True
-    
+
     def obtener_minas_restantes(self) -> int:
         """Calcula las minas restantes por marcar"""
-        banderas_colocadas = 0
-        for fila in range(self.filas):
-            for columna in range(self.columnas):
-                if self.tablero[fila][columna]["bandera"]:
-                    banderas_colocadas += 1
-        
-        return self.minas - banderas_colocadas
\ No newline at end of file
+        if self.verificar_contadores:
+            self.comprobar_contadores()
+        return self.minas - self.banderas_colocadas
+
+    def comprobar_contadores(self):
+        """Recorre el tablero completo y valida los contadores incrementales"""
+        if self._motor is not None:
+            self._motor.comprobar_contadores()
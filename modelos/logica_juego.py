@@ -1,15 +1,61 @@
 # modelos/logica_juego.py
-import random
-from typing import List, Tuple, Iterator
+from array import array
+from collections import deque
+from typing import List, Optional, Tuple, Iterator, TYPE_CHECKING
 from modelos.clases_abstractas import JuegoAbstracto
+from modelos.generacion import muestrear_minas
+from modelos.topologia import tabla_vecinos
+from modelos.fabrica_tableros import FabricaTableros
+from modelos.historial import HistorialJugadas, REVELAR, BANDERA, MINAS
+
+if TYPE_CHECKING:
+    from modelos.sin_adivinar import GeneradorSinAdivinar, EstadisticasGeneracion
 
 class ExcepcionJuego(Exception):
     """Excepción personalizada para errores del juego"""
     pass
 
+class VistaFilas:
+    """Vista por filas, de sólo lectura y sin copias, sobre una capa plana del tablero (orden por filas)"""
+    def __init__(self, datos, filas: int, columnas: int):
+        self._datos = memoryview(datos).toreadonly()
+        self._filas = filas
+        self._columnas = columnas
+
+    def __len__(self) -> int:
+        return self._filas
+
+    def __getitem__(self, fila: int):
+        if fila < 0:
+            fila += self._filas
+        if not 0 <= fila < self._filas:
+            raise IndexError("Fila fuera del tablero")
+        inicio = fila * self._columnas
+        return self._datos[inicio:inicio + self._columnas]
+
+    def __iter__(self):
+        for fila in range(self._filas):
+            yield self[fila]
+
+    @property
+    def plana(self) -> memoryview:
+        """La capa completa en orden por filas, indexable por índice plano"""
+        return self._datos
+
+    def __eq__(self, otra) -> bool:
+        """Igual a otra vista o a una matriz anidada con los mismos valores por celda"""
+        if isinstance(otra, VistaFilas):
+            return (self._filas, self._columnas) == (otra._filas, otra._columnas) and self._datos == otra._datos
+        try:
+            return len(otra) == self._filas and all(list(fila) == list(otra_fila) for fila, otra_fila in zip(self, otra))
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
 class IteradorTablero:
     """Iterador para recorrer el tablero"""
-    def __init__(self, tablero: List[List[int]]):
+    def __init__(self, tablero: VistaFilas):
         self.tablero = tablero
         self.fila_actual = 0
         self.columna_actual = 0
@@ -32,22 +78,55 @@ class IteradorTablero:
         return (*posicion, valor)
 
 class Buscaminas(JuegoAbstracto):
-    def __init__(self, filas: int, columnas: int, minas: int):
+    def __init__(self, filas: int, columnas: int, minas: int, verificar_contadores: bool = False,
+                 semilla: Optional[int] = None, fabrica: Optional[FabricaTableros] = None,
+                 sin_adivinar: Optional["GeneradorSinAdivinar"] = None,
+                 historial: Optional[HistorialJugadas] = None, topologia: str = 'rectangular'):
         if minas >= filas * columnas:
             raise ExcepcionJuego("Demasiadas minas para el tamaño del tablero")
         
         self._filas = filas
         self._columnas = columnas
         self._minas = minas
+        # Vecinas precalculadas (CSR) compartidas por todos los tableros de esta forma
+        try:
+            self._vecinos = tabla_vecinos(topologia, filas, columnas)
+        except ValueError as e:
+            raise ExcepcionJuego(str(e))
+        if sin_adivinar is not None and topologia != 'rectangular':
+            raise ExcepcionJuego("El modo sin adivinar sólo admite tableros rectangulares")
 
-        self._tablero = [[0 for _ in range(columnas)] for _ in range(filas)]
-        self._revelado = [[False for _ in range(columnas)] for _ in range(filas)]
-        self._banderas = [[False for _ in range(columnas)] for _ in range(filas)]
+        # Una capa plana por estado, indexada en orden por filas: fila * columnas + columna
+        self._tablero = array('b', bytes(filas * columnas))
+        self._revelado = bytearray(filas * columnas)
+        self._banderas = bytearray(filas * columnas)
+        # Vistas vivas que reparte obtener_estado; `_version` sube con cada cambio de estado
+        self._vistas = tuple(VistaFilas(capa, filas, columnas) for capa in (self._tablero, self._revelado, self._banderas))
+        self._version = 0
 
         self._partida_terminada = False
         self._partida_ganada = False
         self._primer_click = True
-        self._posiciones_minas: List[Tuple[int, int]] = []
+        # Índices planos de las minas; los pares (fila, columna) se derivan al pedirlos
+        self._indices_minas: List[int] = []
+        self._posiciones_minas: Optional[List[Tuple[int, int]]] = None
+        # Con semilla, (semilla, dimensiones, minas, primer click) bastan para regenerar el tablero
+        self._semilla = semilla
+        self._posicion_primer_click: Optional[Tuple[int, int]] = None
+        # Reserva opcional de tableros pregenerados (FabricaTableros); no se usa con semilla
+        self._fabrica = fabrica
+        # Modo sin adivinar: al primer click se busca una semilla resoluble sólo con lógica
+        self._sin_adivinar = sin_adivinar
+        self._estadisticas_generacion: Optional["EstadisticasGeneracion"] = None
+        self._ultimas_reveladas: List[Tuple[int, int]] = []
+        # Diario opcional de deltas para deshacer/rehacer (práctica, backtracking del solucionador)
+        self._historial = historial
+
+        # Contadores incrementales para que victoria y minas restantes sean O(1)
+        self._seguras_reveladas = 0
+        self._banderas_colocadas = 0
+        # Modo de consistencia: contrasta los contadores con un recorrido completo
+        self._verificar_contadores = verificar_contadores
 
     @property
     def filas(self) -> int:
@@ -69,105 +148,343 @@ class Buscaminas(JuegoAbstracto):
     def partida_ganada(self) -> bool:
         return self._partida_ganada
 
-    def _colocar_minas_despues_primer_click(self, fila: int, columna: int):
-        """Coloca minas después del primer click para evitar perder inmediatamente"""
-        posiciones = [(r, c) for r in range(self._filas) for c in range(self._columnas)]
-        
-        # Remover la posición del primer click y sus alrededores
-        posiciones_seguras = set()
-        for dr in (-1, 0, 1):
-            for dc in (-1, 0, 1):
-                nr, nc = fila + dr, columna + dc
-                if 0 <= nr < self._filas and 0 <= nc < self._columnas:
-                    posiciones_seguras.add((nr, nc))
-        
-        posiciones = [pos for pos in posiciones if pos not in posiciones_seguras]
-        
+    @property
+    def semilla(self) -> Optional[int]:
+        return self._semilla
+
+    @property
+    def posicion_primer_click(self) -> Optional[Tuple[int, int]]:
+        return self._posicion_primer_click
+
+    @property
+    def estadisticas_generacion(self) -> Optional["EstadisticasGeneracion"]:
+        """Intentos que costó el tablero en modo sin adivinar (None en otro modo)"""
+        return self._estadisticas_generacion
+
+    @property
+    def version(self) -> int:
+        """Sube con cada cambio de estado: compararla con la de obtener_estado detecta vistas desfasadas"""
+        return self._version
+
+    @property
+    def minas_restantes(self) -> int:
+        return self._minas - self._banderas_colocadas
+
+    @property
+    def ultimas_reveladas(self) -> List[Tuple[int, int]]:
+        """Celdas abiertas por la última llamada a revelar, en orden de apertura"""
+        return self._ultimas_reveladas
+
+    @property
+    def minas_colocadas(self) -> bool:
+        return not self._primer_click
+
+    @property
+    def posiciones_minas(self) -> List[Tuple[int, int]]:
+        if self._posiciones_minas is None:
+            columnas = self._columnas
+            self._posiciones_minas = [divmod(indice, columnas) for indice in self._indices_minas]
+        return self._posiciones_minas
+
+    @property
+    def seguras_reveladas(self) -> int:
+        return self._seguras_reveladas
+
+    @property
+    def banderas_colocadas(self) -> int:
+        return self._banderas_colocadas
+
+    def es_mina(self, fila: int, columna: int) -> bool:
+        return self._tablero[fila * self._columnas + columna] == -1
+
+    def colocar_minas(self, fila: Optional[int] = None, columna: Optional[int] = None):
+        """Coloca las minas si aún no están puestas.
+
+        Con posición, ésa y sus vecinas quedan libres (primer click seguro);
+        sin posición se reparten por todo el tablero.
+        """
+        if not self._primer_click:
+            return
+        if fila is None:
+            self._colocar_minas_sin_zona()
+        else:
+            self._colocar_minas_despues_primer_click(fila, columna)
+        self._primer_click = False
+        self._version += 1
+
+    def _colocar_minas_sin_zona(self):
         try:
-            self._posiciones_minas = random.sample(posiciones, min(self._minas, len(posiciones)))
+            indices_minas = muestrear_minas(self._filas, self._columnas, self._minas, semilla=self._semilla)
         except ValueError as e:
             raise ExcepcionJuego(f"No se pueden colocar las minas: {e}")
+        self._indices_minas = indices_minas
+        self._tablero[:] = self._vecinos.calcular_adyacencias(indices_minas)
+
+    def _colocar_minas_despues_primer_click(self, fila: int, columna: int):
+        """Coloca minas después del primer click para evitar perder inmediatamente"""
+        if self._sin_adivinar is not None:
+            # La semilla dada (si la hay) es la base de la búsqueda, así que sigue siendo reproducible
+            self._semilla, self._estadisticas_generacion = self._sin_adivinar.generar(
+                self._filas, self._columnas, self._minas, fila, columna, self._semilla
+            )
 
-        self._tablero = [[0 for _ in range(self._columnas)] for _ in range(self._filas)]
+        generado = None
+        # Las simetrías de la reserva son las del rectángulo
+        if self._fabrica is not None and self._semilla is None and self._vecinos.topologia == 'rectangular':
+            generado = self._fabrica.tomar(self._filas, self._columnas, self._minas, fila, columna)
 
-        for r, c in self._posiciones_minas:
-            self._tablero[r][c] = -1
+        if generado is not None:
+            indices_minas, tablero = generado
+        else:
+            # La posición del primer click y sus alrededores quedan libres de minas
+            try:
+                indices_minas, tablero = self._vecinos.generar_tablero(self._semilla, self._minas, fila, columna)
+            except ValueError as e:
+                raise ExcepcionJuego(f"No se pueden colocar las minas: {e}")
 
-        for r in range(self._filas):
-            for c in range(self._columnas):
-                if self._tablero[r][c] != -1:
-                    self._tablero[r][c] = self._contar_minas_adyacentes(r, c)
+        self._posicion_primer_click = (fila, columna)
+        self._indices_minas = indices_minas
+        self._tablero[:] = tablero
 
     def _contar_minas_adyacentes(self, fila: int, columna: int) -> int:
-        contador = 0
-        for dr in (-1, 0, 1):
-            for dc in (-1, 0, 1):
-                if dr == 0 and dc == 0:
-                    continue
-                nr, nc = fila + dr, columna + dc
-                if 0 <= nr < self._filas and 0 <= nc < self._columnas:
-                    if self._tablero[nr][nc] == -1:
-                        contador += 1
-        return contador
+        tablero = self._tablero
+        return sum(1 for vecino in self._vecinos.de(fila * self._columnas + columna) if tablero[vecino] == -1)
 
     def revelar(self, fila: int, columna: int) -> bool:
         if not (0 <= fila < self._filas and 0 <= columna < self._columnas):
             raise ExcepcionJuego("Posición fuera del tablero")
             
-        if self._primer_click:
-            self._colocar_minas_despues_primer_click(fila, columna)
-            self._primer_click = False
+        self.colocar_minas(fila, columna)
 
-        if self._banderas[fila][columna]:
+        self._ultimas_reveladas = []
+        indice = fila * self._columnas + columna
+        if self._banderas[indice]:
             return True
 
-        if self._tablero[fila][columna] == -1:
+        antes = self._estado_partida()
+        if self._tablero[indice] == -1:
             self._partida_terminada = True
+            self._version += 1
+            self._registrar(REVELAR, antes)
             return False
 
-        if not self._revelado[fila][columna]:
-            self._revelado[fila][columna] = True
+        if not self._revelado[indice]:
+            self._ultimas_reveladas = self._abrir_region(fila, columna)
+            self._seguras_reveladas += len(self._ultimas_reveladas)
+            self._version += 1
+
+        self.verificar_victoria()
+        self._registrar(REVELAR, antes)
+        return True
+
+    def _abrir_region(self, fila: int, columna: int) -> List[Tuple[int, int]]:
+        """Revela la celda y expande las regiones vacías con una cola (BFS).
+
+        Cada celda se visita una sola vez y se devuelven las celdas abiertas.
+        """
+        columnas = self._columnas
+        tablero, revelado, banderas = self._tablero, self._revelado, self._banderas
+        vecinos_de = self._vecinos.de
+
+        origen = fila * columnas + columna
+        revelado[origen] = 1
+        abiertas = [origen]
+        cola = deque([origen]) if tablero[origen] == 0 else deque()
 
-            if self._tablero[fila][columna] == 0:
-                for dr in (-1, 0, 1):
-                    for dc in (-1, 0, 1):
-                        nr, nc = fila + dr, columna + dc
-                        if 0 <= nr < self._filas and 0 <= nc < self._columnas:
-                            if not self._revelado[nr][nc] and not self._banderas[nr][nc]:
-                                self.revelar(nr, nc)
+        while cola:
+            indice = cola.popleft()
+            for vecino in vecinos_de(indice):
+                if not revelado[vecino] and not banderas[vecino]:
+                    revelado[vecino] = 1
+                    abiertas.append(vecino)
+                    if tablero[vecino] == 0:
+                        cola.append(vecino)
+        return [divmod(indice, columnas) for indice in abiertas]
+
+    def chord(self, fila: int, columna: int) -> bool:
+        """Revela de una vez las vecinas sin bandera de un número ya satisfecho.
+
+        Sólo actúa si la celda está revelada y tiene tantas banderas alrededor
+        como su número. Las regiones vacías que se abran se expanden en la
+        misma llamada y `ultimas_reveladas` recoge todas las celdas abiertas.
+        Devuelve False si alguna de esas vecinas era una mina.
+        """
+        if not (0 <= fila < self._filas and 0 <= columna < self._columnas):
+            raise ExcepcionJuego("Posición fuera del tablero")
+
+        self._ultimas_reveladas = []
+        indice = fila * self._columnas + columna
+        valor = self._tablero[indice]
+        if self._partida_terminada or not self._revelado[indice] or valor <= 0:
+            return True
+
+        vecinos = self._vecinos.de(indice)
+        banderas = sum(1 for vecino in vecinos if self._banderas[vecino])
+        if banderas != valor:
+            return True
+
+        pendientes = [vecino for vecino in vecinos if not self._revelado[vecino] and not self._banderas[vecino]]
+        antes = self._estado_partida()
+        if any(self._tablero[vecino] == -1 for vecino in pendientes):
+            self._partida_terminada = True
+            self._version += 1
+            self._registrar(REVELAR, antes)
+            return False
+
+        for vecino in pendientes:
+            # Una expansión anterior del mismo chord puede haberla abierto ya
+            if not self._revelado[vecino]:
+                self._ultimas_reveladas.extend(self._abrir_region(*divmod(vecino, self._columnas)))
+        self._seguras_reveladas += len(self._ultimas_reveladas)
+        if self._ultimas_reveladas:
+            self._version += 1
 
         self.verificar_victoria()
+        self._registrar(REVELAR, antes)
         return True
 
     def alternar_bandera(self, fila: int, columna: int) -> None:
         if not (0 <= fila < self._filas and 0 <= columna < self._columnas):
             raise ExcepcionJuego("Posición fuera del tablero")
             
-        if not self._revelado[fila][columna] and not self._partida_terminada and not self._partida_ganada:
-            self._banderas[fila][columna] = not self._banderas[fila][columna]
+        indice = fila * self._columnas + columna
+        if not self._revelado[indice] and not self._partida_terminada and not self._partida_ganada:
+            antes = self._estado_partida()
+            self._banderas[indice] = not self._banderas[indice]
+            self._banderas_colocadas += 1 if self._banderas[indice] else -1
+            self._version += 1
             self.verificar_victoria()
+            if self._historial is not None:
+                self._historial.registrar(BANDERA, (indice,), antes, self._estado_partida())
+
+    def revelar_minas(self) -> List[Tuple[int, int]]:
+        """Muestra todas las minas al perder; no cuenta como celdas seguras reveladas.
+
+        Con historial se anexa a la jugada que perdió: deshacerla las vuelve a ocultar.
+        """
+        mostradas = [indice for indice in self._indices_minas if not self._revelado[indice]]
+        for indice in mostradas:
+            self._revelado[indice] = 1
+        if mostradas:
+            self._version += 1
+            if self._historial is not None:
+                self._historial.anexar(MINAS, mostradas, self._estado_partida())
+        return [divmod(indice, self._columnas) for indice in mostradas]
+
+    def marcar_minas(self) -> List[Tuple[int, int]]:
+        """Pone bandera en todas las minas que no la tengan (p. ej. al ganar).
+
+        Con historial se anexa a la jugada que ganó: deshacerla las quita.
+        """
+        marcadas = [indice for indice in self._indices_minas if not self._banderas[indice]]
+        for indice in marcadas:
+            self._banderas[indice] = 1
+        self._banderas_colocadas += len(marcadas)
+        if marcadas:
+            self._version += 1
+            if self._historial is not None:
+                self._historial.anexar(BANDERA, marcadas, self._estado_partida())
+        return [divmod(indice, self._columnas) for indice in marcadas]
+
+    # ----------------- Deshacer / rehacer -----------------
+    def _estado_partida(self) -> Tuple[bool, bool]:
+        return self._partida_terminada, self._partida_ganada
+
+    def _registrar(self, tipo: int, antes: Tuple[bool, bool]):
+        if self._historial is not None:
+            columnas = self._columnas
+            self._historial.registrar(
+                tipo, (f * columnas + c for f, c in self._ultimas_reveladas), antes, self._estado_partida()
+            )
+
+    def _aplicar_cambio(self, tipo: int, indices, deshacer: bool):
+        if tipo == BANDERA:
+            for indice in indices:
+                self._banderas[indice] = not self._banderas[indice]
+                self._banderas_colocadas += 1 if self._banderas[indice] else -1
+            return
+        valor = 0 if deshacer else 1
+        for indice in indices:
+            self._revelado[indice] = valor
+        # Las minas mostradas al perder no son celdas seguras
+        if tipo == REVELAR:
+            self._seguras_reveladas += -len(indices) if deshacer else len(indices)
+
+    def _aplicar(self, movimiento, deshacer: bool):
+        """Invierte o repite las celdas de una jugada y sus anexos; O(celdas cambiadas)"""
+        cambios = [(movimiento.tipo, movimiento.indices)] + movimiento.anexos
+        for tipo, celdas in (reversed(cambios) if deshacer else cambios):
+            self._aplicar_cambio(tipo, celdas, deshacer)
+
+        if deshacer:
+            self._partida_terminada, self._partida_ganada = movimiento.terminada_antes, movimiento.ganada_antes
+        else:
+            self._partida_terminada, self._partida_ganada = movimiento.terminada_despues, movimiento.ganada_despues
+        self._ultimas_reveladas = [divmod(indice, self._columnas) for _, celdas in cambios for indice in celdas]
+        self._version += 1
+
+        if self._verificar_contadores:
+            self.comprobar_contadores()
+
+    def deshacer(self) -> bool:
+        """Deshace la última jugada; `ultimas_reveladas` queda con las celdas a repintar"""
+        movimiento = self._historial.sacar_para_deshacer() if self._historial is not None else None
+        if movimiento is None:
+            return False
+        self._aplicar(movimiento, deshacer=True)
+        return True
+
+    def rehacer(self) -> bool:
+        """Repite la última jugada deshecha"""
+        movimiento = self._historial.sacar_para_rehacer() if self._historial is not None else None
+        if movimiento is None:
+            return False
+        self._aplicar(movimiento, deshacer=False)
+        return True
 
     def verificar_victoria(self) -> None:
-        # Verificar si todas las celdas no minadas están reveladas
-        for r in range(self._filas):
-            for c in range(self._columnas):
-                if self._tablero[r][c] != -1 and not self._revelado[r][c]:
-                    return
-        self._partida_ganada = True
-        self._partida_terminada = True
+        if self._verificar_contadores:
+            self.comprobar_contadores()
+
+        # Todas las celdas no minadas están reveladas
+        if self._primer_click:
+            return
+        celdas_seguras = self._filas * self._columnas - len(self._indices_minas)
+        if self._seguras_reveladas == celdas_seguras:
+            self._partida_ganada = True
+            self._partida_terminada = True
+
+    def comprobar_contadores(self) -> None:
+        """Recorre el tablero completo y valida los contadores incrementales"""
+        seguras = 0
+        for indice, valor in enumerate(self._tablero):
+            if valor != -1 and self._revelado[indice]:
+                seguras += 1
+        banderas = sum(self._banderas)
+
+        if seguras != self._seguras_reveladas or banderas != self._banderas_colocadas:
+            raise ExcepcionJuego(
+                f"Contadores inconsistentes: reveladas {self._seguras_reveladas} (real {seguras}), "
+                f"banderas {self._banderas_colocadas} (real {banderas})"
+            )
 
     def obtener_estado(self) -> dict:
+        """Estado con vistas vivas de sólo lectura (sin copias) y la versión en que se tomó"""
+        tablero, revelado, banderas = self._vistas
         return {
-            'tablero': self._tablero,
-            'revelado': self._revelado,
-            'banderas': self._banderas,
+            'tablero': tablero,
+            'revelado': revelado,
+            'banderas': banderas,
+            'version': self._version,
             'partida_terminada': self._partida_terminada,
             'partida_ganada': self._partida_ganada,
             'filas': self._filas,
             'columnas': self._columnas,
-            'minas': self._minas
+            'minas': self._minas,
+            'minas_restantes': self.minas_restantes,
+            'topologia': self._vecinos.topologia
         }
 
     def iterar_tablero(self) -> IteradorTablero:
         """Retorna un iterador para recorrer el tablero"""
-        return IteradorTablero(self._tablero)
\ No newline at end of file
+        return IteradorTablero(self._vistas[0])
\ No newline at end of file
@@ -0,0 +1,417 @@
+# modelos/probabilidades.py
+import math
+import random
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from modelos.logica_juego import ExcepcionJuego
+from modelos.topologia import tabla_vecinos
+
+# Restricción de un componente: (celdas locales, minas que quedan entre ellas)
+Restriccion = Tuple[Tuple[int, ...], int]
+# Resultado de un componente: minas k -> (peso de las soluciones, peso por celda con mina)
+Distribucion = Dict[int, Tuple[float, List[float]]]
+
+@dataclass
+class Probabilidades:
+    """Probabilidad de mina por celda oculta, tenga bandera o no"""
+    frontera: Dict[Tuple[int, int], float] = field(default_factory=dict)
+    # Probabilidad común a las celdas ocultas sin ningún número vecino
+    interior: Optional[float] = None
+    # False si algún componente se resolvió por muestreo en lugar de enumerarse
+    exacta: bool = True
+
+    def probabilidad(self, fila: int, columna: int) -> Optional[float]:
+        return self.frontera.get((fila, columna), self.interior)
+
+class MotorProbabilidades:
+    """Calcula probabilidades de mina sobre el estado visible de un Buscaminas.
+
+    La frontera se divide en componentes independientes (celdas ocultas que
+    comparten restricciones). Dentro de cada componente, las celdas que tocan
+    exactamente los mismos números forman una clase, y se enumera con
+    backtracking cuántas minas lleva cada clase. Las soluciones se ponderan
+    por las formas de colocar el resto de minas en el interior. Los
+    componentes se cachean por su firma de restricciones; los que superan
+    `max_clases_exactas` o `presupuesto_nodos` se estiman por muestreo.
+
+    `presupuesto_ms` acota el tiempo de cada consulta: la enumeración exacta
+    se corta a la mitad del presupuesto y el muestreo se detiene al agotarlo
+    (con al menos una muestra válida por componente). None lo desactiva.
+    """
+    def __init__(self, max_clases_exactas: int = 400, presupuesto_nodos: int = 200_000, muestras: int = 300,
+                 tamano_cache: int = 4096, semilla: Optional[int] = None, presupuesto_ms: Optional[float] = 100):
+        self._max_clases_exactas = max_clases_exactas
+        self._presupuesto_nodos = presupuesto_nodos
+        self._presupuesto_ms = presupuesto_ms
+        self._muestras = muestras
+        self._tamano_cache = tamano_cache
+        self._cache: "OrderedDict[tuple, Distribucion]" = OrderedDict()
+        self._aleatorio = random.Random(semilla)
+
+    # ----------------- Componentes -----------------
+    def _componentes(self, estado: dict) -> Tuple[List[Tuple[List[int], List[Restriccion]]], int, int]:
+        """Devuelve los componentes de la frontera, el nº de celdas interiores y las minas por colocar"""
+        filas, columnas = estado['filas'], estado['columnas']
+        tablero, revelado = estado['tablero'], estado['revelado']
+        vecinos = tabla_vecinos(estado.get('topologia', 'rectangular'), filas, columnas)
+
+        # Las banderas son opinión del jugador y pueden estar mal: una celda con
+        # bandera cuenta como cualquier otra celda oculta
+        desconocidas = 0
+        restricciones: List[Tuple[List[int], int]] = []
+        for f in range(filas):
+            for c in range(columnas):
+                if not revelado[f][c]:
+                    desconocidas += 1
+                    continue
+                valor = tablero[f][c]
+                if valor <= 0:
+                    continue
+                ocultas = []
+                for vecino in vecinos.de(f * columnas + c):
+                    nf, nc = divmod(vecino, columnas)
+                    if not revelado[nf][nc]:
+                        ocultas.append(vecino)
+                if ocultas:
+                    restricciones.append((ocultas, valor))
+
+        # Unión de celdas que aparecen en una misma restricción
+        padre: Dict[int, int] = {}
+
+        def raiz(x: int) -> int:
+            while padre[x] != x:
+                padre[x] = padre[padre[x]]
+                x = padre[x]
+            return x
+
+        for ocultas, _ in restricciones:
+            for celda in ocultas:
+                padre.setdefault(celda, celda)
+            primera = raiz(ocultas[0])
+            for celda in ocultas[1:]:
+                padre[raiz(celda)] = primera
+
+        grupos: Dict[int, Tuple[List[int], List[Tuple[List[int], int]]]] = {}
+        for celda in padre:
+            grupos.setdefault(raiz(celda), ([], []))[0].append(celda)
+        for ocultas, valor in restricciones:
+            grupos[raiz(ocultas[0])][1].append((ocultas, valor))
+
+        componentes = []
+        for celdas, restricciones_grupo in grupos.values():
+            celdas.sort()
+            local = {celda: posicion for posicion, celda in enumerate(celdas)}
+            firma = sorted({(tuple(sorted(local[c] for c in ocultas)), valor) for ocultas, valor in restricciones_grupo})
+            componentes.append((celdas, firma))
+
+        interior = desconocidas - len(padre)
+        return componentes, interior, estado['minas']
+
+    def _resolver(self, n: int, restricciones: List[Restriccion], limite_exacto: Optional[float] = None,
+                  limite: Optional[float] = None) -> Tuple[Distribucion, bool]:
+        firma = (n, tuple(restricciones))
+        if firma in self._cache:
+            self._cache.move_to_end(firma)
+            return self._cache[firma], True
+
+        clases, tamanos, por_clase = self._agrupar(n, restricciones)
+        conteos = None
+        if len(clases) <= self._max_clases_exactas:
+            conteos = self._enumerar(tamanos, por_clase, restricciones, limite_exacto)
+        exacta = conteos is not None
+        if not exacta:
+            conteos = self._muestrear(tamanos, por_clase, restricciones, limite)
+
+        distribucion = self._normalizar(conteos, clases, tamanos, n)
+
+        # Sólo se cachean los resultados exactos
+        if exacta:
+            self._cache[firma] = distribucion
+            if len(self._cache) > self._tamano_cache:
+                self._cache.popitem(last=False)
+        return distribucion, exacta
+
+    @staticmethod
+    def _agrupar(n: int, restricciones: List[Restriccion]):
+        """Agrupa en clases las celdas que pertenecen exactamente a las mismas restricciones.
+
+        Las clases se ordenan recorriendo las restricciones en anchura, para
+        que el backtracking cierre cada restricción lo antes posible.
+        """
+        pertenencia: List[List[int]] = [[] for _ in range(n)]
+        for j, (celdas, _) in enumerate(restricciones):
+            for celda in celdas:
+                pertenencia[celda].append(j)
+
+        orden: List[int] = []
+        vista = [False] * n
+        restriccion_vista = [False] * len(restricciones)
+        for inicio in range(n):
+            if vista[inicio]:
+                continue
+            vista[inicio] = True
+            cola = deque([inicio])
+            while cola:
+                celda = cola.popleft()
+                orden.append(celda)
+                for j in pertenencia[celda]:
+                    if restriccion_vista[j]:
+                        continue
+                    restriccion_vista[j] = True
+                    for otra in restricciones[j][0]:
+                        if not vista[otra]:
+                            vista[otra] = True
+                            cola.append(otra)
+
+        indice_clase: Dict[tuple, int] = {}
+        clases: List[List[int]] = []
+        por_clase: List[Tuple[int, ...]] = []
+        for celda in orden:
+            clave = tuple(pertenencia[celda])
+            if clave not in indice_clase:
+                indice_clase[clave] = len(clases)
+                clases.append([])
+                por_clase.append(clave)
+            clases[indice_clase[clave]].append(celda)
+        return clases, [len(celdas) for celdas in clases], por_clase
+
+    @staticmethod
+    def _rango(clase: int, tamanos: List[int], por_clase, objetivo, minas_en, capacidad) -> Tuple[int, int]:
+        """Valores posibles de minas en la clase según las restricciones que la contienen"""
+        minimo, maximo = 0, tamanos[clase]
+        for j in por_clase[clase]:
+            faltan = objetivo[j] - minas_en[j]
+            maximo = min(maximo, faltan)
+            minimo = max(minimo, faltan - (capacidad[j] - tamanos[clase]))
+        return minimo, maximo
+
+    def _enumerar(self, tamanos: List[int], por_clase, restricciones: List[Restriccion],
+                  limite: Optional[float] = None) -> Optional[Dict]:
+        """Backtracking sobre clases con propagación de rangos; None si se agota el presupuesto"""
+        n = len(tamanos)
+        objetivo = [valor for _, valor in restricciones]
+        minas_en = [0] * len(restricciones)
+        capacidad = [0] * len(restricciones)
+        for clase, tamano in enumerate(tamanos):
+            for j in por_clase[clase]:
+                capacidad[j] += tamano
+        asignacion = [0] * n
+        conteos: Dict[int, List] = {}
+        nodos = [0]
+
+        def paso(i: int, k: int, peso: int) -> bool:
+            nodos[0] += 1
+            if nodos[0] > self._presupuesto_nodos:
+                return False
+            # El reloj se consulta cada 1024 nodos
+            if limite is not None and not nodos[0] & 1023 and time.perf_counter() > limite:
+                return False
+            if i == n:
+                entrada = conteos.setdefault(k, [0, [0] * n])
+                entrada[0] += peso
+                for clase in range(n):
+                    entrada[1][clase] += peso * asignacion[clase]
+                return True
+            minimo, maximo = self._rango(i, tamanos, por_clase, objetivo, minas_en, capacidad)
+            for j in por_clase[i]:
+                capacidad[j] -= tamanos[i]
+            seguir = True
+            for valor in range(minimo, maximo + 1):
+                for j in por_clase[i]:
+                    minas_en[j] += valor
+                asignacion[i] = valor
+                seguir = paso(i + 1, k + valor, peso * math.comb(tamanos[i], valor))
+                for j in por_clase[i]:
+                    minas_en[j] -= valor
+                if not seguir:
+                    break
+            for j in por_clase[i]:
+                capacidad[j] += tamanos[i]
+            asignacion[i] = 0
+            return seguir
+
+        if not paso(0, 0, 1):
+            return None
+        return conteos
+
+    @staticmethod
+    def _acotar(cotas: List[List[int]], clases_de: List[List[int]], objetivo: List[int], por_clase,
+                pendientes: Iterable[int]) -> bool:
+        """Ajusta las cotas [mínimo, máximo] de minas por clase hasta que todas las
+        restricciones las respeten; False si alguna queda imposible. Sólo descarta
+        valores que no admiten ninguna solución."""
+        cola = deque(pendientes)
+        en_cola = set(cola)
+        while cola:
+            j = cola.popleft()
+            en_cola.discard(j)
+            suma_minimos = sum(cotas[clase][0] for clase in clases_de[j])
+            suma_maximos = sum(cotas[clase][1] for clase in clases_de[j])
+            if suma_minimos > objetivo[j] or suma_maximos < objetivo[j]:
+                return False
+            for clase in clases_de[j]:
+                minimo, maximo = cotas[clase]
+                nuevo_maximo = min(maximo, objetivo[j] - (suma_minimos - minimo))
+                nuevo_minimo = max(minimo, objetivo[j] - (suma_maximos - maximo))
+                if nuevo_minimo > nuevo_maximo:
+                    return False
+                if (nuevo_minimo, nuevo_maximo) != (minimo, maximo):
+                    cotas[clase] = [nuevo_minimo, nuevo_maximo]
+                    for otra in por_clase[clase]:
+                        if otra not in en_cola:
+                            en_cola.add(otra)
+                            cola.append(otra)
+        return True
+
+    def _muestrear(self, tamanos: List[int], por_clase, restricciones: List[Restriccion],
+                   limite: Optional[float] = None) -> Dict:
+        """Estimación acotada por muestreo secuencial con pesos de importancia.
+
+        Cada muestra recorre las clases en orden y elige las minas de la clase
+        dentro de sus cotas (propagadas tras cada elección) con probabilidad
+        q(v) = C(tamaño, v) / S, siendo S la suma de C(tamaño, v) en las cotas.
+        El peso de la solución, ∏ C(tamaño, v), dividido por la probabilidad de
+        proponerla, ∏ q(v), queda en ∏ S: así cada k se estima sin sesgo, en
+        lugar de contar más las soluciones que el recorrido encuentra con más
+        facilidad. Una muestra que llega a una contradicción pesa 0.
+        """
+        n = len(tamanos)
+        objetivo = [valor for _, valor in restricciones]
+        clases_de: List[List[int]] = [[] for _ in restricciones]
+        for clase in range(n):
+            for j in por_clase[clase]:
+                clases_de[j].append(clase)
+        cotas_iniciales = [[0, tamano] for tamano in tamanos]
+        if not self._acotar(cotas_iniciales, clases_de, objetivo, por_clase, range(len(restricciones))):
+            raise ExcepcionJuego("Estado inconsistente: el componente no tiene solución")
+
+        conteos: Dict[int, List] = {}
+        aleatorio = self._aleatorio
+        validas = 0
+        for _ in range(20 * self._muestras):
+            if validas == self._muestras or (validas and limite is not None and time.perf_counter() > limite):
+                break
+            cotas = [list(cota) for cota in cotas_iniciales]
+            peso = 1
+            for clase in range(n):
+                minimo, maximo = cotas[clase]
+                combinaciones = [math.comb(tamanos[clase], valor) for valor in range(minimo, maximo + 1)]
+                valor = minimo + aleatorio.choices(range(len(combinaciones)), weights=combinaciones)[0]
+                peso *= sum(combinaciones)
+                cotas[clase] = [valor, valor]
+                if not self._acotar(cotas, clases_de, objetivo, por_clase, por_clase[clase]):
+                    peso = 0
+                    break
+            if not peso:
+                continue
+
+            validas += 1
+            asignacion = [minimo for minimo, _ in cotas]
+            entrada = conteos.setdefault(sum(asignacion), [0, [0] * n])
+            entrada[0] += peso
+            for clase in range(n):
+                entrada[1][clase] += peso * asignacion[clase]
+
+        if not conteos:
+            raise ExcepcionJuego("No se encontró ninguna solución para el componente")
+        return conteos
+
+    @staticmethod
+    def _normalizar(conteos: Dict[int, List], clases: List[List[int]], tamanos: List[int], n: int) -> Distribucion:
+        """Pasa los conteos enteros por clase a pesos por celda en coma flotante.
+
+        Cada término final usa exactamente un k de cada componente, así que
+        escalar un componente no cambia las probabilidades y evita desbordes.
+        Las celdas de una clase son intercambiables y reparten su valor por igual.
+        """
+        if not conteos:
+            raise ExcepcionJuego("Estado inconsistente: el componente no tiene solución")
+        escala = max(total for total, _ in conteos.values())
+        distribucion: Distribucion = {}
+        for k, (total, esperadas) in conteos.items():
+            valores = [0.0] * n
+            for clase, celdas in enumerate(clases):
+                valor = esperadas[clase] / (escala * tamanos[clase])
+                for celda in celdas:
+                    valores[celda] = valor
+            distribucion[k] = (total / escala, valores)
+        return distribucion
+
+    # ----------------- Combinación -----------------
+    @staticmethod
+    def _convolucion(a: Dict[int, float], b: Dict[int, float]) -> Dict[int, float]:
+        resultado: Dict[int, float] = {}
+        for ka, va in a.items():
+            for kb, vb in b.items():
+                resultado[ka + kb] = resultado.get(ka + kb, 0.0) + va * vb
+        return resultado
+
+    def calcular(self, estado: dict) -> Probabilidades:
+        limite_exacto = limite = None
+        if self._presupuesto_ms is not None:
+            inicio = time.perf_counter()
+            limite_exacto = inicio + self._presupuesto_ms / 2000
+            limite = inicio + self._presupuesto_ms / 1000
+        componentes, interior, minas_restantes = self._componentes(estado)
+        columnas = estado['columnas']
+
+        resueltos = []
+        exacta = True
+        for celdas, firma in componentes:
+            distribucion, es_exacta = self._resolver(len(celdas), firma, limite_exacto, limite)
+            exacta = exacta and es_exacta
+            resueltos.append((celdas, distribucion))
+
+        # Peso relativo de colocar m minas en el interior: C(interior, m), en escala logarítmica
+        def log_combinaciones(m: int) -> Optional[float]:
+            if m < 0 or m > interior:
+                return None
+            return math.lgamma(interior + 1) - math.lgamma(m + 1) - math.lgamma(interior - m + 1)
+
+        totales = [{k: total for k, (total, _) in distribucion.items()} for _, distribucion in resueltos]
+        prefijos = [{0: 1.0}]
+        for total in totales:
+            prefijos.append(self._convolucion(prefijos[-1], total))
+        sufijos = [{0: 1.0}]
+        for total in reversed(totales):
+            sufijos.append(self._convolucion(sufijos[-1], total))
+        sufijos.reverse()
+
+        logs = {K: log_combinaciones(minas_restantes - K) for K in prefijos[-1]}
+        validos = [valor for valor in logs.values() if valor is not None]
+        if not validos:
+            raise ExcepcionJuego("Estado inconsistente: no hay forma de colocar las minas restantes")
+        referencia = max(validos)
+
+        def peso(K: int) -> float:
+            valor = logs.get(K)
+            if valor is None:
+                valor = log_combinaciones(minas_restantes - K)
+            return 0.0 if valor is None else math.exp(valor - referencia)
+
+        total_global = sum(n * peso(K) for K, n in prefijos[-1].items())
+        if total_global == 0:
+            raise ExcepcionJuego("Estado inconsistente: no hay forma de colocar las minas restantes")
+
+        resultado = Probabilidades(exacta=exacta)
+        for i, (celdas, distribucion) in enumerate(resueltos):
+            resto = self._convolucion(prefijos[i], sufijos[i + 1])
+            acumulado = [0.0] * len(celdas)
+            for k, (_, por_celda) in distribucion.items():
+                factor = sum(n * peso(k + s) for s, n in resto.items())
+                if factor:
+                    for posicion, valor in enumerate(por_celda):
+                        acumulado[posicion] += valor * factor
+            for celda, valor in zip(celdas, acumulado):
+                resultado.frontera[divmod(celda, columnas)] = valor / total_global
+
+        if interior > 0:
+            esperadas = sum(
+                n * peso(K) * (minas_restantes - K)
+                for K, n in prefijos[-1].items()
+                if 0 <= minas_restantes - K <= interior
+            )
+            resultado.interior = esperadas / total_global / interior
+        return resultado
@@ -0,0 +1,202 @@
+# modelos/simulacion.py
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Dict, Iterator, List, Optional, Tuple
+from modelos.logica_juego import Buscaminas
+from modelos.solucionador import Solucionador
+
+# Las mismas dificultades que ofrece AplicacionBuscaminas
+PRESETS_DIFICULTAD: Dict[str, Tuple[int, int, int]] = {
+    "Fácil": (8, 8, 10),
+    "Medio": (12, 12, 30),
+    "Difícil": (16, 16, 60),
+}
+
+class EstrategiaBot(ABC):
+    """Bot que decide jugadas mirando sólo lo que vería un jugador"""
+    @abstractmethod
+    def iniciar(self, juego: Buscaminas, rng: random.Random) -> None:
+        pass
+
+    @abstractmethod
+    def elegir(self) -> Tuple[int, int]:
+        pass
+
+    def observar(self, reveladas: List[Tuple[int, int]]) -> None:
+        """Recibe las celdas abiertas por la última jugada"""
+        pass
+
+def _celda_oculta_al_azar(juego: Buscaminas, rng: random.Random, evitar=()) -> Tuple[int, int]:
+    estado = juego.obtener_estado()
+    revelado, banderas = estado['revelado'], estado['banderas']
+    candidatas = [
+        (f, c)
+        for f in range(juego.filas)
+        for c in range(juego.columnas)
+        if not revelado[f][c] and not banderas[f][c] and (f, c) not in evitar
+    ]
+    return rng.choice(candidatas)
+
+class EstrategiaAleatoria(EstrategiaBot):
+    """Abre el centro y luego celdas ocultas al azar; sirve de línea base"""
+    def iniciar(self, juego: Buscaminas, rng: random.Random) -> None:
+        self._juego = juego
+        self._rng = rng
+        self._primera = True
+
+    def elegir(self) -> Tuple[int, int]:
+        if self._primera:
+            self._primera = False
+            return self._juego.filas // 2, self._juego.columnas // 2
+        return _celda_oculta_al_azar(self._juego, self._rng)
+
+class EstrategiaSolucionador(EstrategiaBot):
+    """Juega las celdas seguras que deduce Solucionador y adivina sólo cuando no hay ninguna"""
+    def iniciar(self, juego: Buscaminas, rng: random.Random) -> None:
+        self._juego = juego
+        self._rng = rng
+        # Vistas vivas sobre el tablero: se leen sin pedir el estado en cada jugada
+        self._revelado = juego.obtener_estado()['revelado']
+        self._solucionador: Optional[Solucionador] = None
+        self._seguras: List[Tuple[int, int]] = []
+
+    def elegir(self) -> Tuple[int, int]:
+        if self._solucionador is None:
+            return self._juego.filas // 2, self._juego.columnas // 2
+
+        while self._seguras:
+            celda = self._seguras.pop()
+            if not self._revelado[celda[0]][celda[1]]:
+                return celda
+
+        seguras, minas = self._solucionador.deducir()
+        if seguras:
+            self._seguras = seguras
+            return self._seguras.pop()
+        return _celda_oculta_al_azar(self._juego, self._rng, evitar=set(minas))
+
+    def observar(self, reveladas: List[Tuple[int, int]]) -> None:
+        if self._solucionador is None:
+            self._solucionador = Solucionador(self._juego.obtener_estado())
+        self._solucionador.registrar_revelacion(reveladas)
+
+ESTRATEGIAS = {
+    'aleatoria': EstrategiaAleatoria,
+    'solucionador': EstrategiaSolucionador,
+}
+
+@dataclass
+class ResultadoAgregado:
+    """Acumulado de muchas partidas; se combina sin guardar ninguna partida individual"""
+    partidas: int = 0
+    ganadas: int = 0
+    jugadas: int = 0
+    jugadas_ganadas: int = 0
+    segundos: float = 0.0
+    segundos_max: float = 0.0
+
+    @property
+    def tasa_victoria(self) -> float:
+        return self.ganadas / self.partidas if self.partidas else 0.0
+
+    @property
+    def jugadas_promedio(self) -> float:
+        return self.jugadas / self.partidas if self.partidas else 0.0
+
+    @property
+    def segundos_promedio(self) -> float:
+        return self.segundos / self.partidas if self.partidas else 0.0
+
+    def registrar(self, ganada: bool, jugadas: int, segundos: float):
+        self.partidas += 1
+        self.jugadas += jugadas
+        self.segundos += segundos
+        self.segundos_max = max(self.segundos_max, segundos)
+        if ganada:
+            self.ganadas += 1
+            self.jugadas_ganadas += jugadas
+
+    def combinar(self, otro: "ResultadoAgregado"):
+        self.partidas += otro.partidas
+        self.ganadas += otro.ganadas
+        self.jugadas += otro.jugadas
+        self.jugadas_ganadas += otro.jugadas_ganadas
+        self.segundos += otro.segundos
+        self.segundos_max = max(self.segundos_max, otro.segundos_max)
+
+def jugar_partida(estrategia: EstrategiaBot, filas: int, columnas: int, minas: int,
+                  semilla: int) -> Tuple[bool, int]:
+    """Juega una partida con semilla hasta el final; devuelve (ganada, jugadas)"""
+    juego = Buscaminas(filas, columnas, minas, semilla=semilla)
+    estrategia.iniciar(juego, random.Random(semilla))
+    jugadas = 0
+    while not juego.partida_terminada:
+        fila, columna = estrategia.elegir()
+        juego.revelar(fila, columna)
+        jugadas += 1
+        if not juego.partida_terminada:
+            estrategia.observar(juego.ultimas_reveladas)
+    return juego.partida_ganada, jugadas
+
+def _simular_lote(argumentos: Tuple[str, int, int, int, int, int]) -> ResultadoAgregado:
+    nombre_estrategia, filas, columnas, minas, primera_semilla, cantidad = argumentos
+    estrategia = ESTRATEGIAS[nombre_estrategia]()
+    resultado = ResultadoAgregado()
+    for semilla in range(primera_semilla, primera_semilla + cantidad):
+        inicio = time.perf_counter()
+        ganada, jugadas = jugar_partida(estrategia, filas, columnas, minas, semilla)
+        resultado.registrar(ganada, jugadas, time.perf_counter() - inicio)
+    return resultado
+
+def simular(estrategia: str, filas: int, columnas: int, minas: int, partidas: int,
+            semilla_base: int = 0, procesos: Optional[int] = None,
+            tamano_lote: int = 500) -> Iterator[ResultadoAgregado]:
+    """Reparte `partidas` partidas con semilla en un ProcessPoolExecutor.
+
+    Cada proceso juega lotes de semillas consecutivas y devuelve sólo su
+    agregado. Se produce una copia del acumulado tras cada lote terminado
+    (guardarlas no las altera después); como mucho hay dos lotes en vuelo
+    por proceso, así la memoria no crece con `partidas`.
+    """
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estrategia desconocida: {estrategia}")
+    procesos = procesos if procesos is not None else (os.cpu_count() or 1)
+
+    lotes = (
+        (estrategia, filas, columnas, minas, semilla_base + inicio, min(tamano_lote, partidas - inicio))
+        for inicio in range(0, partidas, tamano_lote)
+    )
+    total = ResultadoAgregado()
+
+    if procesos <= 1:
+        for lote in lotes:
+            total.combinar(_simular_lote(lote))
+            yield replace(total)
+        return
+
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        en_vuelo = set()
+        for lote in lotes:
+            en_vuelo.add(ejecutor.submit(_simular_lote, lote))
+            if len(en_vuelo) < procesos * 2:
+                continue
+            terminados, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                total.combinar(futuro.result())
+                yield replace(total)
+        for futuro in en_vuelo:
+            total.combinar(futuro.result())
+            yield replace(total)
+
+if __name__ == "__main__":
+    for nombre, (filas, columnas, minas) in PRESETS_DIFICULTAD.items():
+        inicio = time.perf_counter()
+        for resultado in simular('solucionador', filas, columnas, minas, partidas=2_000):
+            pass
+        transcurrido = time.perf_counter() - inicio
+        print(f"{nombre}: {resultado.partidas} partidas, victoria {resultado.tasa_victoria:.1%}, "
+              f"{resultado.jugadas_promedio:.1f} jugadas, {resultado.partidas / transcurrido:.0f} partidas/s")
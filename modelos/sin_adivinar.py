@@ -0,0 +1,116 @@
+# modelos/sin_adivinar.py
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from modelos.logica_juego import Buscaminas, ExcepcionJuego
+from modelos.solucionador import Solucionador
+
+@dataclass
+class EstadisticasGeneracion:
+    """Intentos de generación sin adivinar, para ajustar el modo"""
+    intentos: int = 0
+    resolubles: int = 0
+    lotes: int = 0
+    segundos: float = 0.0
+
+    @property
+    def tasa_exito(self) -> float:
+        return self.resolubles / self.intentos if self.intentos else 0.0
+
+    def acumular(self, otras: "EstadisticasGeneracion"):
+        self.intentos += otras.intentos
+        self.resolubles += otras.resolubles
+        self.lotes += otras.lotes
+        self.segundos += otras.segundos
+
+def es_resoluble(semilla: int, filas: int, columnas: int, minas: int, fila: int, columna: int) -> bool:
+    """Juega el tablero de la semilla sólo con deducciones seguras desde el primer click"""
+    juego = Buscaminas(filas, columnas, minas, semilla=semilla)
+    juego.revelar(fila, columna)
+    solucionador = Solucionador(juego.obtener_estado())
+    solucionador.registrar_revelacion(juego.ultimas_reveladas)
+
+    while not juego.partida_ganada:
+        seguras, minas_seguras = solucionador.deducir()
+        if not seguras:
+            # Regla global: si ya se conocen todas las minas, el resto de ocultas es seguro
+            if len(minas_seguras) != minas:
+                return False
+            conocidas = set(minas_seguras)
+            estado = juego.obtener_estado()
+            seguras = [
+                (f, c)
+                for f in range(filas)
+                for c in range(columnas)
+                if not estado['revelado'][f][c] and (f, c) not in conocidas
+            ]
+        for f, c in seguras:
+            juego.revelar(f, c)
+            solucionador.registrar_revelacion(juego.ultimas_reveladas)
+    return True
+
+def _probar_semilla(argumentos: Tuple[int, int, int, int, int, int]) -> bool:
+    return es_resoluble(*argumentos)
+
+class GeneradorSinAdivinar:
+    """Busca semillas cuyo tablero se resuelve sólo con lógica desde el primer click.
+
+    Los candidatos se prueban por lotes en un ProcessPoolExecutor. La búsqueda
+    recorre semillas consecutivas desde una base, así que con la misma base
+    el resultado es reproducible.
+    """
+    def __init__(self, procesos: Optional[int] = None, max_intentos: int = 10_000):
+        self._procesos = procesos if procesos is not None else (os.cpu_count() or 1)
+        self._max_intentos = max_intentos
+        self._ejecutor: Optional[ProcessPoolExecutor] = None
+        self.estadisticas = EstadisticasGeneracion()
+
+    def _obtener_ejecutor(self) -> Optional[ProcessPoolExecutor]:
+        if self._procesos <= 1:
+            return None
+        if self._ejecutor is None:
+            self._ejecutor = ProcessPoolExecutor(max_workers=self._procesos)
+        return self._ejecutor
+
+    def generar(self, filas: int, columnas: int, minas: int, fila: int, columna: int,
+                semilla_base: Optional[int] = None) -> Tuple[int, EstadisticasGeneracion]:
+        """Devuelve una semilla resoluble para ese primer click y las estadísticas del intento"""
+        if semilla_base is None:
+            semilla_base = random.getrandbits(63)
+
+        estadisticas = EstadisticasGeneracion()
+        inicio = time.perf_counter()
+        ejecutor = self._obtener_ejecutor()
+        tamano_lote = max(1, self._procesos * 4)
+
+        try:
+            while estadisticas.intentos < self._max_intentos:
+                semillas = range(semilla_base + estadisticas.intentos,
+                                 semilla_base + min(self._max_intentos, estadisticas.intentos + tamano_lote))
+                argumentos = [(semilla, filas, columnas, minas, fila, columna) for semilla in semillas]
+                if ejecutor is None:
+                    resultados: List[bool] = list(map(_probar_semilla, argumentos))
+                else:
+                    resultados = list(ejecutor.map(_probar_semilla, argumentos,
+                                                   chunksize=max(1, len(argumentos) // self._procesos)))
+
+                estadisticas.lotes += 1
+                estadisticas.intentos += len(argumentos)
+                estadisticas.resolubles += sum(resultados)
+                # La primera resoluble en orden de semilla: el resultado no depende del reparto
+                for semilla, resoluble in zip(semillas, resultados):
+                    if resoluble:
+                        return semilla, estadisticas
+        finally:
+            estadisticas.segundos = time.perf_counter() - inicio
+            self.estadisticas.acumular(estadisticas)
+
+        raise ExcepcionJuego(f"No se encontró un tablero sin adivinar en {self._max_intentos} intentos")
+
+    def cerrar(self):
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown()
+            self._ejecutor = None
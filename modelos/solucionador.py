@@ -0,0 +1,168 @@
+# modelos/solucionador.py
+from collections import deque
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+from modelos.topologia import tabla_vecinos
+
+class Solucionador:
+    """Deduce celdas seguras y minas seguras a partir del estado visible del tablero.
+
+    Trabaja sobre el diccionario de `Buscaminas.obtener_estado()` y sólo lee
+    el valor de las celdas reveladas. Las banderas del jugador no cuentan como
+    minas: una bandera equivocada haría pasar minas reales por seguras, así que
+    sólo se descuentan las minas que el propio solucionador ha deducido. La
+    frontera (números revelados con vecinas ocultas) se mantiene de forma
+    incremental: después de cada jugada hay que avisar con
+    `registrar_revelacion`, y `deducir` sólo reevalúa las restricciones afectadas.
+    """
+    def __init__(self, estado: dict):
+        self._filas = estado['filas']
+        self._columnas = estado['columnas']
+        self._tablero = estado['tablero']
+        self._revelado = estado['revelado']
+        # Vecinas según la topología del tablero (la misma tabla que usa el motor)
+        self._tabla_vecinos = tabla_vecinos(estado.get('topologia', 'rectangular'), self._filas, self._columnas)
+
+        self._frontera: Set[int] = set()
+        self._pendientes: Set[int] = set()
+        self._seguras: Set[int] = set()
+        self._minas: Set[int] = set()
+        self._reconstruir()
+
+    def _vecinos(self, indice: int) -> Sequence[int]:
+        return self._tabla_vecinos.de(indice)
+
+    def _esta_revelada(self, indice: int) -> bool:
+        fila, columna = divmod(indice, self._columnas)
+        return bool(self._revelado[fila][columna])
+
+    def _valor(self, indice: int) -> int:
+        fila, columna = divmod(indice, self._columnas)
+        return self._tablero[fila][columna]
+
+    def _reconstruir(self):
+        """Recorrido completo inicial; después todo se actualiza por jugada"""
+        self._frontera.clear()
+        for indice in range(self._filas * self._columnas):
+            if self._esta_revelada(indice) and self._valor(indice) > 0:
+                self._frontera.add(indice)
+        self._pendientes = set(self._frontera)
+
+    def _restriccion(self, indice: int) -> Tuple[Set[int], int]:
+        """Vecinas aún desconocidas de un número y cuántas minas quedan entre ellas.
+
+        Una celda con bandera sigue siendo desconocida salvo que se haya deducido.
+        """
+        ocultas = set()
+        restantes = self._valor(indice)
+        for vecino in self._vecinos(indice):
+            if self._esta_revelada(vecino) or vecino in self._seguras:
+                continue
+            if vecino in self._minas:
+                restantes -= 1
+            else:
+                ocultas.add(vecino)
+        return ocultas, restantes
+
+    # ----------------- Actualizaciones incrementales -----------------
+    def registrar_revelacion(self, celdas: Iterable[Tuple[int, int]]):
+        """Incorpora las celdas abiertas por una jugada (p. ej. `ultimas_reveladas`)"""
+        for fila, columna in celdas:
+            indice = fila * self._columnas + columna
+            self._seguras.discard(indice)
+            if self._valor(indice) > 0:
+                self._frontera.add(indice)
+                self._pendientes.add(indice)
+            for vecino in self._vecinos(indice):
+                if vecino in self._frontera:
+                    self._pendientes.add(vecino)
+
+    def registrar_bandera(self, fila: int, columna: int):
+        """Las banderas no entran en la deducción; se mantiene por compatibilidad"""
+
+    # ----------------- Deducción -----------------
+    def _decidir(self, celdas: Set[int], son_minas: bool, cola: deque, en_cola: Set[int]):
+        destino = self._minas if son_minas else self._seguras
+        for celda in celdas:
+            destino.add(celda)
+            # Las restricciones que tocan la celda decidida pueden avanzar
+            for vecino in self._vecinos(celda):
+                if vecino in self._frontera and vecino not in en_cola:
+                    cola.append(vecino)
+                    en_cola.add(vecino)
+
+    def _cercanos_en_frontera(self, indice: int) -> List[int]:
+        """Números de la frontera a distancia <= 2, los únicos que pueden compartir vecinas"""
+        cercanos = set()
+        for vecino in self._vecinos(indice):
+            cercanos.add(vecino)
+            cercanos.update(self._vecinos(vecino))
+        cercanos.discard(indice)
+        # En orden de índice, como el recorrido por filas de antes
+        return [celda for celda in sorted(cercanos) if celda in self._frontera]
+
+    def deducir(self) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """Aplica las reglas de celda única y de subconjunto hasta no poder avanzar.
+
+        Devuelve (seguras, minas) como listas de (fila, columna).
+        """
+        cola = deque(self._pendientes)
+        en_cola = set(self._pendientes)
+        self._pendientes.clear()
+
+        while cola:
+            a = cola.popleft()
+            en_cola.discard(a)
+            if a not in self._frontera:
+                continue
+
+            ocultas_a, restantes_a = self._restriccion(a)
+            if not ocultas_a:
+                self._frontera.discard(a)
+                continue
+
+            # Regla de celda única
+            if restantes_a == 0:
+                self._decidir(ocultas_a, False, cola, en_cola)
+                continue
+            if restantes_a == len(ocultas_a):
+                self._decidir(ocultas_a, True, cola, en_cola)
+                continue
+
+            # Regla de subconjunto: si las ocultas de una restricción están
+            # contenidas en las de otra, la diferencia tiene la diferencia de minas
+            for b in self._cercanos_en_frontera(a):
+                ocultas_b, restantes_b = self._restriccion(b)
+                if not ocultas_b:
+                    continue
+                for menor, r_menor, mayor, r_mayor in (
+                    (ocultas_a, restantes_a, ocultas_b, restantes_b),
+                    (ocultas_b, restantes_b, ocultas_a, restantes_a),
+                ):
+                    if menor < mayor:
+                        diferencia = mayor - menor
+                        minas_diferencia = r_mayor - r_menor
+                        if minas_diferencia == 0:
+                            self._decidir(diferencia, False, cola, en_cola)
+                        elif minas_diferencia == len(diferencia):
+                            self._decidir(diferencia, True, cola, en_cola)
+
+        return self.seguras, self.minas
+
+    @property
+    def seguras(self) -> List[Tuple[int, int]]:
+        return [divmod(indice, self._columnas) for indice in sorted(self._seguras)]
+
+    @property
+    def minas(self) -> List[Tuple[int, int]]:
+        return [divmod(indice, self._columnas) for indice in sorted(self._minas)]
+
+    @property
+    def frontera(self) -> List[Tuple[int, int]]:
+        return [divmod(indice, self._columnas) for indice in sorted(self._frontera)]
+
+    def sugerencia(self) -> Optional[Tuple[int, int]]:
+        """Una celda segura para la pista, o None si no hay ninguna deducible"""
+        self.deducir()
+        if not self._seguras:
+            return None
+        return divmod(min(self._seguras), self._columnas)
@@ -0,0 +1,291 @@
+# modelos/tablero_infinito.py
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from modelos.clases_abstractas import JuegoAbstracto
+from modelos.generacion import muestrear_minas
+from modelos.logica_juego import ExcepcionJuego
+
+# Por debajo de esta densidad las regiones de ceros pueden ser infinitas
+# (percolan) y una sola expansión no terminaría nunca
+DENSIDAD_MINIMA = 0.12
+
+class Chunk:
+    """Bloque cuadrado del plano con sus capas de minas, celdas reveladas y banderas"""
+    __slots__ = ('minas', 'revelado', 'banderas', 'modificado')
+
+    def __init__(self, minas: bytearray, revelado: bytearray, banderas: bytearray):
+        self.minas = minas
+        self.revelado = revelado
+        self.banderas = banderas
+        self.modificado = False
+
+class VistaPlano:
+    """Vista de sólo lectura de una capa del plano, indexable como capa[fila][columna]"""
+    __slots__ = ('_consulta',)
+
+    def __init__(self, consulta: Callable[[int, int], bool]):
+        self._consulta = consulta
+
+    def __getitem__(self, fila: int) -> "_FilaPlano":
+        return _FilaPlano(self._consulta, fila)
+
+class _FilaPlano:
+    """Una fila sin límites de VistaPlano"""
+    __slots__ = ('_consulta', '_fila')
+
+    def __init__(self, consulta: Callable[[int, int], bool], fila: int):
+        self._consulta = consulta
+        self._fila = fila
+
+    def __getitem__(self, columna: int) -> bool:
+        return self._consulta(self._fila, columna)
+
+class BuscaminasInfinito(JuegoAbstracto):
+    """Buscaminas sin límites: el plano se genera por chunks según se explora.
+
+    Cada chunk se genera de forma determinista a partir de la semilla la
+    primera vez que se toca. Cuando se supera el presupuesto de memoria, los
+    chunks menos usados se descartan; si tenían jugadas se guardan en disco
+    (las minas no, se regeneran con la semilla).
+    """
+    def __init__(self, semilla: int, densidad: float = 0.16, tamano_chunk: int = 32,
+                 presupuesto_memoria: int = 64 * 1024 * 1024, ruta_chunks: Optional[str] = None):
+        if not DENSIDAD_MINIMA <= densidad < 1:
+            raise ExcepcionJuego(f"La densidad debe estar entre {DENSIDAD_MINIMA} y 1")
+
+        self._semilla = semilla
+        self._tamano = tamano_chunk
+        self._celdas_chunk = tamano_chunk * tamano_chunk
+        self._minas_por_chunk = round(densidad * self._celdas_chunk)
+        # Tres capas de un byte por celda; nunca menos que un vecindario de 3x3 chunks
+        self._max_chunks = max(9, presupuesto_memoria // (3 * self._celdas_chunk))
+
+        self._ruta_propia = ruta_chunks is None
+        self._ruta_chunks = ruta_chunks or tempfile.mkdtemp(prefix="buscaminas_chunks_")
+        os.makedirs(self._ruta_chunks, exist_ok=True)
+
+        self._chunks: "OrderedDict[Tuple[int, int], Chunk]" = OrderedDict()
+        self._en_disco: Set[Tuple[int, int]] = set()
+        self._zona_segura: Dict[Tuple[int, int], List[int]] = {}
+
+        self._partida_terminada = False
+        self._primer_click = True
+        self._celdas_reveladas = 0
+        self._banderas_colocadas = 0
+        self._ultimas_reveladas: List[Tuple[int, int]] = []
+
+    @property
+    def semilla(self) -> int:
+        return self._semilla
+
+    @property
+    def partida_terminada(self) -> bool:
+        return self._partida_terminada
+
+    @property
+    def partida_ganada(self) -> bool:
+        # En modo infinito no hay victoria: se juega hasta pisar una mina
+        return False
+
+    @property
+    def celdas_reveladas(self) -> int:
+        return self._celdas_reveladas
+
+    @property
+    def banderas_colocadas(self) -> int:
+        return self._banderas_colocadas
+
+    @property
+    def chunks_en_memoria(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def ultimas_reveladas(self) -> List[Tuple[int, int]]:
+        return self._ultimas_reveladas
+
+    # ----------------- Gestión de chunks -----------------
+    def _semilla_chunk(self, cf: int, cc: int) -> int:
+        clave = f"{self._semilla}:{cf}:{cc}".encode()
+        return int.from_bytes(hashlib.blake2b(clave, digest_size=8).digest(), 'big')
+
+    def _ruta_chunk(self, cf: int, cc: int) -> str:
+        return os.path.join(self._ruta_chunks, f"chunk_{cf}_{cc}.bin")
+
+    def _generar_chunk(self, cf: int, cc: int) -> Chunk:
+        excluidas = self._zona_segura.get((cf, cc), ())
+        minas = min(self._minas_por_chunk, self._celdas_chunk - len(excluidas))
+        capa_minas = bytearray(self._celdas_chunk)
+        for indice in muestrear_minas(self._tamano, self._tamano, minas, excluidas, self._semilla_chunk(cf, cc)):
+            capa_minas[indice] = 1
+
+        if (cf, cc) in self._en_disco:
+            with open(self._ruta_chunk(cf, cc), 'rb') as f:
+                datos = f.read()
+            return Chunk(capa_minas, bytearray(datos[:self._celdas_chunk]), bytearray(datos[self._celdas_chunk:]))
+        return Chunk(capa_minas, bytearray(self._celdas_chunk), bytearray(self._celdas_chunk))
+
+    def _descartar_chunk_antiguo(self):
+        clave, chunk = self._chunks.popitem(last=False)
+        if chunk.modificado:
+            with open(self._ruta_chunk(*clave), 'wb') as f:
+                f.write(chunk.revelado)
+                f.write(chunk.banderas)
+            self._en_disco.add(clave)
+
+    def _chunk(self, fila: int, columna: int) -> Tuple[Chunk, int]:
+        """Devuelve el chunk que contiene la celda y el índice local de la celda"""
+        cf, rf = divmod(fila, self._tamano)
+        cc, rc = divmod(columna, self._tamano)
+        clave = (cf, cc)
+        chunk = self._chunks.get(clave)
+        if chunk is None:
+            chunk = self._generar_chunk(cf, cc)
+            self._chunks[clave] = chunk
+            if len(self._chunks) > self._max_chunks:
+                self._descartar_chunk_antiguo()
+        else:
+            self._chunks.move_to_end(clave)
+        return chunk, rf * self._tamano + rc
+
+    def _es_mina(self, fila: int, columna: int) -> bool:
+        chunk, indice = self._chunk(fila, columna)
+        return bool(chunk.minas[indice])
+
+    def valor(self, fila: int, columna: int) -> int:
+        """-1 si la celda es mina; si no, el número de minas vecinas (cruza chunks)"""
+        if self._es_mina(fila, columna):
+            return -1
+        return sum(
+            self._es_mina(fila + dr, columna + dc)
+            for dr in (-1, 0, 1)
+            for dc in (-1, 0, 1)
+            if dr or dc
+        )
+
+    def esta_revelada(self, fila: int, columna: int) -> bool:
+        chunk, indice = self._chunk(fila, columna)
+        return bool(chunk.revelado[indice])
+
+    def tiene_bandera(self, fila: int, columna: int) -> bool:
+        chunk, indice = self._chunk(fila, columna)
+        return bool(chunk.banderas[indice])
+
+    def _marcar_revelada(self, fila: int, columna: int):
+        # Se vuelve a pedir el chunk justo antes de escribir: otra consulta
+        # intermedia podría haberlo descartado de memoria
+        chunk, indice = self._chunk(fila, columna)
+        chunk.revelado[indice] = 1
+        chunk.modificado = True
+
+    # ----------------- Lógica del juego -----------------
+    def _fijar_zona_segura(self, fila: int, columna: int):
+        """Reserva sin minas el primer click y sus vecinas antes de generar nada"""
+        for nf in range(fila - 1, fila + 2):
+            for nc in range(columna - 1, columna + 2):
+                cf, rf = divmod(nf, self._tamano)
+                cc, rc = divmod(nc, self._tamano)
+                self._zona_segura.setdefault((cf, cc), []).append(rf * self._tamano + rc)
+
+        # Los chunks ya generados (p. ej. al pintar la ventana) rehacen sus minas con la zona segura
+        for clave, chunk in self._chunks.items():
+            if clave in self._zona_segura:
+                chunk.minas = self._generar_chunk(*clave).minas
+
+    def revelar(self, fila: int, columna: int) -> bool:
+        if self._partida_terminada:
+            return False
+
+        if self._primer_click:
+            self._fijar_zona_segura(fila, columna)
+            self._primer_click = False
+
+        self._ultimas_reveladas = []
+        if self.tiene_bandera(fila, columna) or self.esta_revelada(fila, columna):
+            return True
+
+        if self._es_mina(fila, columna):
+            self._partida_terminada = True
+            return False
+
+        self._ultimas_reveladas = self._abrir_region(fila, columna)
+        self._celdas_reveladas += len(self._ultimas_reveladas)
+        return True
+
+    def _abrir_region(self, fila: int, columna: int) -> List[Tuple[int, int]]:
+        """Expansión BFS de regiones vacías que cruza los bordes de chunk"""
+        self._marcar_revelada(fila, columna)
+        abiertas = [(fila, columna)]
+        cola = deque([(fila, columna)]) if self.valor(fila, columna) == 0 else deque()
+
+        while cola:
+            f, c = cola.popleft()
+            for nf in (f - 1, f, f + 1):
+                for nc in (c - 1, c, c + 1):
+                    if self.esta_revelada(nf, nc) or self.tiene_bandera(nf, nc):
+                        continue
+                    vacia = self.valor(nf, nc) == 0
+                    self._marcar_revelada(nf, nc)
+                    abiertas.append((nf, nc))
+                    if vacia:
+                        cola.append((nf, nc))
+        return abiertas
+
+    def alternar_bandera(self, fila: int, columna: int) -> None:
+        if self._partida_terminada:
+            return
+        chunk, indice = self._chunk(fila, columna)
+        if not chunk.revelado[indice]:
+            chunk.banderas[indice] ^= 1
+            chunk.modificado = True
+            self._banderas_colocadas += 1 if chunk.banderas[indice] else -1
+
+    def verificar_victoria(self) -> None:
+        # El plano no tiene fin: la partida sólo termina al pisar una mina
+        pass
+
+    def obtener_ventana(self, fila: int, columna: int, filas: int, columnas: int) -> dict:
+        """Estado de una ventana rectangular del plano, con el formato de obtener_estado"""
+        tablero, revelado, banderas = [], [], []
+        for f in range(fila, fila + filas):
+            fila_revelado = [self.esta_revelada(f, c) for c in range(columna, columna + columnas)]
+            revelado.append(fila_revelado)
+            banderas.append([self.tiene_bandera(f, c) for c in range(columna, columna + columnas)])
+            # Sólo se calculan los números de las celdas visibles
+            tablero.append([
+                self.valor(f, c) if visible else 0
+                for c, visible in zip(range(columna, columna + columnas), fila_revelado)
+            ])
+        return {
+            'tablero': tablero,
+            'revelado': revelado,
+            'banderas': banderas,
+            'partida_terminada': self._partida_terminada,
+            'partida_ganada': False,
+            'filas': filas,
+            'columnas': columnas,
+            'origen': (fila, columna)
+        }
+
+    def obtener_estado(self) -> dict:
+        """Capas por celda como vistas sobre los chunks (el plano no tiene tamaño) y los contadores"""
+        return {
+            'revelado': VistaPlano(self.esta_revelada),
+            'banderas': VistaPlano(self.tiene_bandera),
+            'partida_terminada': self._partida_terminada,
+            'partida_ganada': False,
+            'celdas_reveladas': self._celdas_reveladas,
+            'banderas_colocadas': self._banderas_colocadas,
+            'chunks_en_memoria': len(self._chunks),
+            'chunks_en_disco': len(self._en_disco)
+        }
+
+    def cerrar(self):
+        """Elimina los chunks guardados en disco si el directorio es temporal"""
+        self._chunks.clear()
+        self._en_disco.clear()
+        if self._ruta_propia:
+            shutil.rmtree(self._ruta_chunks, ignore_errors=True)
@@ -0,0 +1,168 @@
+# modelos/topologia.py
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import compress
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from modelos.generacion import adyacencias_desde_mascara, calcular_adyacencias, muestrear_minas
+
+FuncionVecinos = Callable[[int, int, int, int], Iterable[Tuple[int, int]]]
+
+def _vecinos_rectangular(filas: int, columnas: int, fila: int, columna: int) -> Iterable[Tuple[int, int]]:
+    for nf in range(max(0, fila - 1), min(filas, fila + 2)):
+        for nc in range(max(0, columna - 1), min(columnas, columna + 2)):
+            if nf != fila or nc != columna:
+                yield nf, nc
+
+def _vecinos_toroidal(filas: int, columnas: int, fila: int, columna: int) -> Iterable[Tuple[int, int]]:
+    # En tableros de menos de 3 de lado una vecina puede aparecer por dos lados: se cuenta una vez
+    vistos = set()
+    for df in (-1, 0, 1):
+        for dc in (-1, 0, 1):
+            vecino = ((fila + df) % filas, (columna + dc) % columnas)
+            if vecino != (fila, columna) and vecino not in vistos:
+                vistos.add(vecino)
+                yield vecino
+
+def _vecinos_hexagonal(filas: int, columnas: int, fila: int, columna: int) -> Iterable[Tuple[int, int]]:
+    # Filas impares desplazadas media celda a la derecha: seis vecinas
+    desplazamiento = fila % 2
+    for df, dc in ((-1, -1), (-1, 0), (0, -1), (0, 1), (1, -1), (1, 0)):
+        nf, nc = fila + df, columna + dc + (desplazamiento if df else 0)
+        if 0 <= nf < filas and 0 <= nc < columnas:
+            yield nf, nc
+
+TOPOLOGIAS: Dict[str, FuncionVecinos] = {
+    'rectangular': _vecinos_rectangular,
+    'toroidal': _vecinos_toroidal,
+    'hexagonal': _vecinos_hexagonal,
+}
+
+# En las topologías de serie los desplazamientos (vecina - celda) sólo dependen de
+# la paridad de la fila y de si la celda toca cada borde; las registradas a mano
+# pueden ser arbitrarias y se guardan celda a celda (CSR)
+_POR_DESPLAZAMIENTOS = {'rectangular', 'toroidal', 'hexagonal'}
+
+def registrar_topologia(nombre: str, funcion: FuncionVecinos):
+    """Añade una topología nueva; los motores la usan sin cambios a través de TablaVecinos"""
+    TOPOLOGIAS[nombre] = funcion
+    _POR_DESPLAZAMIENTOS.discard(nombre)
+    with _cerrojo_cache:
+        _cache.clear()
+
+class TablaVecinos:
+    """Vecinas de cada celda para una forma de tablero y una topología.
+
+    Las topologías de serie usan una tabla de 32 tuplas de desplazamientos
+    (paridad de fila x contacto con los cuatro bordes), sin memoria por
+    celda. Las registradas a mano se precalculan en formato CSR: las vecinas
+    del índice i son vecinos[inicio[i]:inicio[i + 1]].
+    """
+    __slots__ = ('topologia', 'filas', 'columnas', '_desplazamientos', 'inicio', 'vecinos')
+
+    def __init__(self, topologia: str, filas: int, columnas: int):
+        if topologia not in TOPOLOGIAS:
+            raise ValueError(f"Topología desconocida: {topologia}")
+        funcion = TOPOLOGIAS[topologia]
+        self.topologia = topologia
+        self.filas = filas
+        self.columnas = columnas
+        self._desplazamientos: List[Tuple[int, ...]] = []
+        self.inicio = array('i')
+        self.vecinos = array('i')
+
+        if topologia in _POR_DESPLAZAMIENTOS:
+            # Una celda representante por clase basta: filas 0, 1, 2 y las tres últimas cubren
+            # ambas paridades y ambos bordes; columnas 0, 1 y las dos últimas, igual
+            self._desplazamientos = [()] * 32
+            for fila in {0, 1, 2, filas - 3, filas - 2, filas - 1} & set(range(filas)):
+                for columna in {0, 1, columnas - 2, columnas - 1} & set(range(columnas)):
+                    indice = fila * columnas + columna
+                    self._desplazamientos[self._clase(fila, columna)] = tuple(
+                        nf * columnas + nc - indice for nf, nc in funcion(filas, columnas, fila, columna)
+                    )
+            return
+
+        self.inicio.append(0)
+        for fila in range(filas):
+            for columna in range(columnas):
+                self.vecinos.extend(nf * columnas + nc for nf, nc in funcion(filas, columnas, fila, columna))
+                self.inicio.append(len(self.vecinos))
+
+    def _clase(self, fila: int, columna: int) -> int:
+        return ((fila & 1) << 4 | (fila > 0) << 3 | (fila < self.filas - 1) << 2
+                | (columna > 0) << 1 | (columna < self.columnas - 1))
+
+    @property
+    def tamano_bytes(self) -> int:
+        """Memoria aproximada de la tabla, para acotar la caché"""
+        return (self.inicio.itemsize * len(self.inicio) + self.vecinos.itemsize * len(self.vecinos)
+                + 64 * len(self._desplazamientos))
+
+    def de(self, indice: int) -> Sequence[int]:
+        if self._desplazamientos:
+            fila, columna = divmod(indice, self.columnas)
+            return [indice + d for d in self._desplazamientos[self._clase(fila, columna)]]
+        return self.vecinos[self.inicio[indice]:self.inicio[indice + 1]]
+
+    def zona(self, indice: int) -> List[int]:
+        """La celda y sus vecinas: la zona libre de minas del primer click"""
+        return [indice, *self.de(indice)]
+
+    def generar_tablero(self, semilla: Optional[int], minas: int, fila: int, columna: int) -> Tuple[List[int], array]:
+        """generacion.generar_tablero con la zona libre y los números de esta topología.
+
+        Es el mismo sorteo que hace Buscaminas tras el primer click, así que
+        (semilla, primer click, topología) bastan para reconstruir el tablero.
+        """
+        excluidas = self.zona(fila * self.columnas + columna)
+        minas = min(minas, self.filas * self.columnas - len(excluidas))
+        indices_minas = muestrear_minas(self.filas, self.columnas, minas, excluidas, semilla)
+        return indices_minas, self.calcular_adyacencias(indices_minas)
+
+    def adyacencias_desde_mascara(self, mascara: bytes) -> array:
+        """calcular_adyacencias con las minas como capa plana 0/1 (p. ej. al decodificar)"""
+        if self.topologia == 'rectangular':
+            return adyacencias_desde_mascara(self.filas, self.columnas, mascara)
+        return self.calcular_adyacencias(compress(range(self.filas * self.columnas), mascara))
+
+    def calcular_adyacencias(self, indices_minas: Iterable[int]) -> array:
+        """Tablero plano (-1 mina, resto número de vecinas minadas) para esta topología"""
+        if self.topologia == 'rectangular':
+            # La ruta de generacion (vectorizada con NumPy si está) es la misma cuenta
+            return calcular_adyacencias(self.filas, self.columnas, indices_minas)
+
+        indices_minas = list(indices_minas)
+        tablero = array('b', bytes(self.filas * self.columnas))
+        for indice in indices_minas:
+            tablero[indice] = -1
+        for indice in indices_minas:
+            for vecino in self.de(indice):
+                if tablero[vecino] != -1:
+                    tablero[vecino] += 1
+        return tablero
+
+# Caché acotada por bytes: las tablas CSR de tableros grandes no deben quedarse
+# vivas por el mero hecho de haberse usado; las de desplazamientos ocupan poco
+LIMITE_CACHE_BYTES = 32 * 1024 * 1024
+_cache: "OrderedDict[Tuple[str, int, int], TablaVecinos]" = OrderedDict()
+_cerrojo_cache = threading.Lock()
+
+def tabla_vecinos(topologia: str, filas: int, columnas: int) -> TablaVecinos:
+    """Tabla compartida por todos los tableros con la misma forma y topología"""
+    clave = (topologia, filas, columnas)
+    with _cerrojo_cache:
+        tabla = _cache.get(clave)
+        if tabla is not None:
+            _cache.move_to_end(clave)
+            return tabla
+
+    tabla = TablaVecinos(topologia, filas, columnas)
+    if tabla.tamano_bytes <= LIMITE_CACHE_BYTES:
+        with _cerrojo_cache:
+            _cache[clave] = tabla
+            ocupado = sum(t.tamano_bytes for t in _cache.values())
+            while ocupado > LIMITE_CACHE_BYTES:
+                _, descartada = _cache.popitem(last=False)
+                ocupado -= descartada.tamano_bytes
+    return tabla
@@ -0,0 +1,119 @@
+# tests/test_basedatos_sqlite.py
+"""DAO SQLite: login sin mayúsculas, historial, migración desde JSON y esquema antiguo"""
+import json
+import sqlite3
+import pytest
+from modelos.basedatos_json import BaseDatosJSON, ExcepcionBaseDatos, PartidaDAO, UsuarioDAO
+from modelos.basedatos_sqlite import (BaseDatosSQLite, SQLitePartidaDAO, SQLiteUsuarioDAO,
+                                      _iterar_objeto_json, migrar_desde_json)
+from modelos.entidades import Partida, Usuario
+from modelos.logica_juego import Buscaminas
+
+@pytest.fixture
+def base_datos(tmp_path):
+    base_datos = BaseDatosSQLite(str(tmp_path / "buscaminas.db"))
+    yield base_datos
+    base_datos.cerrar()
+
+def _usuario(nombre):
+    return Usuario(id=None, nombre_usuario=nombre, correo=None, fecha_creacion="")
+
+def _partida(id_usuario, dificultad, **campos):
+    for matriz in ('estado_tablero', 'estado_revelado', 'estado_banderas'):
+        campos.setdefault(matriz, None)
+    return Partida(id=None, id_usuario=id_usuario, dificultad=dificultad, filas=9, columnas=9, minas=10,
+                   tiempo_inicio="2024-01-01T00:00:00", **campos)
+
+def test_login_sin_distinguir_mayusculas(base_datos):
+    dao = SQLiteUsuarioDAO(base_datos)
+    id_usuario = dao.guardar(_usuario("Ñandú"))
+    dao.guardar(_usuario("Otro"))
+    # lower() de SQLite no pliega 'Ñ' ni 'Ú'; la clave se calcula en Python
+    assert dao.obtener_usuario_por_nombre("ñANDÚ").id == id_usuario
+    assert dao.obtener_usuario_por_nombre("nandu") is None
+
+def test_historial_por_usuario_y_dificultad(base_datos):
+    dao = SQLitePartidaDAO(base_datos)
+    ids = [dao.guardar(_partida(1, dificultad, semilla=i, primer_click=[i, i]))
+           for i, dificultad in enumerate(["Fácil", "Medio", "Fácil", "Fácil"])]
+    dao.guardar(_partida(2, "Fácil", semilla=9, primer_click=[0, 0]))
+    dao.actualizar_resultado_partida(ids[2], True, 31)
+
+    assert [p.id for p in dao.obtener_partidas_usuario(1)] == ids[::-1]
+    assert [p.id for p in dao.obtener_partidas_usuario(1, "Fácil", limite=2)] == [ids[3], ids[2]]
+    ganada = dao.obtener_por_id(ids[2])
+    assert (ganada.partida_ganada, ganada.partida_terminada, ganada.segundos_duracion) == (True, True, 31)
+    assert ganada.primer_click == [2, 2] and ganada.es_compacta
+    with pytest.raises(ExcepcionBaseDatos):
+        dao.actualizar_resultado_partida(ids[0], False, 5, {'no_existe': 1})
+
+@pytest.mark.parametrize("tamano_bloque", [1, 7, 1 << 16])
+def test_lectura_por_bloques_igual_a_json_load(tmp_path, tamano_bloque):
+    datos = {"1": {"a": [1, 2.5, None], "b": "ñ \"x\" }"}, "22": 1234567, "3": True, "4": {}, "5": "}"}
+    archivo = tmp_path / "datos.json"
+    archivo.write_text(json.dumps(datos, indent=1, ensure_ascii=False), encoding="utf-8")
+    assert dict(_iterar_objeto_json(str(archivo), tamano_bloque)) == datos
+    archivo.write_text("{ }", encoding="utf-8")
+    assert list(_iterar_objeto_json(str(archivo), tamano_bloque)) == []
+
+def test_migracion_con_diario_pendiente(tmp_path):
+    # Base JSON con el diario de partidas sin compactar, como la deja la aplicación
+    base_json = BaseDatosJSON(str(tmp_path), intervalo_vaciado=0, diario_partidas=True,
+                              umbral_compactacion=10 ** 9)
+    usuarios, partidas = UsuarioDAO(base_json), PartidaDAO(base_json)
+    ids_usuario = [usuarios.guardar(_usuario(nombre)) for nombre in ("Ana", "Bob", "Cris")]
+    usuarios.actualizar_estadisticas_usuario(ids_usuario[1], True, 44, "Medio")
+
+    juego = Buscaminas(9, 9, 10, semilla=3)
+    juego.revelar(4, 4)
+    estado = juego.obtener_estado()
+    ids_partida = [
+        partidas.guardar(_partida(ids_usuario[0], "Fácil", estado_tablero=estado['tablero'],
+                                  estado_revelado=estado['revelado'], estado_banderas=estado['banderas'])),
+        partidas.guardar(_partida(ids_usuario[1], "Medio", semilla=8, primer_click=[1, 2], topologia='toroidal')),
+        partidas.guardar(_partida(ids_usuario[2], "Fácil")),
+    ]
+    # Cambios que sólo están en partidas.jsonl, uno con el primer click como lista
+    partidas.actualizar_resultado_partida(ids_partida[1], True, 44)
+    partidas.actualizar_resultado_partida(ids_partida[2], False, 7, {'semilla': 5, 'primer_click': [3, 4]})
+    base_json.cerrar()
+    assert (tmp_path / "partidas.jsonl").stat().st_size > 0
+
+    base_sqlite = BaseDatosSQLite(str(tmp_path / "buscaminas.db"))
+    assert base_sqlite.esta_vacia()
+    assert migrar_desde_json(base_sqlite, str(tmp_path), tamano_lote=2) == (3, 3)
+
+    base_json = BaseDatosJSON(str(tmp_path), intervalo_vaciado=0, diario_partidas=True)
+    for id_usuario in ids_usuario:
+        assert (SQLiteUsuarioDAO(base_sqlite).obtener_por_id(id_usuario).a_diccionario() ==
+                UsuarioDAO(base_json).obtener_por_id(id_usuario).a_diccionario())
+    for id_partida in ids_partida:
+        migrada = SQLitePartidaDAO(base_sqlite).obtener_por_id(id_partida)
+        assert migrada == PartidaDAO(base_json).obtener_por_id(id_partida)
+    assert SQLitePartidaDAO(base_sqlite).obtener_por_id(ids_partida[0]).estado_revelado == estado['revelado']
+    assert SQLitePartidaDAO(base_sqlite).obtener_por_id(ids_partida[1]).topologia == 'toroidal'
+    assert SQLitePartidaDAO(base_sqlite).obtener_por_id(ids_partida[2]).primer_click == [3, 4]
+    assert SQLiteUsuarioDAO(base_sqlite).obtener_clasificacion("Medio") == [("Bob", 44)]
+    # Los IDs se conservan: las altas siguientes continúan la secuencia
+    assert SQLiteUsuarioDAO(base_sqlite).guardar(_usuario("Dani")) == max(ids_usuario) + 1
+    base_json.cerrar()
+    base_sqlite.cerrar()
+
+def test_base_antigua_sin_topologia(tmp_path):
+    ruta = str(tmp_path / "buscaminas.db")
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("CREATE TABLE partidas (id INTEGER PRIMARY KEY, id_usuario INTEGER, dificultad TEXT NOT NULL, "
+                     "filas INTEGER NOT NULL, columnas INTEGER NOT NULL, minas INTEGER NOT NULL, "
+                     "tiempo_inicio TEXT NOT NULL, tiempo_fin TEXT, segundos_duracion INTEGER, "
+                     "partida_ganada INTEGER NOT NULL DEFAULT 0, partida_terminada INTEGER NOT NULL DEFAULT 0, "
+                     "semilla INTEGER, primer_click TEXT, instantanea TEXT)")
+    conexion.execute("INSERT INTO partidas (id, id_usuario, dificultad, filas, columnas, minas, tiempo_inicio, "
+                     "semilla, primer_click) VALUES (1, 1, 'Fácil', 9, 9, 10, 't', 4, '[0, 0]')")
+    conexion.commit()
+    conexion.close()
+
+    base_datos = BaseDatosSQLite(ruta)
+    dao = SQLitePartidaDAO(base_datos)
+    assert dao.obtener_por_id(1).topologia == 'rectangular'
+    assert dao.obtener_por_id(dao.guardar(_partida(1, "Medio", topologia='hexagonal'))).topologia == 'hexagonal'
+    base_datos.cerrar()
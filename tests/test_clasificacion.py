@@ -0,0 +1,84 @@
+# tests/test_clasificacion.py
+"""Clasificación incremental y mejores tiempos en los dos backends"""
+import json
+import random
+import pytest
+from modelos.basedatos_json import BaseDatosJSON, UsuarioDAO
+from modelos.basedatos_sqlite import BaseDatosSQLite, SQLiteUsuarioDAO, migrar_desde_json
+from modelos.clasificacion import Clasificacion, campo_mejor_tiempo
+from modelos.entidades import Usuario
+
+DIFICULTADES = ["Fácil", "Medio", "Difícil"]
+
+@pytest.fixture(params=["json", "sqlite"])
+def dao(request, tmp_path):
+    if request.param == "json":
+        base_datos = BaseDatosJSON(str(tmp_path), intervalo_vaciado=0)
+        yield UsuarioDAO(base_datos)
+    else:
+        base_datos = BaseDatosSQLite(str(tmp_path / "buscaminas.db"))
+        yield SQLiteUsuarioDAO(base_datos)
+    base_datos.cerrar()
+
+def _usuario(nombre):
+    return Usuario(id=None, nombre_usuario=nombre, correo=None, fecha_creacion="")
+
+def test_campo_mejor_tiempo():
+    assert campo_mejor_tiempo("Fácil") == campo_mejor_tiempo("facil") == "mejor_tiempo_facil"
+    assert campo_mejor_tiempo("DIFÍCIL") == "mejor_tiempo_dificil"
+    assert campo_mejor_tiempo("Personalizada") is None
+
+def test_clasificacion_igual_a_ordenar():
+    rng = random.Random(3)
+    clasificacion = Clasificacion()
+    mejores = {}
+    for _ in range(2000):
+        id_usuario, tiempo = rng.randrange(200), rng.randrange(50)
+        clasificacion.actualizar(id_usuario, tiempo)
+        mejores[id_usuario] = min(tiempo, mejores.get(id_usuario, tiempo))
+
+    orden = sorted((tiempo, id_usuario) for id_usuario, tiempo in mejores.items())
+    assert clasificacion.primeros(25) == orden[:25]
+    assert len(clasificacion) == len(mejores)
+    for id_usuario, tiempo in mejores.items():
+        assert clasificacion.posicion(id_usuario) == 1 + sum(1 for otro in mejores.values() if otro < tiempo)
+    assert clasificacion.posicion(999) is None
+
+def test_mejores_tiempos_con_tildes(dao):
+    ids = [dao.guardar(_usuario(nombre)) for nombre in ("Ana", "Bob", "Cris")]
+    partidas = [(ids[0], True, 30, "Fácil"), (ids[1], True, 20, "Fácil"), (ids[1], True, 25, "Fácil"),
+                (ids[2], False, 5, "Fácil"), (ids[2], True, 90, "Difícil"), (ids[0], True, 40, "Personalizada")]
+    for partida in partidas:
+        dao.actualizar_estadisticas_usuario(*partida)
+
+    assert dao.obtener_clasificacion("Fácil") == [("Bob", 20), ("Ana", 30)]
+    assert dao.obtener_clasificacion("Difícil") == [("Cris", 90)]
+    assert dao.obtener_clasificacion("Personalizada") == []
+    assert [dao.obtener_posicion(id_usuario, "Fácil") for id_usuario in ids] == [2, 1, None]
+
+    ana, bob, cris = (dao.obtener_por_id(id_usuario) for id_usuario in ids)
+    assert (ana.mejor_tiempo_facil, bob.mejor_tiempo_facil, cris.mejor_tiempo_facil) == (30, 20, None)
+    assert cris.mejor_tiempo_dificil == 90
+    assert (ana.partidas_totales, ana.partidas_ganadas, cris.partidas_ganadas) == (2, 2, 1)
+
+def test_claves_antiguas_con_tilde(tmp_path):
+    # Así guardaba el backend JSON los mejores tiempos antes de normalizar la dificultad
+    usuarios = {"1": {"id": 1, "nombre_usuario": "Ana", "correo": None, "fecha_creacion": "",
+                      "partidas_totales": 3, "partidas_ganadas": 2, "mejor_tiempo_fácil": 42}}
+    (tmp_path / "usuarios.json").write_text(json.dumps(usuarios), encoding="utf-8")
+
+    base_json = BaseDatosJSON(str(tmp_path), intervalo_vaciado=0)
+    dao_json = UsuarioDAO(base_json)
+    assert dao_json.obtener_por_id(1).mejor_tiempo_facil == 42
+    assert dao_json.obtener_clasificacion("Fácil") == [("Ana", 42)]
+
+    base_sqlite = BaseDatosSQLite(str(tmp_path / "buscaminas.db"))
+    migrar_desde_json(base_sqlite, str(tmp_path))
+    assert SQLiteUsuarioDAO(base_sqlite).obtener_clasificacion("Fácil") == [("Ana", 42)]
+    base_sqlite.cerrar()
+
+    # Una marca peor no pisa la antigua y la clave con tilde desaparece
+    dao_json.actualizar_estadisticas_usuario(1, True, 50, "Fácil")
+    base_json.cerrar()
+    guardado = json.loads((tmp_path / "usuarios.json").read_text(encoding="utf-8"))["1"]
+    assert guardado["mejor_tiempo_facil"] == 42 and "mejor_tiempo_fácil" not in guardado
@@ -0,0 +1,121 @@
+# tests/test_contadores.py
+"""Partidas al azar con semilla en modo de verificación de contadores.
+
+Cada jugada (revelar, bandera, chord, deshacer, rehacer) pasa por el recuento
+completo del motor, que lanza ExcepcionJuego si los contadores incrementales
+se desvían; además se contrastan aquí con un recuento independiente.
+"""
+import random
+import pytest
+from modelos.historial import HistorialJugadas
+from modelos.juego import JuegoBuscaminas
+from modelos.logica_juego import Buscaminas
+
+SEMILLAS = range(12)
+JUGADAS = 150
+
+def _recuento(tablero, revelado, banderas, filas, columnas):
+    """(seguras reveladas, banderas) contando celda a celda"""
+    celdas = [(f, c) for f in range(filas) for c in range(columnas)]
+    seguras = sum(1 for f, c in celdas if revelado[f][c] and tablero[f][c] != -1)
+    return seguras, sum(1 for f, c in celdas if banderas[f][c])
+
+def _celda_para_chord(rng, tablero, revelado, filas, columnas):
+    """Un número ya abierto, si lo hay"""
+    numeros = [(f, c) for f in range(filas) for c in range(columnas) if revelado[f][c] and tablero[f][c] > 0]
+    return rng.choice(numeros) if numeros else None
+
+def _mina_junto_a_numero(rng, tablero, revelado, banderas, filas, columnas):
+    """Una mina sin bandera vecina de una celda abierta, para que los chords lleguen a abrir algo"""
+    candidatas = [
+        (f, c) for f in range(filas) for c in range(columnas)
+        if tablero[f][c] == -1 and not banderas[f][c] and any(
+            revelado[nf][nc]
+            for nf in range(max(0, f - 1), min(filas, f + 2))
+            for nc in range(max(0, c - 1), min(columnas, c + 2))
+        )
+    ]
+    return rng.choice(candidatas) if candidatas else None
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_buscaminas_contadores_con_deshacer(semilla):
+    rng = random.Random(semilla)
+    filas, columnas = 10, 12
+    juego = Buscaminas(filas, columnas, 20, verificar_contadores=True, semilla=semilla,
+                       historial=HistorialJugadas())
+    estado = juego.obtener_estado()
+    tablero, revelado, banderas = estado['tablero'], estado['revelado'], estado['banderas']
+    juego.revelar(rng.randrange(filas), rng.randrange(columnas))
+
+    for _ in range(JUGADAS):
+        jugada = rng.random()
+        if juego.partida_terminada or jugada < 0.15:
+            juego.deshacer()
+        elif jugada < 0.25:
+            juego.rehacer()
+        elif jugada < 0.45:
+            celda = _mina_junto_a_numero(rng, tablero, revelado, banderas, filas, columnas)
+            juego.alternar_bandera(*(celda or (rng.randrange(filas), rng.randrange(columnas))))
+        elif jugada < 0.7:
+            celda = _celda_para_chord(rng, tablero, revelado, filas, columnas)
+            if celda is not None:
+                juego.chord(*celda)
+        else:
+            juego.revelar(rng.randrange(filas), rng.randrange(columnas))
+
+        juego.comprobar_contadores()
+        assert (juego.seguras_reveladas, juego.banderas_colocadas) == _recuento(
+            tablero, revelado, banderas, filas, columnas)
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_juego_buscaminas_contadores(semilla):
+    rng = random.Random(semilla)
+    filas, columnas, minas = 9, 9, 10
+    juego = JuegoBuscaminas(filas, columnas, minas, verificar_contadores=True, semilla=semilla)
+    juego.inicializar_tablero()
+
+    for _ in range(JUGADAS):
+        if juego.partida_ganada or juego.partida_perdida:
+            break
+        fila, columna = rng.randrange(filas), rng.randrange(columnas)
+        if rng.random() < 0.3:
+            juego.alternar_bandera(fila, columna)
+        else:
+            juego.revelar_celda(fila, columna)
+
+        banderas = sum(juego.tablero[f][c]["bandera"] for f in range(filas) for c in range(columnas))
+        # obtener_minas_restantes hace el recuento completo en modo de verificación
+        assert juego.obtener_minas_restantes() == minas - banderas
+        seguras = sum(juego.tablero[f][c]["revelada"] and not juego.tablero[f][c]["es_mina"]
+                      for f in range(filas) for c in range(columnas))
+        # Como siempre: las seguras abiertas más la mina pisada al perder
+        assert juego.celdas_reveladas == seguras + juego.partida_perdida
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_minesweeper_game_contadores(semilla):
+    # interfaz.py importa flet al cargarse
+    pytest.importorskip("flet")
+    from interfaz import MinesweeperGame
+
+    rng = random.Random(semilla)
+    rows, cols = 9, 9
+    game = MinesweeperGame(rows, cols, 10, debug_counters=True, seed=semilla)
+    game.reveal(rng.randrange(rows), rng.randrange(cols))
+
+    for _ in range(JUGADAS):
+        if game.game_over or game.game_won:
+            break
+        jugada = rng.random()
+        if jugada < 0.3:
+            celda = _mina_junto_a_numero(rng, game.board, game.revealed, game.flagged, rows, cols)
+            game.toggle_flag(*(celda or (rng.randrange(rows), rng.randrange(cols))))
+        elif jugada < 0.6:
+            celda = _celda_para_chord(rng, game.board, game.revealed, rows, cols)
+            if celda is not None:
+                game.chord(*celda)
+        else:
+            game.reveal(rng.randrange(rows), rng.randrange(cols))
+
+        game.validate_counters()
+        assert (game.revealed_safe, game.flag_count) == _recuento(
+            game.board, game.revealed, game.flagged, rows, cols)
@@ -0,0 +1,131 @@
+# tests/test_diario.py
+"""Diario JSONL: reproducción, compactación y recuperación tras fallos"""
+import json
+import os
+import pytest
+from modelos import basedatos_json
+from modelos.basedatos_json import DiarioJSONL
+
+@pytest.fixture
+def rutas(tmp_path):
+    instantanea = str(tmp_path / "partidas.json")
+    return instantanea, str(tmp_path / "partidas.jsonl"), str(tmp_path / "partidas.jsonl.compactando")
+
+def _llenar(diario, desde, hasta):
+    for i in range(desde, hasta):
+        diario.alta(str(i), {'id': i, 'minas': i % 7})
+        diario.cambio(str(i), {'partida_ganada': i % 2 == 0})
+
+def _reabrir(instantanea):
+    diario = DiarioJSONL(instantanea)
+    datos = dict(diario.datos)
+    diario.cerrar()
+    return datos
+
+def test_reproduce_al_reabrir(rutas):
+    instantanea, _, _ = rutas
+    diario = DiarioJSONL(instantanea)
+    _llenar(diario, 0, 50)
+    esperado = dict(diario.datos)
+    diario.cerrar()
+    assert _reabrir(instantanea) == esperado
+    assert esperado['3'] == {'id': 3, 'minas': 3, 'partida_ganada': False}
+
+def test_compacta_al_pasar_el_umbral(rutas):
+    instantanea, _, rotado = rutas
+    diario = DiarioJSONL(instantanea, umbral_compactacion=2000)
+    _llenar(diario, 0, 200)
+    esperado = dict(diario.datos)
+    diario.cerrar()
+    # Las escrituras siguen durante la compactación en segundo plano: el diario no
+    # queda vacío, pero la instantánea ya recoge una parte
+    assert not os.path.exists(rotado)
+    with open(instantanea, encoding='utf-8') as f:
+        assert json.load(f)
+    assert _reabrir(instantanea) == esperado
+
+def test_fallo_al_compactar_devuelve_el_rotado(rutas, monkeypatch):
+    instantanea, archivo_diario, rotado = rutas
+    diario = DiarioJSONL(instantanea, umbral_compactacion=10 ** 9)
+    _llenar(diario, 0, 20)
+
+    def volcar_fallido(archivo, datos):
+        raise OSError("disco lleno")
+    monkeypatch.setattr(basedatos_json, "_volcar", volcar_fallido)
+    with pytest.raises(OSError):
+        diario.compactar()
+    assert not os.path.exists(rotado)
+
+    # El diario sigue admitiendo escrituras y la siguiente compactación funciona
+    _llenar(diario, 20, 30)
+    monkeypatch.undo()
+    diario.compactar()
+    esperado = dict(diario.datos)
+    diario.cerrar()
+    assert not os.path.exists(rotado) and os.path.getsize(archivo_diario) == 0
+    assert _reabrir(instantanea) == esperado and len(esperado) == 30
+
+def test_fallo_aplaza_el_siguiente_intento(rutas, monkeypatch):
+    instantanea, _, rotado = rutas
+    intentos = []
+
+    def volcar_fallido(archivo, datos):
+        intentos.append(archivo)
+        raise OSError("disco lleno")
+    diario = DiarioJSONL(instantanea, umbral_compactacion=500)
+    monkeypatch.setattr(basedatos_json, "_volcar", volcar_fallido)
+    i = 0
+    while diario._compactacion is None and not intentos:
+        _llenar(diario, i, i + 1)
+        i += 1
+    if diario._compactacion is not None:
+        diario._compactacion.join()
+    # Menos de un umbral más: no toca reintentar todavía
+    _llenar(diario, i, i + 3)
+    assert diario._compactacion is None
+    # Un intento fallido, no uno por escritura
+    assert len(intentos) == 1
+    assert not os.path.exists(rotado)
+    diario.cerrar()
+
+def test_termina_compactacion_interrumpida(rutas):
+    instantanea, archivo_diario, rotado = rutas
+    with open(instantanea, 'w', encoding='utf-8') as f:
+        json.dump({'1': {'id': 1, 'minas': 1}}, f)
+    with open(rotado, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'op': 'cambio', 'clave': '1', 'datos': {'minas': 2}}) + "\n")
+    with open(archivo_diario, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'op': 'alta', 'clave': '2', 'datos': {'id': 2}}) + "\n")
+
+    assert _reabrir(instantanea) == {'1': {'id': 1, 'minas': 2}, '2': {'id': 2}}
+    assert not os.path.exists(rotado) and os.path.getsize(archivo_diario) == 0
+
+def test_arranque_sin_poder_escribir_une_el_rotado(rutas, monkeypatch):
+    instantanea, archivo_diario, rotado = rutas
+    with open(rotado, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'op': 'alta', 'clave': '1', 'datos': {'id': 1}}) + "\n")
+    with open(archivo_diario, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'op': 'cambio', 'clave': '1', 'datos': {'minas': 5}}) + "\n")
+
+    def volcar_fallido(archivo, datos):
+        raise OSError("sólo lectura")
+    monkeypatch.setattr(basedatos_json, "_volcar", volcar_fallido)
+    assert _reabrir(instantanea) == {'1': {'id': 1, 'minas': 5}}
+    assert not os.path.exists(rotado)
+    monkeypatch.undo()
+    assert _reabrir(instantanea) == {'1': {'id': 1, 'minas': 5}}
+
+def test_linea_cortada_no_corrompe_el_diario(rutas):
+    instantanea, archivo_diario, _ = rutas
+    diario = DiarioJSONL(instantanea)
+    _llenar(diario, 0, 3)
+    diario.cerrar()
+    # Un corte a mitad de escritura, con un carácter UTF-8 partido
+    with open(archivo_diario, 'ab') as f:
+        f.write('{"op":"alta","clave":"9","datos":{"nombre":"Ñ'.encode('utf-8')[:-1])
+
+    diario = DiarioJSONL(instantanea)
+    _llenar(diario, 3, 5)
+    esperado = dict(diario.datos)
+    diario.cerrar()
+    assert _reabrir(instantanea) == esperado and '9' not in esperado and len(esperado) == 5
@@ -0,0 +1,70 @@
+# tests/test_historial.py
+"""Deshacer y rehacer la jugada final junto con lo que la interfaz hace al terminar"""
+import random
+import pytest
+from modelos.historial import HistorialJugadas
+from modelos.logica_juego import Buscaminas
+
+def _capas(juego):
+    estado = juego.obtener_estado()
+    return (bytes(estado['revelado'].plana), bytes(estado['banderas'].plana),
+            juego.seguras_reveladas, juego.banderas_colocadas, juego.partida_terminada, juego.partida_ganada)
+
+def _nueva(semilla):
+    juego = Buscaminas(8, 8, 10, semilla=semilla, verificar_contadores=True, historial=HistorialJugadas())
+    juego.revelar(4, 4)
+    return juego
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_deshacer_derrota_oculta_las_minas(semilla):
+    juego = _nueva(semilla)
+    juego.alternar_bandera(*juego.posiciones_minas[0])
+    antes = _capas(juego)
+
+    # Una mina sin bandera: la jugada pierde y se muestran todas
+    assert not juego.revelar(*juego.posiciones_minas[1])
+    assert juego.revelar_minas()
+    despues = _capas(juego)
+
+    assert juego.deshacer()
+    assert _capas(juego) == antes
+    assert not any(juego.obtener_estado()['revelado'][f][c] for f, c in juego.posiciones_minas)
+    assert juego.rehacer()
+    assert _capas(juego) == despues
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_deshacer_victoria_quita_banderas_automaticas(semilla):
+    juego = _nueva(semilla)
+    if juego.partida_ganada:
+        pytest.skip("el primer click ya ganó")
+    juego.alternar_bandera(*juego.posiciones_minas[0])
+    seguras = [(f, c) for f in range(8) for c in range(8) if not juego.es_mina(f, c)]
+    random.Random(semilla).shuffle(seguras)
+    for celda in seguras:
+        juego.revelar(*celda)
+        if juego.partida_ganada:
+            break
+    # La jugada que gana se repite desde el estado anterior, ahora sí con las banderas automáticas
+    juego.deshacer()
+    antes = _capas(juego)
+
+    assert juego.revelar(*celda) and juego.partida_ganada
+    juego.marcar_minas()
+    despues = _capas(juego)
+    assert juego.banderas_colocadas == juego.minas
+
+    assert juego.deshacer()
+    assert _capas(juego) == antes
+    assert juego.minas_restantes == juego.minas - 1
+    assert juego.rehacer()
+    assert _capas(juego) == despues
+
+def test_anexos_cuentan_para_el_limite():
+    historial = HistorialJugadas(max_celdas=10)
+    historial.registrar(0, [1, 2], (False, False), (False, False))
+    historial.registrar(0, [3], (False, False), (True, False))
+    historial.anexar(2, range(20, 28), (True, False))
+    # Con el anexo se pasa del límite y se descarta la primera jugada
+    assert historial.celdas_guardadas == 9
+    assert historial.sacar_para_deshacer().celdas == 9
+    assert historial.sacar_para_deshacer() is None
@@ -0,0 +1,86 @@
+# tests/test_instantanea.py
+"""Ida y vuelta de las instantáneas, con y sin NumPy, y su uso desde Partida"""
+import random
+import pytest
+from modelos import generacion, instantanea
+from modelos.entidades import Partida
+from modelos.instantanea import codificar_instantanea, decodificar_instantanea, desempaquetar_capas
+from modelos.logica_juego import Buscaminas
+from modelos.topologia import tabla_vecinos
+
+FORMAS = [(1, 1), (1, 9), (9, 1), (3, 5), (7, 9), (16, 30)]
+
+@pytest.fixture(params=["numpy", "python"])
+def ruta(request, monkeypatch):
+    """Ejecuta el test por la ruta vectorizada y por la de Python puro"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(instantanea, "np", None)
+        monkeypatch.setattr(generacion, "np", None)
+    return request.param
+
+def _matrices(rng, filas, columnas, topologia='rectangular'):
+    celdas = filas * columnas
+    indices_minas = rng.sample(range(celdas), rng.randrange(celdas))
+    plano = tabla_vecinos(topologia, filas, columnas).calcular_adyacencias(indices_minas)
+    tablero = [plano[f * columnas:(f + 1) * columnas].tolist() for f in range(filas)]
+    revelado = [[rng.random() < 0.5 for _ in range(columnas)] for _ in range(filas)]
+    banderas = [[rng.random() < 0.2 for _ in range(columnas)] for _ in range(filas)]
+    return tablero, revelado, banderas
+
+def test_formato_estable():
+    # Cabecera BM v1 y tres bitsets; el texto guardado no debe cambiar entre versiones
+    texto = codificar_instantanea(2, 3, [[-1, 2, -1], [1, 2, 1]],
+                                  [[False, True, False], [True, True, True]],
+                                  [[True, False, True], [False, False, False]])
+    assert texto == "Qk0BAAAAAgAAAAOgXKA="
+
+@pytest.mark.parametrize("topologia", ["rectangular", "toroidal", "hexagonal"])
+@pytest.mark.parametrize("filas, columnas", FORMAS)
+def test_ida_y_vuelta(ruta, filas, columnas, topologia):
+    rng = random.Random(filas * 100 + columnas)
+    tablero, revelado, banderas = _matrices(rng, filas, columnas, topologia)
+    texto = codificar_instantanea(filas, columnas, tablero, revelado, banderas)
+
+    f, c, tablero2, revelado2, banderas2 = decodificar_instantanea(texto, topologia)
+    assert (f, c) == (filas, columnas)
+    assert tablero2 == tablero and revelado2 == revelado and banderas2 == banderas
+    # Las vistas decodificadas se vuelven a empaquetar igual
+    assert codificar_instantanea(f, c, tablero2, revelado2, banderas2) == texto
+
+def test_numpy_y_python_coinciden(monkeypatch):
+    pytest.importorskip("numpy")
+    rng = random.Random(7)
+    tablero, revelado, banderas = _matrices(rng, 13, 17)
+    texto = codificar_instantanea(13, 17, tablero, revelado, banderas)
+    con_numpy = desempaquetar_capas(texto), decodificar_instantanea(texto)[2]
+    monkeypatch.setattr(instantanea, "np", None)
+    monkeypatch.setattr(generacion, "np", None)
+    assert codificar_instantanea(13, 17, tablero, revelado, banderas) == texto
+    assert (desempaquetar_capas(texto), decodificar_instantanea(texto)[2]) == con_numpy
+
+@pytest.mark.parametrize("texto", ["", "QUJD", "Qk0CAAAAAgAAAAOgXKA=", "Qk0BAAAAAgAAAAOgXA=="])
+def test_instantanea_no_valida(texto):
+    with pytest.raises(Exception):
+        decodificar_instantanea(texto)
+
+def test_partida_decodifica_al_leer():
+    juego = Buscaminas(12, 10, 20, semilla=5)
+    juego.revelar(6, 5)
+    juego.alternar_bandera(*next((f, c) for f in range(12) for c in range(10)
+                                 if not juego.obtener_estado()['revelado'][f][c]))
+    estado = juego.obtener_estado()
+    texto = instantanea.empaquetar_capas(12, 10, estado['tablero'].plana, estado['revelado'].plana,
+                                         estado['banderas'].plana)
+    datos = {'id': 1, 'id_usuario': 1, 'dificultad': 'Fácil', 'filas': 12, 'columnas': 10, 'minas': 20,
+             'tiempo_inicio': 't', 'instantanea': texto}
+
+    partida = Partida.desde_diccionario(datos)
+    # Sin leer las matrices el registro se reescribe con la misma instantánea
+    assert partida.a_diccionario()['instantanea'] == texto
+    assert partida.estado_tablero == estado['tablero']
+    assert partida.estado_revelado == estado['revelado']
+    assert partida.estado_banderas == estado['banderas']
+    assert partida == Partida.desde_diccionario(datos)
+    assert partida.a_diccionario()['instantanea'] == texto
@@ -0,0 +1,63 @@
+# tests/test_probabilidades.py
+"""Probabilidades del motor contra la enumeración exhaustiva en tableros pequeños"""
+import itertools
+import random
+import pytest
+from modelos.logica_juego import Buscaminas
+from modelos.probabilidades import MotorProbabilidades
+
+SEMILLAS = range(30)
+
+def _fuerza_bruta(estado):
+    """Probabilidad exacta de mina por celda oculta; las banderas no restringen nada"""
+    filas, columnas = estado['filas'], estado['columnas']
+    tablero, revelado = estado['tablero'], estado['revelado']
+    ocultas = [(f, c) for f in range(filas) for c in range(columnas) if not revelado[f][c]]
+    numeros = [(f, c) for f in range(filas) for c in range(columnas) if revelado[f][c]]
+    veces = dict.fromkeys(ocultas, 0)
+    total = 0
+    for minas in itertools.combinations(ocultas, estado['minas']):
+        minas = set(minas)
+        if all(
+            sum((nf, nc) in minas for nf in range(f - 1, f + 2) for nc in range(c - 1, c + 2)) == tablero[f][c]
+            for f, c in numeros
+        ):
+            total += 1
+            for celda in minas:
+                veces[celda] += 1
+    return {celda: n / total for celda, n in veces.items()}
+
+def _partida(semilla, banderas):
+    """Partida de 5x5 tras algunas jugadas seguras y `banderas` banderas al azar"""
+    rng = random.Random(semilla)
+    juego = Buscaminas(5, 5, 5, semilla=semilla)
+    juego.revelar(2, 2)
+    for _ in range(rng.randrange(3)):
+        estado = juego.obtener_estado()
+        seguras = [(f, c) for f in range(5) for c in range(5) if not estado['revelado'][f][c] and not juego.es_mina(f, c)]
+        if not seguras:
+            break
+        juego.revelar(*rng.choice(seguras))
+    estado = juego.obtener_estado()
+    ocultas = [(f, c) for f in range(5) for c in range(5) if not estado['revelado'][f][c]]
+    for celda in rng.sample(ocultas, min(banderas, len(ocultas))):
+        juego.alternar_bandera(*celda)
+    return juego
+
+@pytest.mark.parametrize("banderas", [0, 3])
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_exacta_igual_a_fuerza_bruta(semilla, banderas):
+    estado = _partida(semilla, banderas).obtener_estado()
+    probabilidades = MotorProbabilidades(presupuesto_ms=None).calcular(estado)
+    assert probabilidades.exacta
+    for (f, c), esperada in _fuerza_bruta(estado).items():
+        assert probabilidades.probabilidad(f, c) == pytest.approx(esperada, abs=1e-9)
+
+@pytest.mark.parametrize("semilla", range(10))
+def test_muestreo_cerca_de_fuerza_bruta(semilla):
+    estado = _partida(semilla, 2).obtener_estado()
+    # Sin clases exactas todo componente se estima por muestreo
+    motor = MotorProbabilidades(max_clases_exactas=0, muestras=3000, semilla=semilla, presupuesto_ms=None)
+    probabilidades = motor.calcular(estado)
+    for (f, c), esperada in _fuerza_bruta(estado).items():
+        assert probabilidades.probabilidad(f, c) == pytest.approx(esperada, abs=0.05)
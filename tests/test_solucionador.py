@@ -0,0 +1,75 @@
+# tests/test_solucionador.py
+"""Las deducciones del solucionador contra la enumeración exhaustiva de tableros.
+
+Cada celda segura (o mina) deducida tiene que serlo en todas las colocaciones
+de minas compatibles con los números visibles, pongan lo que pongan las banderas.
+"""
+import itertools
+import random
+import pytest
+from modelos.logica_juego import Buscaminas
+from modelos.solucionador import Solucionador
+
+SEMILLAS = range(40)
+
+def _compatibles(estado):
+    """Conjuntos de minas compatibles con los números revelados y el total de minas"""
+    filas, columnas = estado['filas'], estado['columnas']
+    tablero, revelado = estado['tablero'], estado['revelado']
+    ocultas = [(f, c) for f in range(filas) for c in range(columnas) if not revelado[f][c]]
+    numeros = [(f, c) for f in range(filas) for c in range(columnas) if revelado[f][c]]
+    for minas in itertools.combinations(ocultas, estado['minas']):
+        minas = set(minas)
+        if all(
+            sum((nf, nc) in minas for nf in range(f - 1, f + 2) for nc in range(c - 1, c + 2)) == tablero[f][c]
+            for f, c in numeros
+        ):
+            yield minas
+
+def _partida_con_banderas(semilla):
+    """Partida de 5x5 con algunas celdas abiertas y banderas al azar, casi siempre alguna equivocada"""
+    rng = random.Random(semilla)
+    juego = Buscaminas(5, 5, 5, semilla=semilla)
+    juego.revelar(2, 2)
+    estado = juego.obtener_estado()
+    ocultas = [(f, c) for f in range(5) for c in range(5) if not estado['revelado'][f][c]]
+    for celda in rng.sample(ocultas, min(3, len(ocultas))):
+        juego.alternar_bandera(*celda)
+    return juego
+
+@pytest.mark.parametrize("semilla", SEMILLAS)
+def test_deducciones_validas_con_banderas_equivocadas(semilla):
+    juego = _partida_con_banderas(semilla)
+    estado = juego.obtener_estado()
+    solucionador = Solucionador(estado)
+    seguras, minas = solucionador.deducir()
+
+    compatibles = list(_compatibles(estado))
+    assert compatibles
+    for celda in seguras:
+        assert all(celda not in colocacion for colocacion in compatibles)
+        assert not juego.es_mina(*celda)
+    for celda in minas:
+        assert all(celda in colocacion for colocacion in compatibles)
+        assert juego.es_mina(*celda)
+
+def test_bandera_equivocada_no_cambia_deducciones():
+    for semilla in SEMILLAS:
+        juego = _partida_con_banderas(semilla)
+        sin_banderas = Buscaminas(5, 5, 5, semilla=semilla)
+        sin_banderas.revelar(2, 2)
+        assert Solucionador(juego.obtener_estado()).deducir() == Solucionador(sin_banderas.obtener_estado()).deducir()
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_partida_incremental_sin_errores(semilla):
+    juego = Buscaminas(16, 30, 99, semilla=semilla)
+    juego.revelar(8, 15)
+    solucionador = Solucionador(juego.obtener_estado())
+    solucionador.registrar_revelacion(juego.ultimas_reveladas)
+    while not juego.partida_terminada:
+        seguras, minas = solucionador.deducir()
+        assert all(juego.es_mina(f, c) for f, c in minas)
+        if not seguras:
+            break
+        assert juego.revelar(*seguras[0])
+        solucionador.registrar_revelacion(juego.ultimas_reveladas)
@@ -0,0 +1,22 @@
+# tests/test_tablero_infinito.py
+"""Estado del plano infinito con el mismo formato de capas que el tablero finito"""
+from modelos.tablero_infinito import BuscaminasInfinito
+
+def test_estado_con_capa_de_banderas(tmp_path):
+    juego = BuscaminasInfinito(semilla=11, tamano_chunk=8, presupuesto_memoria=9 * 3 * 64,
+                               ruta_chunks=str(tmp_path))
+    assert juego.revelar(0, 0)
+    cerradas = [(f, c) for f in range(-40, 40, 13) for c in range(-40, 40, 17)
+                if not juego.esta_revelada(f, c)]
+    for celda in cerradas:
+        juego.alternar_bandera(*celda)
+
+    estado = juego.obtener_estado()
+    assert estado['banderas_colocadas'] == len(cerradas)
+    # Las celdas se leen aunque su chunk ya se haya descargado a disco
+    assert estado['chunks_en_disco'] > 0
+    assert all(estado['banderas'][f][c] for f, c in cerradas)
+    assert not estado['banderas'][0][0] and estado['revelado'][0][0]
+    juego.alternar_bandera(*cerradas[0])
+    assert not estado['banderas'][cerradas[0][0]][cerradas[0][1]]
+    juego.cerrar()